@@ -1,3 +1,7 @@
+# waktu mulai import app, untuk laporan budget cold start (lihat app/lib/importBudget.py)
+from time import perf_counter
+import_started = perf_counter()
+
 from flask import Flask
 from itsdangerous.serializer import Serializer
 from itsdangerous.url_safe import URLSafeSerializer
@@ -8,14 +12,66 @@ from . import config
 serializer = Serializer(config.SECRET_KEY, signer_kwargs={'sep': '$.$'})
 us_serializer = URLSafeSerializer(config.SECRET_KEY, signer_kwargs={'sep': '$.$'})
 
+# antrian export di background, dipakai bersama oleh seluruh controller
+# (import setelah serializer dibuat, karena app.lib.validasi butuh serializer)
+from .lib.exportJob import ExportJobQueue
+export_queue = ExportJobQueue(
+    spool_dir=config.EXPORT_SPOOL_DIR,
+    max_workers=config.EXPORT_WORKERS,
+    max_pending=config.EXPORT_MAX_PENDING,
+    ttl=config.EXPORT_TTL,
+)
+
 # konfigurasi logger biar nggak berisik
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)
 
-# instantiate flask
+# instantiate flask, file upload ditampung di SpooledTemporaryFile (lihat app/lib/spooledUpload.py)
+from .lib.spooledUpload import SpooledRequest, configureSpool
+from .lib.compressCache import configureCompressCache
+from .lib.jsonProvider import FastJSONProvider
+configureSpool(config.UPLOAD_SPOOL_MEMORY_KB)
+configureCompressCache(config.COMPRESS_CACHE_DIR, config.COMPRESS_CACHE_MAX_MB)
+
+# watchdog koneksi database yang bocor (lihat app/lib/poolWatchdog.py)
+from .lib.poolWatchdog import configureWatchdog
+configureWatchdog(config.DB_LEAK_WARN_SECONDS, config.DB_IDLE_TX_SECONDS, config.DB_LEAK_RECLAIM_SECONDS, config.DB_WATCHDOG_INTERVAL)
+
+# batas waktu query database (lihat app/lib/queryTimeout.py)
+from .lib.queryTimeout import configureTimeout
+configureTimeout('default', config.DB_STATEMENT_TIMEOUT_MS, config.DB_EXPORT_TIMEOUT_MS, config.DB_LOCK_TIMEOUT_MS)
+
+# replica untuk query read-only (lihat app/lib/replicaRouter.py)
+from .lib.replicaRouter import configureReplica, resetRouting
+if config.DB_REPLICA_DSN:
+    configureReplica('default', config.DB_REPLICA_DSN, config.DB_REPLICA_STRATEGY, config.DB_REPLICA_MAX_LAG_SECONDS, config.DB_REPLICA_CHECK_INTERVAL, config.DB_REPLICA_POOL_SIZE, config.DB_POOL_MINCONN)
+
+# ukuran connection pool database primary & replica (lihat gunicorn.conf.py)
+from .lib.postgresKonektor import configurePool
+configurePool('default', config.DB_POOL_MINCONN, config.DB_POOL_MAXCONN, config.DB_REPLICA_POOL_SIZE)
+
 app = Flask(__name__)
+app.request_class = SpooledRequest
+# JSON response pakai orjson (lihat app/lib/jsonProvider.py)
+app.json = FastJSONProvider(app)
 app.config.from_pyfile('config.py')
 
+# status read-your-writes replica berlaku per request
+app.before_request(resetRouting)
+
+# kompresi response & ETag / 304 untuk data JSON (lihat app/lib/httpResponse.py)
+from .lib.httpResponse import configureHttpResponse
+configureHttpResponse(app, config.HTTP_COMPRESS_MIN_SIZE, config.HTTP_COMPRESS_LEVEL)
+
+# file static hasil build (hash & gzip) + perintah 'flask --app main build-assets' (lihat app/lib/staticAsset.py)
+from .lib.staticAsset import configureStaticAssets
+configureStaticAssets(app, config.STATIC_BUNDLES)
+
 # import view function / controller / route
 from app.controller.dashboard import d_dashboard
 from app.controller.kelola import d_kelola
+from app.controller.export import d_export
+
+# cek waktu import app terhadap budget + perintah 'flask --app main import-report' (lihat app/lib/importBudget.py)
+from .lib.importBudget import configureImportBudget
+configureImportBudget(app, import_started, config.IMPORT_BUDGET_MS)
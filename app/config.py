@@ -1 +1,81 @@
-SECRET_KEY = 'ini secret key template ya ges'
\ No newline at end of file
+import os
+from tempfile import gettempdir
+
+SECRET_KEY = 'ini secret key template ya ges'
+
+# export job di background (lihat app/lib/exportJob.py)
+EXPORT_SPOOL_DIR = os.environ.get('EXPORT_SPOOL_DIR', os.path.join(gettempdir(), 'export_spool'))
+EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', 2))
+EXPORT_MAX_PENDING = int(os.environ.get('EXPORT_MAX_PENDING', 20))
+EXPORT_TTL = int(os.environ.get('EXPORT_TTL', 3600))
+
+# upload file: batas memory per file sebelum dipindah ke disk, dan batas total ukuran request (413 jika lewat)
+UPLOAD_SPOOL_MEMORY_KB = int(os.environ.get('UPLOAD_SPOOL_MEMORY_KB', 500))
+MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH_MB', 32)) * 1024 * 1024
+
+# cache hasil compress upload (lihat app/lib/compressCache.py), 0 untuk menonaktifkan
+COMPRESS_CACHE_DIR = os.environ.get('COMPRESS_CACHE_DIR', os.path.join(gettempdir(), 'compress_cache'))
+COMPRESS_CACHE_MAX_MB = int(os.environ.get('COMPRESS_CACHE_MAX_MB', 256))
+
+# watchdog koneksi database yang bocor (lihat app/lib/poolWatchdog.py), 0 untuk menonaktifkan idle tx / reclaim
+DB_LEAK_WARN_SECONDS = int(os.environ.get('DB_LEAK_WARN_SECONDS', 60))
+DB_IDLE_TX_SECONDS = int(os.environ.get('DB_IDLE_TX_SECONDS', 300))
+DB_LEAK_RECLAIM_SECONDS = int(os.environ.get('DB_LEAK_RECLAIM_SECONDS', 0))
+DB_WATCHDOG_INTERVAL = int(os.environ.get('DB_WATCHDOG_INTERVAL', 10))
+
+# ukuran connection pool database per proses worker, diisi otomatis oleh gunicorn.conf.py sesuai jumlah thread
+# DB_POOL_MINCONN = koneksi idle yang disimpan (dibuka ketika warm-up), DB_POOL_MAXCONN = batas koneksi bersamaan
+DB_POOL_MINCONN = int(os.environ.get('DB_POOL_MINCONN', 2))
+DB_POOL_MAXCONN = int(os.environ.get('DB_POOL_MAXCONN', 2))
+
+# batas waktu query database dalam milidetik (lihat app/lib/queryTimeout.py), 0 = tanpa batas
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+DB_EXPORT_TIMEOUT_MS = int(os.environ.get('DB_EXPORT_TIMEOUT_MS', 600000))
+DB_LOCK_TIMEOUT_MS = int(os.environ.get('DB_LOCK_TIMEOUT_MS', 5000))
+
+# replica read-only (lihat app/lib/replicaRouter.py), DSN libpq dipisah ';', kosong = seluruh query ke primary
+DB_REPLICA_DSN = [dsn.strip() for dsn in os.environ.get('DB_REPLICA_DSN', '').split(';') if dsn.strip()]
+DB_REPLICA_STRATEGY = os.environ.get('DB_REPLICA_STRATEGY', 'round_robin')
+DB_REPLICA_MAX_LAG_SECONDS = float(os.environ.get('DB_REPLICA_MAX_LAG_SECONDS', 5))
+DB_REPLICA_CHECK_INTERVAL = float(os.environ.get('DB_REPLICA_CHECK_INTERVAL', 5))
+DB_REPLICA_POOL_SIZE = int(os.environ.get('DB_REPLICA_POOL_SIZE', DB_POOL_MAXCONN))
+
+# kompresi response (gzip / br) di atas ukuran ini (byte), lihat app/lib/httpResponse.py
+HTTP_COMPRESS_MIN_SIZE = int(os.environ.get('HTTP_COMPRESS_MIN_SIZE', 1024))
+HTTP_COMPRESS_LEVEL = int(os.environ.get('HTTP_COMPRESS_LEVEL', 6))
+
+# budget waktu import app (cold start) dalam milidetik, lewat budget dicetak WARNING (lihat app/lib/importBudget.py)
+IMPORT_BUDGET_MS = int(os.environ.get('IMPORT_BUDGET_MS', 400))
+
+# bundle file static yang dipakai base.html lewat asset_bundle() (lihat app/lib/staticAsset.py), urutan file = urutan load
+STATIC_BUNDLES = {
+    'vendor.js': [
+        'plugins/jquery/jquery.min.js',
+        'plugins/inputmask/jquery.inputmask.min.js',
+        'plugins/bootstrap/bootstrap.bundle.min.js',
+        'plugins/adminlte/adminlte.min.js',
+        'plugins/sweetalert2/sweetalert2.min.js',
+        'plugins/toastr/toastr.min.js',
+        'plugins/bootboxjs/bootbox.min.js',
+        'plugins/datatables/datatables.min.js',
+        'plugins/dompurify/purify.min.js',
+        'plugins/selectize/selectize.min.js',
+        'plugins/select2/select2.min.js',
+        'plugins/flatpickr/flatpickr.min.js',
+        'plugins/bs-custom-file-input/bs-custom-file-input.min.js',
+        # Daterangepicker (DEPRECATED, pakai flatpickr aja!)
+        'plugins/daterangepicker/daterangepicker.js',
+    ],
+    'vendor.css': [
+        'plugins/bootstrap/bootstrap.min.css',
+        'plugins/adminlte/adminlte.min.css',
+        'plugins/fontawesome-free/css/all.min.css',
+        'plugins/sweetalert2/bootstrap-4.min.css',
+        'plugins/toastr/toastr.min.css',
+        'plugins/datatables/datatables.min.css',
+        'plugins/selectize/selectize.bootstrap4.min.css',
+        'plugins/select2/select2.min.css',
+        'plugins/flatpickr/flatpickr.min.css',
+        'plugins/daterangepicker/daterangepicker.css',
+    ],
+}
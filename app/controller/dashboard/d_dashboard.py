@@ -1,10 +1,12 @@
-from app import app
-from flask import render_template, request
-from app.repo.r_dashboard import dt_dashboardData, cari_data_dummy
-from app.lib import ajaxNormalError, dataTableError, validationError, sf, Validasi
+from app import app, export_queue
+from flask import render_template, request, jsonify
+from app.repo.r_dashboard import dt_dashboardData, cari_data_dummy, export_dashboardData, stream_dashboardData
+from app.lib import ajaxNormalError, dataTableError, validationError, sf, Validasi, CsvBuilder, ExcelBuilder, DTRequest
+from app.lib.exportJob import ExportJobFull
+from app.lib.httpResponse import jsonPage
 
-from marshmallow.fields import String
-from marshmallow.validate import Length
+from marshmallow.fields import String, Boolean
+from marshmallow.validate import Length, OneOf
 
 @app.get("/")
 def index():
@@ -13,23 +15,81 @@ def index():
 @app.get('/dt-caridata')
 def dt_caridata():
     schema = {
+        'draw': sf.dt_draw,
         'start': sf.dt_start,
+        'length': sf.dt_length,
         'search': sf.dt_search
     }
-    valid = Validasi(schema, request.args.to_dict())
+    dt = DTRequest.parse(request.args)
+    valid = Validasi(schema, dt)
     if valid.error:
         return validationError(valid.list_message)
-    data = valid.getData()
 
-    hasil = dt_dashboardData(data['search'], data['start']) 
+    hasil = dt_dashboardData(dt)
     if hasil.is_error:
         return dataTableError()
 
-    return {
+    # ETag dihitung tanpa 'draw', redraw dengan data yang sama dijawab 304
+    return jsonPage({
+        'draw': dt.draw,
         'recordsFiltered': hasil.dt_total,
         'data': hasil.result
-    }
+    })
     
+@app.get('/export-caridata')
+def export_caridata():
+    schema = {
+        'search': sf.dt_search,
+        'format': String(required=False, validate=OneOf(['csv', 'tsv'])),
+        'gzip': Boolean(required=False)
+    }
+    valid = Validasi(schema, request.args.to_dict())
+    if valid.error:
+        return validationError(valid.list_message)
+    data = valid.getData()
+
+    delimiter = '\t' if data.get('format') == 'tsv' else ','
+    hasil = export_dashboardData(data.get('search', ''), delimiter)
+    if hasil.is_error:
+        return ajaxNormalError()
+
+    csv = CsvBuilder(['DATA KARYAWAN'], ['ID', 'NAME', 'EMAIL', 'AGE', 'ADDRESS'], delimiter=delimiter, compress=data.get('gzip') in {True, 'true', '1'})
+    return csv.createCsvFromCopy('data_karyawan', hasil)
+
+def excel_caridata(job, search):
+    # dijalankan di background oleh export_queue, hasil ditulis ke job.path
+    hasil = stream_dashboardData(search)
+    if hasil.is_error:
+        raise Exception(hasil.pgerror)
+
+    # data bisa sangat besar, row langsung ditulis ke file sementara (tidak ditampung di memory)
+    excel = ExcelBuilder(['DATA KARYAWAN'], ['NO', 'ID', 'NAME', 'EMAIL', 'AGE', 'ADDRESS'], constantMemory=True)
+    excel.insertBody(job.track(hasil.stream))
+    with open(job.path, 'wb') as f:
+        excel.saveToStream(f)
+
+@app.post('/export-caridata-excel')
+def export_caridata_excel():
+    schema = {
+        'search': sf.dt_search
+    }
+    valid = Validasi(schema, request.form.to_dict())
+    if valid.error:
+        return validationError(valid.list_message)
+    data = valid.getData()
+
+    try:
+        job_id = export_queue.submit(
+            excel_caridata, 'data_karyawan.xlsx', 'application/vnd.ms-excel', data.get('search', '')
+        )
+    except ExportJobFull as e:
+        return ajaxNormalError(str(e), 429)
+
+    return {
+        'job_id': job_id,
+        'status': f"/export/{job_id}/status"
+    }
+
 @app.get('/search-name')
 def search_name():
     schema = {
@@ -45,4 +105,7 @@ def search_name():
         return ajaxNormalError()
     elif hasil.is_empty:
         return ajaxNormalError(f"Name <b>{data['name']}</b> tidak ditemukan!")
+
+    # dikirim sebagai JSON string agar dapat ETag (polling dgn nama yang sama dijawab 304)
+    return jsonify(hasil.first['name'])
     
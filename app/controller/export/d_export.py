@@ -0,0 +1,26 @@
+from app import app, export_queue
+from flask import send_file
+from app.lib import ajaxNormalError
+
+@app.get('/export/<job_id>/status')
+def export_status(job_id):
+    status = export_queue.status(job_id)
+    if status is None:
+        return ajaxNormalError('Export tidak ditemukan atau sudah kadaluarsa!', 404)
+
+    return {
+        'id': status['id'],
+        'status': status['status'],
+        'done': status['done'],
+        'total': status['total'],
+        'error': status['error'],
+        'download': f"/export/{job_id}/download" if status['status'] == 'done' else None
+    }
+
+@app.get('/export/<job_id>/download')
+def export_download(job_id):
+    hasil = export_queue.result(job_id)
+    if hasil is None:
+        return ajaxNormalError('File export belum siap atau sudah kadaluarsa!', 404)
+
+    return send_file(hasil['path'], mimetype=hasil['mimetype'], as_attachment=True, download_name=hasil['file_name'])
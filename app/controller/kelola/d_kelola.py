@@ -1,7 +1,7 @@
 from app import app
 from flask import render_template, request
-from app.repo.r_kelola import insert_data, delete_data, edit_data, insert_data_faker
-from app.lib import ajaxNormalError, dataTableError, validationError, sf, Validasi
+from app.repo.r_kelola import insert_data, insert_data_batch, delete_data_batch, edit_data, edit_data_batch, insert_data_faker
+from app.lib import ajaxNormalError, dataTableError, validationError, sf, Validasi, ValidasiBatch, jsonStream
 from flask import jsonify
 
 from marshmallow.fields import String, Integer
@@ -34,18 +34,45 @@ def insertDataKaryawan():
         'data': hasil.result
     }
 
+@app.post('/insert_data_batch')
+def insertDataKaryawanBatch():
+    # body request berupa JSON array: [{'name': ..., 'email': ..., 'age': ..., 'address': ...}, ...]
+    schema = {
+        'name': String(required=True, allow_none=False, validate=[Length(min=1, max=50)]),
+        'email': String(required=True, allow_none=False, validate=[Length(min=1, max=50)]),
+        'age': Integer(required=True, allow_none=False, validate=[Range(min=1, max=200)]),
+        'address': String(required=True, allow_none=False, validate=[Length(min=1, max=100)])
+    }
+
+    valid = ValidasiBatch(schema, request.get_data(), max_records=10000)
+    if valid.error:
+        return validationError(valid.list_message)
+
+    hasil = insert_data_batch(valid.getData())
+
+    if hasil.is_error:
+        return ajaxNormalError()
+
+    return {
+        'data': hasil.result
+    }
+
 @app.post('/delete_data')
 def deleteDataKaryawan():
-    id = request.form.get('id')
+    # id boleh lebih dari 1 (id=1&id=2&...), semua dihapus dalam 1 query per 1000 id
+    list_id = request.form.getlist('id')
 
     # Validasi id sesuai kebutuhan (contoh: pastikan id adalah integer)
     try:
-        id = int(id)
+        list_id = [int(id) for id in list_id]
     except ValueError:
         return validationError("Invalid id. Please provide a valid integer.")
 
-    # Panggil fungsi remove_data untuk menghapus data
-    hasil = delete_data(id)
+    if not list_id or len(list_id) > 10000:
+        return validationError("Jumlah id yang dihapus minimal 1 & maksimal 10000.")
+
+    # Panggil fungsi delete_data_batch untuk menghapus data
+    hasil = delete_data_batch(list_id)
 
     if hasil.is_error:
         return ajaxNormalError()
@@ -56,6 +83,10 @@ def deleteDataKaryawan():
 
 @app.post('/edit_data')
 def editDataKaryawan():
+    # bulk edit: body request berupa JSON array [{'id': ..., 'name': ..., 'email': ..., 'age': ..., 'address': ...}, ...]
+    if request.is_json:
+        return editDataKaryawanBatch()
+
     id = request.form.get('id')
 
     # Validasi id sesuai kebutuhan (contoh: pastikan id adalah integer)
@@ -94,6 +125,28 @@ def editDataKaryawan():
         'data': hasil.result
     }
 
+def editDataKaryawanBatch():
+    schema = {
+        'id': Integer(required=True, allow_none=False),
+        'name': String(required=True, allow_none=False, validate=[Length(min=1, max=50)]),
+        'email': String(required=True, allow_none=False, validate=[Length(min=1, max=50)]),
+        'age': Integer(required=True, allow_none=False, validate=[Range(min=1, max=200)]),
+        'address': String(required=True, allow_none=False, validate=[Length(min=1, max=100)])
+    }
+
+    valid = ValidasiBatch(schema, request.get_data(), max_records=10000)
+    if valid.error:
+        return validationError(valid.list_message)
+
+    # 1 query UPDATE ... FROM (VALUES ...) per 1000 data
+    hasil = edit_data_batch(valid.getData())
+
+    if hasil.is_error:
+        return ajaxNormalError()
+
+    # hasil RETURNING bisa sampai 10.000 row, dikirim per chunk
+    return jsonStream({}, 'data', hasil.result)
+
 @app.post('/insert_datafaker')
 def insertDataFaker():
     # Memeriksa apakah menggunakan data faker
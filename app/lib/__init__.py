@@ -1,9 +1,32 @@
-from .errorHandler import ajaxNormalError, ajaxRedirect, dataTableError, responseError, validationError
-from .excelBuilder import ExcelBuilder
-from .postgresKonektor import PostgresDatabase
-from .validasi import Validasi
-from . import schemaField as sf
-from .compressFile import compressImage, compressPdf
+'''
+    Seluruh isi app.lib di-import lazy (ketika pertama kali diakses) lewat module-level __getattr__,
+    sehingga endpoint yang tidak butuh Excel / compress file / validasi tidak ikut menanggung waktu import-nya
+    ketika cold start. Cara pakai tetap sama: from app.lib import PostgresDatabase, ExcelBuilder
+    Laporan waktu import: flask --app main import-report (lihat app/lib/importBudget.py)
+'''
+
+from importlib import import_module
+
+# nama yang di-export -> (submodule, atribut), atribut None artinya submodule itu sendiri
+LAZY_EXPORTS = {
+    "sf": (".schemaField", None),
+    "ajaxNormalError": (".errorHandler", "ajaxNormalError"),
+    "ajaxRedirect": (".errorHandler", "ajaxRedirect"),
+    "validationError": (".errorHandler", "validationError"),
+    "dataTableError": (".errorHandler", "dataTableError"),
+    "responseError": (".errorHandler", "responseError"),
+    "ExcelBuilder": (".excelBuilder", "ExcelBuilder"),
+    "CsvBuilder": (".csvBuilder", "CsvBuilder"),
+    "PostgresDatabase": (".postgresKonektor", "PostgresDatabase"),
+    "DTRequest": (".dataTables", "DTRequest"),
+    "SelectQuery": (".queryBuilder", "SelectQuery"),
+    "jsonStream": (".jsonProvider", "jsonStream"),
+    "Validasi": (".validasi", "Validasi"),
+    "ValidasiBatch": (".validasi", "ValidasiBatch"),
+    "compressImage": (".compressFile", "compressImage"),
+    "compressImages": (".compressFile", "compressImages"),
+    "compressPdf": (".compressFile", "compressPdf"),
+}
 
 __all__ = [
     "sf",
@@ -13,11 +36,33 @@ __all__ = [
     "dataTableError",
     "responseError",
     "ExcelBuilder",
+    "CsvBuilder",
     "PostgresDatabase",
+    "DTRequest",
+    "SelectQuery",
+    "jsonStream",
     "Validasi",
+    "ValidasiBatch",
     "AutoEmail",
     "sendAutoEmailWithFile",
     "sendAutoEmail",
     "compressImage",
+    "compressImages",
     "compressPdf"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    if name not in LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, attr = LAZY_EXPORTS[name]
+    module = import_module(module_name, __name__)
+    value = module if attr is None else getattr(module, attr)
+    # simpan di namespace modul, akses berikutnya tidak lewat __getattr__ lagi
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(LAZY_EXPORTS))
@@ -0,0 +1,120 @@
+"""
+    Modul compressCache, cache hasil compressImage / compressPdf berdasarkan isi file (content-addressed).
+    Versi: 1.0 (19 Okt 2026)
+
+    Key cache = sha256(isi file mentah + parameter compress), sehingga file yang sama (walaupun nama file beda)
+    cukup di-compress 1x, upload berikutnya langsung pakai hasil dari cache.
+    Hasil disimpan di directory lokal dengan batas ukuran total, file yang paling lama tidak dipakai dihapus duluan (LRU).
+"""
+
+import hashlib
+import os
+import shutil
+from threading import Lock
+from typing import IO, Union
+from uuid import uuid4
+
+CHUNK_SIZE = 64 * 1024
+
+
+class CompressCache:
+    def __init__(self, cache_dir: str, max_bytes: int) -> None:
+        os.makedirs(cache_dir, exist_ok=True)
+        self.__cache_dir = cache_dir
+        self.__max_bytes = max_bytes
+        self.__lock = Lock()
+        self.__total_bytes = self.__scan()[1]
+
+    def __scan(self):
+        # return list (mtime, size, path) & total size seluruh file cache
+        entries = []
+        for entry in os.scandir(self.__cache_dir):
+            try:
+                if entry.is_file() and entry.name.endswith('.bin'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            except FileNotFoundError:
+                continue
+        return entries, sum(size for _, size, _ in entries)
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.__cache_dir, f"{key}.bin")
+
+    def key(self, stream: IO[bytes], *params) -> str:
+        '''
+            Hitung key cache dari isi stream + parameter compress, posisi stream dikembalikan ke awal
+        '''
+        digest = hashlib.sha256(repr(params).encode('utf-8'))
+        stream.seek(0)
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+        stream.seek(0)
+
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Union[IO[bytes], None]:
+        '''
+            Return file hasil compress (mode 'rb') jika ada di cache, None jika tidak ada
+        '''
+        path = self.__path(key)
+        try:
+            stream = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+
+        # tandai baru dipakai (LRU berdasarkan mtime)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return stream
+
+    def put(self, key: str, stream: IO[bytes]) -> None:
+        '''
+            Simpan isi stream ke cache, posisi stream dikembalikan ke awal
+        '''
+        path = self.__path(key)
+        temp_path = f"{path}.{uuid4().hex[:8]}.tmp"
+
+        stream.seek(0)
+        with open(temp_path, 'wb') as f:
+            shutil.copyfileobj(stream, f, CHUNK_SIZE)
+            size = f.tell()
+        stream.seek(0)
+
+        # file yang lebih besar dari batas cache tidak perlu disimpan
+        if size > self.__max_bytes:
+            os.remove(temp_path)
+            return
+
+        os.replace(temp_path, path)
+        with self.__lock:
+            self.__total_bytes += size
+            if self.__total_bytes > self.__max_bytes:
+                self.__evict()
+
+    def __evict(self) -> None:
+        # scan ulang (bisa saja ada worker lain yang ikut nulis), lalu hapus yang paling lama tidak dipakai
+        entries, total = self.__scan()
+        for _, size, path in sorted(entries):
+            if total <= self.__max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                continue
+        self.__total_bytes = total
+
+
+# cache default untuk compressImage / compressPdf, None artinya cache tidak aktif
+compress_cache = None
+
+
+def configureCompressCache(cache_dir: str, max_mb: int) -> None:
+    global compress_cache
+    compress_cache = CompressCache(cache_dir, max_mb * 1024 * 1024) if max_mb > 0 else None
+
+
+def getCompressCache() -> Union[CompressCache, None]:
+    return compress_cache
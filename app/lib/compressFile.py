@@ -1,13 +1,18 @@
 """
     Modul compressFile develop by Candra (20 Mar 2023)
-    Versi: 1.0 (24 Mar 2023)
+    Versi: 1.2 (19 Okt 2026)
 """
 
 
 from werkzeug.datastructures import FileStorage
-from PIL import Image
+from PIL import Image, ImageMath
 from io import BytesIO
-from pikepdf import Pdf, PdfImage, Name
+from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from pikepdf import PdfImage, Name
+from .uploadProbe import probeImage, probePdf
+from .spooledUpload import spooledStream, streamSize
+from .compressCache import getCompressCache
 
 
 def sizeof_fmt(num, suffix="B"):
@@ -18,48 +23,225 @@ def sizeof_fmt(num, suffix="B"):
     return f"{num:.1f}Yi{suffix}"
 
 
-def compressImage(file: FileStorage, quality: int = 47) -> FileStorage:
-    file.seek(0, 2)
-    print("raw_image:", sizeof_fmt(file.tell()))
-    # load gambar ke PIL
-    raw_image = Image.open(file)
+def fromCache(file: FileStorage, *params):
+    """
+    Cari hasil compress di compress cache berdasarkan isi file + parameter compress.
+    Return tuple (cache_key, stream hasil compress), keduanya None jika cache tidak aktif / tidak ketemu.
+    """
+    cache = getCompressCache()
+    if cache is None:
+        return None, None
+
+    cache_key = cache.key(file, *params)
+    return cache_key, cache.get(cache_key)
+
+
+def toCache(cache_key: str, stream) -> None:
+    cache = getCompressCache()
+    if cache is not None and cache_key is not None:
+        cache.put(cache_key, stream)
+
+
+# ukuran blok SSIM, sama dgn blok DCT JPEG sehingga artefak (blocking / ringing) per blok ikut terukur
+SSIM_BLOCK = 8
+
+# konstanta standar SSIM untuk gambar 8-bit
+SSIM_C1, SSIM_C2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+
+
+def evalMath(expression: str, **images) -> Image.Image:
+    # Pillow >= 10.3 mengganti ImageMath.eval jadi unsafe_eval (expression di sini konstanta, bukan input user)
+    evaluate = getattr(ImageMath, "unsafe_eval", None) or ImageMath.eval
+    return evaluate(expression, **images)
+
+
+class SsimReference:
+    """
+    SSIM per blok (SSIM_BLOCK x SSIM_BLOCK px) pada luma resolusi penuh, hasilnya rata-rata SSIM seluruh blok (1.0 = identik).
+    Rata-rata & variance per blok dihitung di C lewat reduce() (box average) & ImageMath, tanpa loop per pixel di python.
+    Statistik gambar referensi dihitung 1x, score() dipanggil per kandidat hasil encode.
+    """
+
+    def __init__(self, image: Image.Image, block: int = SSIM_BLOCK) -> None:
+        self.block = block
+        self.size = image.size
+        self.luma = image.convert("L").convert("F")
+        self.mean = self.luma.reduce(block)
+        self.mean_sq = evalMath("a * a", a=self.luma).reduce(block)
+
+    def score(self, image: Image.Image) -> float:
+        luma = image.convert("L").convert("F")
+        if luma.size != self.size:
+            luma = luma.resize(self.size)
+
+        mean = luma.reduce(self.block)
+        mean_sq = evalMath("b * b", b=luma).reduce(self.block)
+        mean_ab = evalMath("a * b", a=self.luma, b=luma).reduce(self.block)
+
+        ssim_map = evalMath(
+            "((2 * ma * mb + c1) * (2 * (mab - ma * mb) + c2)) / ((ma * ma + mb * mb + c1) * ((maa - ma * ma) + (mbb - mb * mb) + c2))",
+            ma=self.mean, mb=mean, maa=self.mean_sq, mbb=mean_sq, mab=mean_ab, c1=SSIM_C1, c2=SSIM_C2,
+        )
+        # rata-rata seluruh blok: resize BOX ke 1x1 (ImageStat pakai histogram, tidak akurat untuk mode "F")
+        return ssim_map.resize((1, 1), Image.BOX).getpixel((0, 0))
+
+
+def ssim(image_a: Image.Image, image_b: Image.Image, block: int = SSIM_BLOCK) -> float:
+    """
+    Rata-rata SSIM per blok antara 2 gambar, 1.0 artinya identik (lihat SsimReference)
+    """
+    return SsimReference(image_a, block).score(image_b)
+
+
+def encodeJpeg(image: Image.Image, quality: int, output=None) -> BytesIO:
+    output = BytesIO() if output is None else output
+    image.save(fp=output, format="JPEG", quality=quality, optimize=True)
+    return output
+
+
+def searchJpegQuality(image: Image.Image, target_bytes: int = None, min_ssim: float = None, min_quality: int = 20, max_quality: int = 90) -> BytesIO:
+    """
+    Binary search quality JPEG:
+        - jika target_bytes diisi: cari quality tertinggi yang ukurannya <= target_bytes
+        - jika min_ssim diisi: cari quality terendah yang SSIM-nya >= min_ssim
+    jika keduanya diisi, target_bytes yang diutamakan. Return hasil encode terbaik (BytesIO)
+    """
+    low, high = min_quality, max_quality
+    best = None
+    # statistik gambar asli cukup dihitung 1x, bukan di setiap iterasi
+    reference = SsimReference(image) if target_bytes is None else None
+    while low <= high:
+        quality = (low + high) // 2
+        output = encodeJpeg(image, quality)
+
+        if target_bytes is not None:
+            # ukuran masih muat, coba naikan quality
+            passed = output.tell() <= target_bytes
+            if passed:
+                best, low = output, quality + 1
+            else:
+                high = quality - 1
+        else:
+            # kualitas sudah cukup mirip, coba turunkan quality
+            output.seek(0)
+            with Image.open(output) as compressed:
+                passed = reference.score(compressed) >= min_ssim
+            output.seek(0, 2)
+            if passed:
+                best, high = output, quality - 1
+            else:
+                low = quality + 1
+
+    # jika tidak ada quality yang memenuhi, pakai quality terendah (target_bytes) / tertinggi (min_ssim)
+    if best is None:
+        best = encodeJpeg(image, min_quality if target_bytes is not None else max_quality)
+    return best
+
+
+def compressImage(file: FileStorage, quality: int = 47, max_dimension: int = 2048, target_kb: int = None, min_ssim: float = None) -> FileStorage:
+    """
+    Compress gambar upload (PNG / JPG / JPEG). Tahapan:
+        1. downsample agar sisi terpanjang maksimal max_dimension px (JPEG pakai draft() agar decode langsung di resolusi kecil)
+        2. JPEG: quality tetap (quality), atau binary search ke target_kb / min_ssim jika diisi.
+           PNG: ubah ke mode "P" (8-bit pixels)
+        3. jika hasil compress malah lebih besar dari aslinya, pakai file asli
+    Hasil compress disimpan di compress cache (jika aktif), upload file yang sama berikutnya langsung ambil dari cache.
+    """
+    raw_size = streamSize(file)
+    print("raw_image:", sizeof_fmt(raw_size))
+
+    cache_key, cached = fromCache(file, "image", quality, max_dimension, target_kb, min_ssim)
+    if cached is not None:
+        print("compressed_image (cache):", sizeof_fmt(streamSize(cached)))
+        file.stream = cached
+        return file
+
+    # load gambar ke PIL, pakai hasil probe dari validasi (ImageFile) jika ada, pixel belum di-decode
+    probe = probeImage(file)
+    raw_image = probe.image
+    image_format = probe.format
 
     # hanya bisa compress gambar dengan format jpg, jpeg, png
-    if raw_image.format not in {"JPG", "JPEG", "PNG"}:
+    if image_format not in {"JPG", "JPEG", "PNG"}:
         raise Exception("Hanya file PNG / JPG / JPEG yang didukung!")
 
-    # compress gambar dan tampung ke variable compressed_image
-    compressed_image = BytesIO()
+    original_size = probe.size
+    if image_format == "JPEG":
+        # draft() membuat decoder JPEG langsung decode di skala 1/2, 1/4, 1/8 yang masih >= max_dimension,
+        # jauh lebih cepat dibanding decode full resolusi lalu resize
+        raw_image.draft("RGB", (max_dimension, max_dimension))
+
+    # thumbnail() resize in-place dan tetap menjaga rasio gambar
+    image = raw_image
+    if max(image.size) > max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+    resized = image.size != original_size
 
     # untuk format PNG ubah ke mode "P" (8-bit pixels) agar compress lebih ganas
     # TODO: perlu dioptimasi pada palette agar warna gambar tetap bagus, saya pusing bikin palette-nya :)
-    if raw_image.format == "PNG":
-        raw_image = raw_image.quantize(method=2)
-        raw_image.format = "PNG"
-
-    # jika format JPG / JPEG maka quality ditentukan oleh kwargs 'quality' (1 ~ 95)
-    # sedangkan format PNG ditentukan oleh kwargs 'compress_level' (0 ~ 9) atau kwargs 'optimize' jika True maka compress_level otomatis set ke 9
-    raw_image.save(
-        fp=compressed_image,
-        format=raw_image.format,
-        quality=quality,
-        optimize=True
-    )
+    # hasil compress ditampung di spooled stream (pindah ke disk jika besar)
+    if image_format == "PNG":
+        image = image.quantize(method=2)
+        compressed_image = spooledStream()
+        # format PNG ditentukan oleh kwargs 'optimize', jika True maka compress_level otomatis set ke 9
+        image.save(fp=compressed_image, format="PNG", optimize=True)
+    else:
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        # quality JPG / JPEG (1 ~ 95)
+        if target_kb is not None or min_ssim is not None:
+            # kandidat hasil binary search cukup di memory (ukurannya sudah kecil), hasil terbaik baru dipindah ke spooled stream
+            target_bytes = target_kb * 1024 if target_kb is not None else None
+            best = searchJpegQuality(image, target_bytes, min_ssim)
+            compressed_image = spooledStream()
+            compressed_image.write(best.getbuffer())
+        else:
+            compressed_image = encodeJpeg(image, quality, spooledStream())
+
     print("compressed_image:", sizeof_fmt(compressed_image.tell()))
-    raw_image.close()
+    image.close()
+    probe.close()
+
+    # jika gambar tidak di-resize dan hasil compress lebih besar, pakai gambar asli
+    if not resized and compressed_image.tell() >= raw_size:
+        print("compressed_image lebih besar, pakai raw_image")
+        file.seek(0)
+        toCache(cache_key, file.stream)
+        return file
 
     # replace gambar ori ke gambar yang sudah di comppress
     compressed_image.seek(0)
     file.stream = compressed_image
+    toCache(cache_key, compressed_image)
     return file
 
 
+def compressImages(files: List[FileStorage], max_workers: int = 4, **kwargs) -> List[FileStorage]:
+    """
+    Compress banyak gambar upload sekaligus secara paralel (thread pool), Pillow melepas GIL saat decode / encode.
+    kwargs diteruskan ke compressImage(), urutan hasil sama dengan urutan files.
+    """
+    if len(files) <= 1:
+        return [compressImage(file, **kwargs) for file in files]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as executor:
+        return list(executor.map(lambda file: compressImage(file, **kwargs), files))
+
+
 def compressPdf(file: FileStorage, quality: int = 30) -> FileStorage:
-    file.seek(0, 2)
-    print("raw_pdf:", sizeof_fmt(file.tell()))
+    print("raw_pdf:", sizeof_fmt(streamSize(file)))
+
+    cache_key, cached = fromCache(file, "pdf", quality)
+    if cached is not None:
+        print("compressed_pdf (cache):", sizeof_fmt(streamSize(cached)))
+        file.stream = cached
+        return file
+    file.seek(0)
 
-    # load pdf, then loop through pages to compress all image
-    raw_pdf = Pdf.open(file)
+    # load pdf (pakai hasil probe dari validasi PdfFile jika ada), then loop through pages to compress all image
+    probe = probePdf(file)
+    raw_pdf = probe.pdf
     for page in raw_pdf.pages:
         for raw_image in page.images:
             # load image
@@ -87,13 +269,14 @@ def compressPdf(file: FileStorage, quality: int = 30) -> FileStorage:
     # remove unecessary object to reduce pdf size
     raw_pdf.remove_unreferenced_resources()
 
-    # write compressed_pdf
-    compressed_pdf = BytesIO()
+    # write compressed_pdf ke spooled stream (pindah ke disk jika besar)
+    compressed_pdf = spooledStream()
     raw_pdf.save(compressed_pdf)
-    raw_pdf.close()
+    probe.close()
     print("compressed_pdf:", sizeof_fmt(compressed_pdf.tell()))
 
     # replace raw pdf with compressed pdf
     compressed_pdf.seek(0)
     file.stream = compressed_pdf
+    toCache(cache_key, compressed_pdf)
     return file
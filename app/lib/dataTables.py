@@ -0,0 +1,257 @@
+"""
+    Modul dataTables, parser request DataTables (server side) yang ringan.
+    Versi: 1.2 (19 Okt 2026)
+
+    Tiap request DataTables mengirim puluhan key (columns[i][data], columns[i][search][value], order[i][dir], dll),
+    sebelumnya semua key di-copy lewat request.args.to_dict() lalu divalidasi Validasi dengan unknown=INCLUDE.
+    DTRequest hanya mengambil key yang dibutuhkan saja langsung dari request.args (MultiDict), tanpa copy seluruh args.
+    Contoh pemakaian:
+        dt = DTRequest.parse(request.args)
+        valid = Validasi(schema, dt)
+        ...
+        hasil = db.execute_dt(query, param, dt=dt)
+        return {'draw': dt.draw, 'recordsFiltered': hasil.dt_total, 'data': hasil.result}
+
+    Versi 1.1: ordering (order[i]) & filter per kolom (columns[i][search][value]) di-generate jadi ORDER BY / WHERE
+    memakai psycopg2.sql, hanya untuk kolom yang ada di whitelist (lihat queryBuilder.SelectQuery). Jika FE mengirim seek[<kolom>]
+    (nilai row terakhir halaman sebelumnya), halaman berikutnya diambil pakai keyset pagination tanpa OFFSET.
+
+    Versi 1.2: filter per kolom sesuai tipe kolom (filter_types), agar bisa memakai index:
+        - 'number' : kolom = nilai (btree)
+        - 'date'   : kolom >= tanggal AND kolom < tanggal + 1 hari (btree, kolom date / timestamp)
+        - 'prefix' : kolom LIKE 'nilai%' (btree dgn text_pattern_ops / collation "C")
+        - 'text'   : kolom ILIKE '%nilai%' (butuh index trigram: CREATE INDEX ... USING gin (kolom gin_trgm_ops))
+      Kolom yang tipenya tidak dideklarasikan tetap kolom::text ILIKE '%nilai%' (selalu full scan).
+      Nilai number / date yang tidak valid dikirim sebagai NULL (tidak ada row yang cocok), bentuk query tetap sama.
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from psycopg2 import sql
+from typing import Dict, Iterable, List, Mapping, Tuple, Union
+
+FILTER_TYPES = ('text', 'prefix', 'number', 'date')
+
+# format tanggal yang diterima filter 'date'
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y')
+
+
+def toInt(value, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def escapeLike(value: str) -> str:
+    # karakter wildcard LIKE dari input user dianggap karakter biasa
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def toNumber(value: str) -> Union[Decimal, None]:
+    try:
+        number = Decimal(value.strip())
+    except InvalidOperation:
+        return None
+    return number if number.is_finite() else None
+
+
+def toDate(value: str) -> Union[date, None]:
+    for format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), format).date()
+        except ValueError:
+            continue
+    return None
+
+
+class DTColumn:
+    __slots__ = ('index', 'data', 'name', 'searchable', 'orderable', 'search')
+
+    def __init__(self, index: int, data: str, name: str, searchable: bool, orderable: bool, search: str) -> None:
+        self.index = index
+        self.data = data
+        self.name = name
+        self.searchable = searchable
+        self.orderable = orderable
+        self.search = search
+
+    def __repr__(self) -> str:
+        return f"<DTColumn {self.index}: data={self.data}, search={self.search}>"
+
+
+class DTOrder:
+    __slots__ = ('column', 'dir')
+
+    def __init__(self, column: DTColumn, dir: str) -> None:
+        self.column = column
+        self.dir = dir
+
+    @property
+    def desc(self) -> bool:
+        return self.dir == 'desc'
+
+    def __repr__(self) -> str:
+        return f"<DTOrder {self.column.data} {self.dir}>"
+
+
+class DTRequest:
+    __slots__ = ('draw', 'start', 'length', 'search', 'order', 'columns', 'seek', 'extra', '_raw')
+
+    def __init__(self) -> None:
+        self.draw = 0
+        self.start = 0
+        self.length = 10
+        self.search = ''
+        self.order: List[DTOrder] = []
+        self.columns: List[DTColumn] = []
+        # nilai kolom dari row terakhir halaman sebelumnya (keyset pagination), {'id': '20', 'name': 'budi'}
+        self.seek: Dict[str, str] = {}
+        # param tambahan selain param bawaan DataTables, misal filter custom dari form
+        self.extra: Dict[str, str] = {}
+        self._raw: Dict[str, str] = {}
+
+    @classmethod
+    def parse(cls, args: Mapping, extra: tuple = (), max_columns: int = 100) -> 'DTRequest':
+        '''
+            Parse request DataTables dari request.args / request.form.
+            extra: nama param tambahan (selain bawaan DataTables) yang ikut diambil, contoh ('cabang', 'tanggal')
+        '''
+        dt = cls()
+
+        # search bisa berupa param custom 'search' (ajax.data: {search: ...}) atau bawaan DataTables 'search[value]'
+        search = args.get('search')
+        if search is None:
+            search = args.get('search[value]', '')
+
+        for key, value in (('draw', args.get('draw')), ('start', args.get('start')), ('length', args.get('length')), ('search', search)):
+            if value is not None:
+                dt._raw[key] = value
+
+        dt.draw = toInt(args.get('draw'), 0)
+        dt.start = max(toInt(args.get('start'), 0), 0)
+        dt.length = toInt(args.get('length'), 10)
+        dt.search = search
+
+        # columns[i][...], berhenti di index pertama yang tidak ada
+        for i in range(max_columns):
+            data = args.get(f'columns[{i}][data]')
+            if data is None:
+                break
+            dt.columns.append(DTColumn(
+                index=i,
+                data=data,
+                name=args.get(f'columns[{i}][name]', ''),
+                searchable=args.get(f'columns[{i}][searchable]', 'true') == 'true',
+                orderable=args.get(f'columns[{i}][orderable]', 'true') == 'true',
+                search=args.get(f'columns[{i}][search][value]', ''),
+            ))
+            seek = args.get(f'seek[{data}]')
+            if seek is not None:
+                dt.seek[data] = seek
+
+        # order[i][column] & order[i][dir]
+        for i in range(len(dt.columns)):
+            column = args.get(f'order[{i}][column]')
+            if column is None:
+                break
+            column = toInt(column, -1)
+            if 0 <= column < len(dt.columns):
+                dir = 'desc' if args.get(f'order[{i}][dir]', 'asc').lower() == 'desc' else 'asc'
+                dt.order.append(DTOrder(dt.columns[column], dir))
+
+        for key in extra:
+            value = args.get(key)
+            if value is not None:
+                dt.extra[key] = value
+
+        return dt
+
+    def to_dict(self) -> Dict[str, str]:
+        '''
+            Data yang divalidasi oleh Validasi: draw, start, length, search (raw value) + param extra
+        '''
+        return {**self._raw, **self.extra}
+
+    @property
+    def column_search(self) -> Dict[str, str]:
+        # filter per kolom yang diisi user: {'name': 'candra', 'age': '20'}
+        return {
+            column.data: column.search
+            for column in self.columns
+            if column.searchable and column.search
+        }
+
+    def compose(self, columns: Dict[str, sql.Composable], key: str = None, not_null: Iterable[str] = (), filter_types: Mapping[str, str] = None) -> Tuple[Union[sql.Composable, None], Union[sql.Composable, None], Union[sql.Composable, None], dict]:
+        '''
+            Generate klausa WHERE & ORDER BY dari order[i] & columns[i][search][value].
+            columns: whitelist {data DataTables: kolom / ekspresi sql}, kolom di luar whitelist diabaikan
+            key: data DataTables yang unik (misal 'id'), ditambahkan di akhir ORDER BY agar urutan stabil & bisa keyset pagination
+            not_null: data DataTables yang kolomnya NOT NULL, keyset hanya dipakai jika seluruh kolom order adalah key / not_null
+                (row dgn nilai NULL tidak pernah lolos perbandingan (kolom) > (nilai), sehingga tidak akan muncul di halaman manapun)
+            filter_types: tipe filter per data DataTables ('text', 'prefix', 'number', 'date'), lihat docstring modul
+            Return (where, seek, order_by, param), masing-masing klausa None jika kosong.
+            seek adalah kondisi keyset pagination, jika tidak None maka halaman diambil tanpa OFFSET
+            (seek tidak ikut dipakai untuk hitung total data).
+        '''
+        param = {}
+
+        # filter per kolom, nilai filter selalu lewat bind param
+        filter_types = filter_types or {}
+        where = []
+        for data, value in self.column_search.items():
+            if data not in columns:
+                continue
+            name = f"dt_filter_{len(where)}"
+            column, placeholder = columns[data], sql.Placeholder(name)
+            kind = filter_types.get(data)
+            if kind == 'number':
+                where.append(sql.SQL("{} = {}").format(column, placeholder))
+                param[name] = toNumber(value)
+            elif kind == 'date':
+                where.append(sql.SQL("{0} >= {1} AND {0} < {2}").format(column, placeholder, sql.Placeholder(f"{name}_end")))
+                param[name] = toDate(value)
+                param[f"{name}_end"] = param[name] + timedelta(days=1) if param[name] is not None else None
+            elif kind == 'prefix':
+                where.append(sql.SQL("{} LIKE {}").format(column, placeholder))
+                param[name] = f"{escapeLike(value)}%"
+            elif kind == 'text':
+                where.append(sql.SQL("{} ILIKE {}").format(column, placeholder))
+                param[name] = f"%{escapeLike(value)}%"
+            else:
+                where.append(sql.SQL("{}::text ILIKE {}").format(column, placeholder))
+                param[name] = f"%{escapeLike(value)}%"
+
+        # ordering, arah sort hanya 'asc' / 'desc' (sudah dinormalisasi waktu parse)
+        order = [
+            (item.column.data, item.dir)
+            for item in self.order
+            if item.column.orderable and item.column.data in columns
+        ]
+        if key is not None and key not in (data for data, _ in order):
+            order.append((key, order[-1][1] if order else 'asc'))
+
+        # keyset: (kolom order...) > (nilai row terakhir...), hanya bisa jika ada key, arah sort semua kolom sama,
+        # dan semua kolom order tidak mungkin NULL. Selain itu tetap pakai OFFSET
+        seek = None
+        values = [self.seek.get(data) for data, _ in order]
+        seekable = {key, *not_null}
+        if key is not None and len({dir for _, dir in order}) == 1 and all(value is not None for value in values) and all(data in seekable for data, _ in order):
+            names = [f"dt_seek_{i}" for i in range(len(values))]
+            seek = sql.SQL("({}) {} ({})").format(
+                sql.SQL(', ').join(columns[data] for data, _ in order),
+                sql.SQL('<' if order[0][1] == 'desc' else '>'),
+                sql.SQL(', ').join(sql.Placeholder(name) for name in names),
+            )
+            param.update(zip(names, values))
+
+        where = sql.SQL(' AND ').join(where) if where else None
+        order = sql.SQL(', ').join(
+            sql.SQL("{} {}").format(columns[data], sql.SQL(dir.upper()))
+            for data, dir in order
+        ) if order else None
+
+        return where, seek, order, param
+
+    def __repr__(self) -> str:
+        return f"<DTRequest draw={self.draw} start={self.start} length={self.length} search={self.search!r} order={self.order}>"
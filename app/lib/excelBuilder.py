@@ -1,17 +1,33 @@
+import shutil
 from decimal import Decimal
-from typing import Dict
-from xlsxwriter import Workbook
-from io import BytesIO
+from typing import Dict, Iterable
 from flask import send_file, Response
 from datetime import datetime
-from openpyxl.utils import get_column_letter, column_index_from_string
 from flask import __version__ as flask_version
+from .excelColWidth import ColWidthEstimator
+from .spooledUpload import spooledStream
 
 '''
 ExcelBuilder
-Versi: 3.8 (03 Feb 2023)
+Versi: 4.3 (19 Okt 2026)
 '''
 
+# batas maksimal row per worksheet pada excel (.xlsx)
+EXCEL_MAX_ROWS = 1048576
+
+
+def addSum(total, value):
+    '''
+        Jumlahkan nilai kolom tanpa bungkus Decimal(v) ulang: Decimal + Decimal tetap Decimal,
+        float + float (PostgresDatabase.fetch_mode 'float' / 'json') tetap float, campuran keduanya disamakan ke Decimal
+    '''
+    if total is None:
+        return value
+    try:
+        return total + value
+    except TypeError:
+        return Decimal(total) + Decimal(value)
+
 
 class ExcelBuilder():
     ''' Develop by Candra 22-06-2022
@@ -23,9 +39,20 @@ class ExcelBuilder():
             4. dateTimeFormat(optional): untuk list format waktu dalam python format, untuk format rata kanan
             5. headerDefaultFormat(optional): untuk default cell format pada header excel
             6. theadDefaultFormat(optional): untuk default cell format pada table header
+            7. autofit(optional): mode hitung lebar kolom, 'full' (ukur semua row), 'sample' (default, ukur sampleRows row pertama)
+                atau 'meta' (tidak ukur row, hanya dari colWidths / setColsFromDescription / table header)
+            8. sampleRows(optional): jumlah row body yg diukur per kolom pada mode 'sample', default 500
+            9. colWidths(optional): metadata lebar kolom per table header, contoh {'NAMA': 30, 'DPP': {'type': 'numeric', 'precision': 12}}
+            10. maxRows(optional): batas row per worksheet, jika terlewati maka otomatis lanjut ke sheet baru
+                (header & table header ditulis ulang), default batas maksimal excel 1.048.576
+            11. constantMemory(optional): untuk export besar, tiap row langsung ditulis ke file sementara begitu pindah row
+                (xlsxwriter constant_memory) sehingga memory tidak tumbuh sesuai jumlah row. Syarat: row ditulis berurutan,
+                table header nested tidak didukung (raise Exception)
+        File hasil excel ditampung di spooledStream(), pindah ke disk jika ukurannya lewat SPOOL_MAX_MEMORY.
+        Sheet tambahan bisa dibuat dengan addSheet() atau insertSheets().
     '''
 
-    def __init__(self, dataHeader: list, tableHeader: list, sheetName='Sheet1', dateTimeFormat: list = [], headerDefaultFormat='format_0', theadDefaultFormat='format_3') -> None:
+    def __init__(self, dataHeader: list, tableHeader: list, sheetName='Sheet1', dateTimeFormat: list = [], headerDefaultFormat='format_0', theadDefaultFormat='format_3', autofit: str = 'sample', sampleRows: int = 500, colWidths: Dict = None, maxRows: int = EXCEL_MAX_ROWS, constantMemory: bool = False) -> None:
         # wajib pakai flask versi >=2
         if int(flask_version[0]) < 2:
             raise Exception(
@@ -33,17 +60,21 @@ class ExcelBuilder():
             )
 
         # private variable
-        self.__ouputFile = BytesIO()
-        self.__wb = Workbook(self.__ouputFile, {'in_memory': True})
-        self.__ws = self.__wb.add_worksheet(sheetName)
-        self.__row_count = 2
-        self.__sumCols = {}
-        self.__tableHeader = []
-        self.__flagBody = False
+        # xlsxwriter baru di-import ketika excel pertama dibuat (tidak membebani cold start endpoint lain)
+        from xlsxwriter import Workbook
+
+        self.__ouputFile = spooledStream()
+        self.__constantMemory = constantMemory
+        # Format xlsxwriter per isi format (dict), Format disimpan workbook sampai close sehingga jangan dibuat ulang tiap cell
+        self.__formatCache = {}
+        self.__wb = Workbook(self.__ouputFile, {'constant_memory': True} if constantMemory else {'in_memory': True})
         self.__flagRight = False
-        self.__commit = True
-        self.__last_col = 0
-        self.__dataRowTemp = []
+        self.__maxRows = min(maxRows, EXCEL_MAX_ROWS)
+        self.__autofit = autofit
+        self.__sampleRows = sampleRows
+        # list seluruh worksheet beserta table header & estimator lebar kolom-nya,
+        # lebar kolom baru di-set saat createExcel() / saveToFile()
+        self.__sheets = []
         self.__listDateTimeFormat = [
             '%d %b %Y',
             '%d-%b-%Y',
@@ -64,10 +95,74 @@ class ExcelBuilder():
 
         # call private method to setup excel file
         self.__createCellFormats()
+        self.__initSheet(sheetName, dataHeader, tableHeader, colWidths)
+
+    def __initSheet(self, sheetName: str, dataHeader: list, tableHeader: list, colWidths: Dict = None) -> None:
+        # setup worksheet baru dgn table baru, state per-table (sumCols, lebar kolom, dll) dimulai dari awal
+        self.__sumCols = {}
+        self.__tableHeader = []
+        self.__flagBody = False
+        self.__dataHeader = dataHeader
+        self.__tableHeaderRaw = tableHeader
+        self.__sheetName = sheetName
+        self.__rollover = 1
+        self.__colWidth = ColWidthEstimator(self.__autofit, self.__sampleRows, self.__listDateTimeFormat[0])
+
         self.__defineTableHeader(tableHeader)
-        self.__setHeader(dataHeader)
-        self.__setTableHeader(tableHeader)
+        self.__newWorksheet(sheetName)
         self.__defineMaxCharCols()
+        self.setColsMeta(colWidths or {})
+
+    def __newWorksheet(self, sheetName: str) -> None:
+        # buat worksheet dan tulis header & table header dari table yang sedang aktif
+        self.__ws = self.__wb.add_worksheet(sheetName)
+        self.__sheets.append((self.__ws, self.__tableHeader, self.__colWidth))
+        self.__row_count = 2
+        self.__commit = True
+        self.__last_col = 0
+
+        self.__setHeader(self.__dataHeader)
+        self.__setTableHeader(self.__tableHeaderRaw)
+
+    def __rolloverSheet(self) -> None:
+        '''
+            Dipanggil ketika row sudah mencapai maxRows, lanjutkan table yang sama di sheet baru.
+            sumCols & lebar kolom tetap dilanjutkan karena masih satu table. Contoh nama sheet: 'Sheet1', 'Sheet1 (2)', 'Sheet1 (3)'
+        '''
+        self.__rollover += 1
+        suffix = f" ({self.__rollover})"
+        # nama worksheet maksimal 31 char
+        self.__newWorksheet(self.__sheetName[:31 - len(suffix)] + suffix)
+
+        if self.__row_count > self.__maxRows:
+            raise Exception(
+                f"Maaf, maxRows ({self.__maxRows}) terlalu kecil, tidak cukup untuk header & table header!"
+            )
+
+    def addSheet(self, sheetName: str, dataHeader: list = None, tableHeader: list = None, colWidths: Dict = None) -> None:
+        '''
+            Tambah worksheet baru pada workbook yang sama, pemanggilan insertRow() / insertBody() berikutnya akan ditulis ke sheet ini.
+            Jika dataHeader / tableHeader tidak diisi, maka pakai dataHeader / tableHeader sheet sebelumnya.
+        '''
+        self.__initSheet(
+            sheetName=sheetName,
+            dataHeader=self.__dataHeader if dataHeader is None else dataHeader,
+            tableHeader=self.__tableHeaderRaw if tableHeader is None else tableHeader,
+            colWidths=colWidths
+        )
+
+    def insertSheets(self, sheets: Dict[str, Iterable], format: Dict = {}) -> None:
+        '''
+            Tulis beberapa sheet sekaligus, tiap sheet diisi dari iterator row (list / generator dict) masing-masing. Contoh:
+                excel = ExcelBuilder(dataHeader, tableHeader, sheetName='2023')
+                excel.insertSheets({'2023': data_2023, '2024': data_2024})
+            Sheet yang namanya sama dengan sheet aktif dan belum ada body-nya akan ditulis di sheet aktif, selain itu dibuatkan sheet baru.
+            Tiap sheet tetap otomatis lanjut ke sheet baru jika melebihi maxRows.
+        '''
+        for sheetName, dataBody in sheets.items():
+            if sheetName != self.__sheetName or self.__flagBody:
+                self.addSheet(sheetName)
+            self.insertBody(dataBody, format)
 
     def __createCellFormats(self) -> None:
         # no format
@@ -107,10 +202,13 @@ class ExcelBuilder():
         }
 
     def __get_huruf(self, index) -> str:
-        return get_column_letter(index + 1)
+        # 0 -> 'A', 26 -> 'AA' (sebelumnya openpyxl.utils, yang import-nya ikut memuat seluruh openpyxl)
+        from xlsxwriter.utility import xl_col_to_name
+        return xl_col_to_name(index)
 
     def __getIndexHuruf(self, huruf) -> int:
-        index_huruf = column_index_from_string(huruf)
+        from xlsxwriter.utility import xl_cell_to_rowcol
+        index_huruf = xl_cell_to_rowcol(f"{huruf}1")[1] + 1
         return index_huruf + 1
 
     def __defineTableHeader(self, tableHeader) -> None:
@@ -130,41 +228,51 @@ class ExcelBuilder():
                 self.__tableHeader.append(header.upper())
 
     def __defineMaxCharCols(self) -> None:
-        # method untuk membuat variabel penampung max char per kolom
-        self.__maxCharCols = {}
+        # method untuk set lebar minimum per kolom
         for count, value in enumerate(self.__tableHeader):
             # nilai default panjang col adalah panjang dari table header-nya,
             # misal, thead = 'NAMA' maka default width untuk col 'NAMA' adalah 4
-            self.__maxCharCols[count] = len(value)
-
-    def __computeColsWidth(self, dataRow) -> None:
-        # method ini digunakan untuk hitung ulang lebar minimum suatu kolom
-        for index, val in enumerate(dataRow):
-            # get len_val
-            if isinstance(val, tuple):
-                val = '' if val[0] is None else str(val[0])
-                len_val = len(val)
-            else:
-                val = '' if val is None else str(val)
-                len_val = len(val)
+            self.__colWidth.setDefault(count, len(value))
 
-            # update maxCharCols
-            if self.__maxCharCols.get(index) is None:
-                self.__maxCharCols[index] = 0
-            if len_val > self.__maxCharCols[index]:
-                self.__maxCharCols[index] = len_val
+    def __columnIndex(self) -> Dict[str, int]:
+        # mapping nama table header -> index kolom, contoh {'NO': 0, 'NAMA': 1}
+        return {header: count for count, header in enumerate(self.__tableHeader)}
+
+    def setColsMeta(self, colWidths: Dict) -> None:
+        '''
+            Set lebar kolom dari metadata yang dideklarasikan per table header, sehingga kolom tsb tidak perlu diukur per row.
+            Contoh: {'NAMA': 30, 'DPP': {'type': 'numeric', 'precision': 12, 'scale': 2}, 'TANGGAL': {'type': 'date'}}
+        '''
+        columnIndex = self.__columnIndex()
+        for header, meta in colWidths.items():
+            index = columnIndex.get(header.upper())
+            if index is None:
+                raise Exception(
+                    f"Maaf, kolom '{header}' tidak ada! Berikut kolom yang ada: {self.__tableHeader}"
+                )
+            self.__colWidth.setFromMeta(index, meta)
+
+    def setColsFromDescription(self, description: list) -> None:
+        '''
+            Set lebar kolom dari cursor.description hasil query (DBResponse.description),
+            panjang varchar, precision numeric, dan format tanggal dipakai untuk menentukan lebar kolom. Contoh:
+                hasil = db.execute(query, param)
+                excel.setColsFromDescription(hasil.description)
+                excel.insertBody(hasil.result)
+        '''
+        self.__colWidth.setFromDescription(description, self.__columnIndex())
 
     def __setColsWidth(self) -> None:
-        # jika table header adalah NO
-        if self.__tableHeader[0][0:2] == 'NO':
-            self.__maxCharCols[0] = 0
-        for count in range(len(self.__maxCharCols)):
-            # set lebar col berdasarkan panjang char tiap cell ditambah 5
-            width = self.__maxCharCols[count] + 5
-            # proteksi, panjang maksimal setelah di-tambah 5 adalah 50
-            width = 50 if width > 50 else width
-            col = f"{self.__get_huruf(count)}:{self.__get_huruf(count)}"
-            self.__ws.set_column(col, width=width)
+        for ws, tableHeader, colWidth in self.__sheets:
+            for count in range(colWidth.columnCount()):
+                # set lebar col berdasarkan panjang char tiap cell ditambah 5
+                # jika table header adalah NO, maka lebar-nya cukup 5
+                maxChar = 0 if count == 0 and tableHeader[0][0:2] == 'NO' else colWidth.getMaxChar(count)
+                width = maxChar + 5
+                # proteksi, panjang maksimal setelah di-tambah 5 adalah 50
+                width = 50 if width > 50 else width
+                col = f"{self.__get_huruf(count)}:{self.__get_huruf(count)}"
+                ws.set_column(col, width=width)
 
     def __setHeader(self, dataHeader) -> None:
         lenCol = len(self.__tableHeader) - 1
@@ -210,6 +318,10 @@ class ExcelBuilder():
                 )
             self.__row_count += 1
         else:
+            # thead nested ditulis bolak-balik antara 2 row, pada constant_memory row pertama sudah di-flush ke file
+            if self.__constantMemory:
+                raise Exception("Maaf, table header nested tidak didukung pada mode constantMemory!")
+
             # tableHeader -> ['NO', ['HARI', 'SENIN', 'SELASA]]
             for count, value in enumerate(tableHeader):
                 if isinstance(value, list) and len(value) > 1:
@@ -311,7 +423,12 @@ class ExcelBuilder():
         # jika user bikin format sendiri, maka kita buatkan formatnya
         # param toDict digunakan untuk return cell_format dalam bentuk dict jika True
         if isinstance(cell_format, dict):
-            return cell_format if toDict else self.__wb.add_format(cell_format)
+            if toDict:
+                return cell_format
+            key = repr(sorted(cell_format.items()))
+            if key not in self.__formatCache:
+                self.__formatCache[key] = self.__wb.add_format(cell_format)
+            return self.__formatCache[key]
         elif isinstance(cell_format, str):
             # jika format yg diberikan user tidak ada maka gunakan default format
             return self.__listFormatRaw.get(cell_format, {}) if toDict else self.__listFormat.get(cell_format, v_defaultFormat)
@@ -425,14 +542,19 @@ class ExcelBuilder():
             # contoh return -> ('TANGGAL', 'A', 6, <xlsxwriter.format.Format object at 0x25A>)
             return r_cell_value, r_end_col, r_end_row, r_cell_format
 
-    def __insertRow(self, dataRow: list, defaultFormat=None, commit=True) -> None:
+    def __insertRow(self, dataRow: list, defaultFormat=None, commit=True, sampled=False) -> None:
         # jika commit False, berarti masih melanjutkan dari lastCol terakhir,
         # jika commit True, berarti kita mulai dari 0 ya (kaya pertamina)
         self.__last_col = 0 if self.__commit else self.__last_col
 
+        # jika row sudah mencapai batas maxRows, lanjutkan di sheet baru
+        if self.__commit and self.__row_count > self.__maxRows:
+            self.__rolloverSheet()
+
         # ngoding itu sulit ya :')
-        # v_dataRow digunakan untuk menampung dataRow yg akan di-hitung panjang char-nya
-        v_dataRow = []
+        # tiap cell yg ditulis langsung diukur panjang char-nya pada index kolom-nya,
+        # ini bertujuan untuk menentukan panjang/width tiap kolom (auto fit cells width).
+        # sampled=True (row dari insertBody) hanya diukur sesuai mode autofit
         for data in dataRow:
             cell_value, end_col, end_row, cell_format = self.__decodeCellData(
                 data, defaultFormat
@@ -441,31 +563,14 @@ class ExcelBuilder():
                 self.__ws.write(
                     f"{self.__get_huruf(self.__last_col)}{self.__row_count}", cell_value, cell_format
                 )
-                v_dataRow.append(cell_value)
+                self.__colWidth.observe(self.__last_col, cell_value, sampled)
             else:
+                # untuk cell yg merge tidak dihitung panjang char-nya
                 self.__ws.merge_range(
                     f"{self.__get_huruf(self.__last_col)}{self.__row_count}:{end_col}{end_row}", cell_value, cell_format
                 )
-                # untuk cell yg merge tidak dihitung ulang panjang char tiap cell, sehingga di-isi oleh ''
-                v_dataRow.extend(
-                    ['' for i in range(self.__getIndexHuruf(end_col) - 1)]
-                )
             self.__last_col = self.__getIndexHuruf(end_col) - 1
 
-        # tiap kali insert row maka wajib hitung ulang panjang char tiap cell,
-        # ini bertujuan untuk menentukan panjang/width tiap kolom (auto fit cells width)
-        if not commit:
-            self.__dataRowTemp.extend(v_dataRow)
-        elif commit:
-            if len(self.__dataRowTemp) > 0:
-                self.__dataRowTemp.extend(v_dataRow)
-                self.__computeColsWidth(self.__dataRowTemp)
-                self.__dataRowTemp.clear()
-            else:
-                self.__computeColsWidth(v_dataRow)
-        else:
-            self.__dataRowTemp.clear()
-
         # insert row sudah selesai, maka tak lupa tambah row_count
         if commit:
             self.__row_count += 1
@@ -477,8 +582,6 @@ class ExcelBuilder():
             Ilustrasi: kalau insertRow commit False itu seperti print di terminal tapi nggak ada \n (enter),
                 nah kalau mau enter kan print('\n'), commitRow() ini seperti itu juga gunanya.
         '''
-        self.__computeColsWidth(self.__dataRowTemp)
-        self.__dataRowTemp.clear()
         self.__row_count += 1
         self.__last_col = 0
 
@@ -500,9 +603,7 @@ class ExcelBuilder():
                         f"Maaf, kolom '{data_key}' tidak ada! Berikut kolom yang ada: {self.__sumCols}"
                     )
                 # compute grand total
-                if self.__sumCols.get(f'GRAND_{data_key}') is None:
-                    self.__sumCols[f'GRAND_{data_key}'] = Decimal(0)
-                self.__sumCols[f'GRAND_{data_key}'] += Decimal(data_value)
+                self.__sumCols[f'GRAND_{data_key}'] = addSum(self.__sumCols.get(f'GRAND_{data_key}'), data_value)
             elif self.__flagBody is False:
                 data = 0.0
         elif isinstance(data, str):
@@ -523,7 +624,7 @@ class ExcelBuilder():
         # tiap kali insert body sumCols dihitung ulang
         for k, v in self.__sumCols.items():
             if k.upper()[0:6] != 'GRAND_':
-                self.__sumCols[k] = Decimal(0)
+                self.__sumCols[k] = type(v)(0)
 
         for count, data in enumerate(dataBody, 1):
             if len(data) == 0:
@@ -539,12 +640,10 @@ class ExcelBuilder():
                 if type(v) in {Decimal, float}:
                     try:
                         # compute normal sum
-                        if self.__sumCols.get(k) is None:
-                            self.__sumCols[k] = Decimal(0)
-                        self.__sumCols[k] += Decimal(v)
+                        self.__sumCols[k] = addSum(self.__sumCols.get(k), v)
                         # define grand sum
                         if self.__sumCols.get(f'GRAND_{k}') is None:
-                            self.__sumCols[f'GRAND_{k}'] = Decimal(0)
+                            self.__sumCols[f'GRAND_{k}'] = type(v)(0)
                     except Exception as e:
                         pesan = f'error di compute normal sum: {e}'
                         raise Exception(pesan)
@@ -579,7 +678,7 @@ class ExcelBuilder():
                 dataRow = [data.get(i.upper(), '') for i in self.__tableHeader]
 
             # begin insert row
-            self.__insertRow(dataRow)
+            self.__insertRow(dataRow, sampled=True)
             self.__flagBody = True
 
     def insertRow(self, dataRow, defaultFormat=None, commit: bool = True) -> None:
@@ -610,7 +709,7 @@ class ExcelBuilder():
         self.__wb.close()
         self.__ouputFile.seek(0)
 
-        return send_file(self.__ouputFile, mimetype="application/vnd.ms-excel", as_attachment=True, download_name=f'{fileName}.xlsx', max_age=-1)
+        return send_file(self.__ouputFile, mimetype="application/vnd.ms-excel", as_attachment=True, download_name=f'{fileName}.xlsx', max_age=0)
 
     def saveToFile(self, fileName) -> None:
         # method ini untuk save file excel ke direktori lokal,
@@ -620,4 +719,13 @@ class ExcelBuilder():
         self.__ouputFile.seek(0)
 
         with open(f'{fileName}.xlsx', 'wb') as outfile:
-            outfile.write(self.__ouputFile.getbuffer())
+            shutil.copyfileobj(self.__ouputFile, outfile)
+
+    def saveToStream(self, stream) -> None:
+        # method ini untuk tulis file excel ke file object (hasil open(..., 'wb'), BytesIO, dll),
+        # dipakai oleh export job di background thread yang tidak punya flask request context
+        self.__setColsWidth()
+        self.__wb.close()
+        self.__ouputFile.seek(0)
+
+        shutil.copyfileobj(self.__ouputFile, stream)
@@ -0,0 +1,209 @@
+"""
+    Modul excelColWidth, pendamping ExcelBuilder untuk estimasi lebar kolom (autofit).
+    Versi: 1.0 (19 Okt 2026)
+
+    Sebelumnya ExcelBuilder menghitung str(val) + len() untuk SETIAP cell di SETIAP row,
+    sehingga autofit sama saja dengan 1x full scan tambahan atas seluruh data.
+    Modul ini menyediakan 3 mode:
+        1. 'full'   : ukur semua row (perilaku lama).
+        2. 'sample' : hanya ukur N row pertama tiap kolom (default).
+        3. 'meta'   : tidak ukur row sama sekali, lebar diambil dari metadata / table header saja.
+    Di semua mode, kolom yang lebarnya sudah diketahui dari metadata (setFixed / setFromMeta / setFromDescription)
+    langsung di-cache dan tidak diukur ulang.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Union
+
+# OID tipe data postgres (pg_type), dipakai untuk membaca cursor.description
+PG_BOOL = 16
+PG_INT8 = 20
+PG_INT2 = 21
+PG_INT4 = 23
+PG_TEXT = 25
+PG_FLOAT4 = 700
+PG_FLOAT8 = 701
+PG_MONEY = 790
+PG_BPCHAR = 1042
+PG_VARCHAR = 1043
+PG_DATE = 1082
+PG_TIME = 1083
+PG_TIMESTAMP = 1114
+PG_TIMESTAMPTZ = 1184
+PG_NUMERIC = 1700
+PG_UUID = 2950
+
+# panjang maksimal char untuk tipe data dgn ukuran tetap (sudah termasuk tanda minus)
+FIXED_TYPE_LENGTH = {
+    PG_BOOL: 5,
+    PG_INT2: 6,
+    PG_INT4: 11,
+    PG_INT8: 20,
+    PG_TIME: 8,
+    PG_UUID: 36,
+}
+
+
+def numericLength(precision: int, scale: int = 2) -> int:
+    '''
+        Hitung panjang char angka yang sudah diformat rupiah oleh ExcelBuilder,
+        contoh numeric(8, 2) -> '-123.456,78' -> 11 char.
+        Nilai float/Decimal selalu ditulis dgn 2 angka dibelakang koma.
+    '''
+    intDigits = max(precision - (scale or 0), 1)
+    separator = (intDigits - 1) // 3
+    # 1 untuk tanda minus, 3 untuk ',' + 2 angka desimal
+    return 1 + intDigits + separator + 3
+
+
+def dateLength(dateTimeFormat: str) -> int:
+    # pakai tanggal dgn nama bulan & hari terpanjang, biar aman
+    return len(datetime(2000, 9, 28, 23, 59, 59).strftime(dateTimeFormat))
+
+
+def valueLength(value) -> int:
+    '''
+        Panjang char dari cell_value yang sudah di-decode ExcelBuilder (mayoritas str / int),
+        str langsung len() tanpa konversi ulang.
+    '''
+    if value is None:
+        return 0
+    if isinstance(value, tuple):
+        return valueLength(value[0])
+    if isinstance(value, str):
+        return len(value)
+    return len(str(value))
+
+
+class ColWidthEstimator:
+    MODES = ('full', 'sample', 'meta')
+
+    def __init__(self, mode: str = 'sample', sampleRows: int = 500, dateTimeFormat: str = '%d %b %Y') -> None:
+        if mode not in ColWidthEstimator.MODES:
+            raise ValueError(f"Mode autofit '{mode}' tidak dikenal! Pilih salah satu: {ColWidthEstimator.MODES}")
+
+        self.__mode = mode
+        self.__sampleRows = sampleRows
+        self.__dateTimeFormat = dateTimeFormat
+        # index kolom -> panjang char maksimal hasil pengukuran
+        self.__maxChar: Dict[int, int] = {}
+        # index kolom -> panjang char dari metadata (cache, tidak diukur ulang)
+        self.__fixed: Dict[int, int] = {}
+        # index kolom -> jumlah row yang sudah diukur (untuk mode 'sample')
+        self.__sampled: Dict[int, int] = {}
+
+    @property
+    def mode(self) -> str:
+        return self.__mode
+
+    def setDefault(self, index: int, length: int) -> None:
+        # lebar minimal kolom, biasanya panjang table header-nya
+        self.__maxChar[index] = max(self.__maxChar.get(index, 0), length)
+
+    def setFixed(self, index: int, length: int) -> None:
+        # lebar kolom sudah pasti, sehingga kolom ini tidak perlu diukur lagi
+        self.__fixed[index] = length
+
+    def isFixed(self, index: int) -> bool:
+        return index in self.__fixed
+
+    def lengthFromMeta(self, meta: Union[int, dict]) -> Union[int, None]:
+        '''
+            Decode metadata kolom menjadi panjang char. Contoh metadata:
+                - 20                                          -> lebar 20
+                - {'width': 20}                               -> lebar 20
+                - {'type': 'numeric', 'precision': 12, 'scale': 2}
+                - {'type': 'int'}                             -> int4
+                - {'type': 'date', 'format': '%d-%m-%Y'}
+                - {'max_length': 50}                          -> varchar(50)
+            Return None jika metadata tidak cukup untuk menentukan lebar.
+        '''
+        if isinstance(meta, int):
+            return meta
+        if not isinstance(meta, dict):
+            return None
+
+        if meta.get('width') is not None:
+            return meta['width']
+
+        tipe = meta.get('type')
+        if tipe == 'numeric' and meta.get('precision'):
+            return numericLength(meta['precision'], meta.get('scale', 2))
+        elif tipe == 'int':
+            return FIXED_TYPE_LENGTH[PG_INT8 if meta.get('big') else PG_INT4]
+        elif tipe == 'date':
+            return dateLength(meta.get('format', self.__dateTimeFormat))
+        elif meta.get('max_length'):
+            return meta['max_length']
+
+        return None
+
+    def setFromMeta(self, index: int, meta: Union[int, dict]) -> bool:
+        length = self.lengthFromMeta(meta)
+        if length is None:
+            return False
+
+        self.setFixed(index, length)
+        return True
+
+    def lengthFromColumn(self, column) -> Union[int, None]:
+        '''
+            Decode 1 item cursor.description (psycopg2.extensions.Column) menjadi panjang char,
+            https://www.psycopg.org/docs/extensions.html#psycopg2.extensions.Column
+        '''
+        type_code = column.type_code
+        if type_code in FIXED_TYPE_LENGTH:
+            return FIXED_TYPE_LENGTH[type_code]
+        elif type_code == PG_NUMERIC and column.precision:
+            return numericLength(column.precision, column.scale)
+        elif type_code in {PG_FLOAT4, PG_FLOAT8, PG_MONEY}:
+            # float selalu diformat rupiah dgn 2 angka desimal, asumsi maksimal ratusan triliun
+            return numericLength(15)
+        elif type_code in {PG_DATE, PG_TIMESTAMP, PG_TIMESTAMPTZ}:
+            return dateLength(self.__dateTimeFormat)
+        elif type_code in {PG_VARCHAR, PG_BPCHAR} and column.internal_size and column.internal_size > 0:
+            return column.internal_size
+
+        # text / varchar tanpa panjang / tipe lain tidak bisa ditebak, biar diukur dari data
+        return None
+
+    def setFromDescription(self, description: List, columnIndex: Dict[str, int]) -> None:
+        '''
+            description: cursor.description (lihat DBResponse.description)
+            columnIndex: mapping nama kolom (upper) -> index kolom di excel
+        '''
+        for column in description:
+            index = columnIndex.get(column.name.upper())
+            if index is None or self.isFixed(index):
+                continue
+
+            length = self.lengthFromColumn(column)
+            if length is not None:
+                self.setFixed(index, length)
+
+    def observe(self, index: int, value, sampled: bool = True) -> None:
+        '''
+            Ukur panjang char cell_value pada kolom index.
+            sampled=False berarti row wajib diukur walau sample sudah penuh (misal row total / SUM).
+        '''
+        if index in self.__fixed or self.__mode == 'meta':
+            return
+
+        if sampled and self.__mode == 'sample':
+            count = self.__sampled.get(index, 0)
+            if count >= self.__sampleRows:
+                return
+            self.__sampled[index] = count + 1
+
+        length = valueLength(value)
+        if length > self.__maxChar.get(index, 0):
+            self.__maxChar[index] = length
+
+    def getMaxChar(self, index: int) -> int:
+        if index in self.__fixed:
+            return max(self.__fixed[index], self.__maxChar.get(index, 0))
+        return self.__maxChar.get(index, 0)
+
+    def columnCount(self) -> int:
+        indexes = set(self.__maxChar) | set(self.__fixed)
+        return max(indexes) + 1 if indexes else 0
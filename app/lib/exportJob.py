@@ -0,0 +1,235 @@
+"""
+    Modul exportJob, antrian export (excel / csv) yang dijalankan di background.
+    Versi: 1.0 (19 Okt 2026)
+
+    Export besar (ExcelBuilder.createExcel) yang jalan di request thread bisa menghabiskan seluruh thread gunicorn,
+    sehingga dashboard ikut macet. Modul ini menjalankan export di worker pool terpisah yang jumlahnya dibatasi,
+    hasil export disimpan di spool directory lokal, progress bisa di-poll lewat endpoint,
+    dan file dihapus otomatis setelah TTL habis.
+
+    State job disimpan di file <job_id>.json pada spool directory (bukan di memory),
+    sehingga status & download tetap bisa diakses dari worker gunicorn lain pada host yang sama.
+
+    Export berjalan di dalam proses worker gunicorn, sehingga ikut mati ketika worker di-restart / dimatikan.
+    Hook worker_exit di gunicorn.conf.py memanggil abort() agar job yang belum selesai ditandai 'error'
+    (tidak tertahan 'running' selamanya), dan max_requests default 0 selama EXPORT_WORKERS > 0.
+"""
+
+import json
+import os
+import re
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Dict, Iterable, Iterator, Union
+from uuid import uuid4
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ExportJobFull(Exception):
+    """
+    Raise ketika antrian export sudah penuh (jumlah job yang menunggu sudah mencapai max_pending)
+    """
+
+    def __str__(self) -> str:
+        return "Antrian export sedang penuh, silahkan coba beberapa saat lagi!"
+
+
+class ExportJob:
+    '''
+        Dikirim sebagai argumen pertama ke fungsi export. Fungsi export wajib menulis file hasil ke job.path,
+        dan boleh update progress pakai job.progress() atau job.track(). Contoh:
+
+            def buat_excel(job, search):
+                hasil = db.execute_stream(query, param)
+                excel = ExcelBuilder(['DATA'], ['NO', 'NAMA'], constantMemory=True)
+                excel.insertBody(job.track(hasil.stream))
+                with open(job.path, 'wb') as f:
+                    excel.saveToStream(f)
+    '''
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_ERROR = 'error'
+
+    def __init__(self, job_id: str, spool_dir: str, file_name: str, mimetype: str) -> None:
+        self.id = job_id
+        self.file_name = file_name
+        self.mimetype = mimetype
+        self.path = os.path.join(spool_dir, f"{job_id}.data")
+        self.__state_path = os.path.join(spool_dir, f"{job_id}.json")
+        self.__state = {
+            'id': job_id,
+            'status': ExportJob.STATUS_QUEUED,
+            'done': 0,
+            'total': None,
+            'file_name': file_name,
+            'mimetype': mimetype,
+            'error': None,
+            'created': time.time(),
+            'updated': time.time(),
+        }
+        self.__last_save = 0.0
+
+    def save_state(self, force: bool = True, **kwargs) -> None:
+        self.__state.update(kwargs)
+        self.__state['updated'] = time.time()
+
+        # update progress cukup maksimal 1x per detik, biar tidak sibuk nulis file
+        if not force and self.__state['updated'] - self.__last_save < 1:
+            return
+        self.__last_save = self.__state['updated']
+
+        # tulis ke file sementara dulu lalu replace, agar pembaca tidak pernah dapat file json setengah jadi
+        temp_path = f"{self.__state_path}.{uuid4().hex[:8]}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.__state, f)
+        os.replace(temp_path, self.__state_path)
+
+    def progress(self, done: int, total: int = None) -> None:
+        self.save_state(force=False, done=done, total=total if total is not None else self.__state['total'])
+
+    def track(self, iterable: Iterable, total: int = None) -> Iterator:
+        '''
+            Bungkus iterable (misal DBResponse.stream) agar progress ter-update otomatis tiap row yang dibaca
+        '''
+        done = 0
+        for done, item in enumerate(iterable, 1):
+            yield item
+            self.progress(done, total)
+        self.save_state(done=done)
+
+
+class ExportJobQueue:
+    def __init__(self, spool_dir: str, max_workers: int = 2, max_pending: int = 20, ttl: int = 3600) -> None:
+        '''
+            spool_dir: directory penyimpanan hasil export
+            max_workers: jumlah export yang boleh jalan bersamaan
+            max_pending: jumlah maksimal job yang menunggu + berjalan, lebih dari itu submit() akan raise ExportJobFull
+            ttl: umur file hasil export (detik), setelah itu dihapus otomatis
+        '''
+        os.makedirs(spool_dir, exist_ok=True)
+        self.__spool_dir = spool_dir
+        self.__max_pending = max_pending
+        self.__ttl = ttl
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export_job')
+        self.__lock = Lock()
+        self.__pending = 0
+        self.__jobs: Dict[str, ExportJob] = {}
+        self.__last_cleanup = 0.0
+
+    def __run(self, job: ExportJob, func: Callable, args: tuple, kwargs: dict) -> None:
+        try:
+            job.save_state(status=ExportJob.STATUS_RUNNING)
+            func(job, *args, **kwargs)
+
+            if not os.path.isfile(job.path):
+                raise FileNotFoundError(f"Fungsi export '{func.__name__}' tidak menulis file ke job.path!")
+
+            job.save_state(status=ExportJob.STATUS_DONE)
+        except Exception as e:
+            time_now = datetime.now().strftime("[%d-%m-%Y %H:%M:%S]")
+            print(f"{time_now} [ERROR] Export job {job.id} gagal:")
+            traceback.print_exc()
+
+            job.save_state(status=ExportJob.STATUS_ERROR, error=f"{type(e).__name__}: {e}")
+            if os.path.isfile(job.path):
+                os.remove(job.path)
+        finally:
+            with self.__lock:
+                self.__pending -= 1
+                self.__jobs.pop(job.id, None)
+
+    def submit(self, func: Callable, file_name: str, mimetype: str, *args, **kwargs) -> str:
+        '''
+            Masukan fungsi export ke antrian, return job_id. func dipanggil dgn func(job, *args, **kwargs).
+            Raise ExportJobFull jika antrian penuh.
+        '''
+        self.cleanup()
+
+        with self.__lock:
+            if self.__pending >= self.__max_pending:
+                raise ExportJobFull()
+            self.__pending += 1
+
+        job = ExportJob(uuid4().hex, self.__spool_dir, file_name, mimetype)
+        job.save_state()
+        with self.__lock:
+            self.__jobs[job.id] = job
+        self.__executor.submit(self.__run, job, func, args, kwargs)
+
+        return job.id
+
+    def abort(self, reason: str) -> int:
+        '''
+            Tandai seluruh job milik proses ini yang masih queued / running sebagai 'error', dipanggil ketika
+            worker akan berhenti (hook worker_exit). Return jumlah job yang ditandai.
+            Thread export tidak dihentikan: jika export sempat selesai sebelum proses mati, status ditimpa lagi jadi 'done'
+        '''
+        with self.__lock:
+            jobs = list(self.__jobs.values())
+
+        for job in jobs:
+            job.save_state(status=ExportJob.STATUS_ERROR, error=reason)
+        return len(jobs)
+
+    def status(self, job_id: str) -> Union[Dict, None]:
+        '''
+            Return dict state job ({'id', 'status', 'done', 'total', 'file_name', 'error', ...}),
+            None jika job tidak ada / sudah kadaluarsa
+        '''
+        self.cleanup()
+
+        # job_id wajib hex uuid, untuk mencegah path traversal
+        if not isinstance(job_id, str) or not JOB_ID_PATTERN.match(job_id):
+            return None
+
+        try:
+            with open(os.path.join(self.__spool_dir, f"{job_id}.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def result(self, job_id: str) -> Union[Dict, None]:
+        '''
+            Return dict {'path', 'file_name', 'mimetype'} jika export sudah selesai, None jika belum / gagal / kadaluarsa
+        '''
+        state = self.status(job_id)
+        if state is None or state['status'] != ExportJob.STATUS_DONE:
+            return None
+
+        path = os.path.join(self.__spool_dir, f"{job_id}.data")
+        if not os.path.isfile(path):
+            return None
+
+        return {
+            'path': path,
+            'file_name': state['file_name'],
+            'mimetype': state['mimetype'],
+        }
+
+    def cleanup(self, force: bool = False) -> int:
+        '''
+            Hapus file di spool directory yang umurnya sudah lebih dari TTL, maksimal dicek 1x per menit.
+            Return jumlah file yang dihapus.
+        '''
+        now = time.time()
+        if not force and now - self.__last_cleanup < 60:
+            return 0
+        self.__last_cleanup = now
+
+        removed = 0
+        for entry in os.scandir(self.__spool_dir):
+            try:
+                if entry.is_file() and now - entry.stat().st_mtime > self.__ttl:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                # sudah dihapus oleh worker lain
+                continue
+
+        return removed
@@ -0,0 +1,62 @@
+"""
+    Modul fetchMode, typecaster yang lebih ringan untuk hasil query PostgresDatabase.
+    Versi: 1.0 (19 Okt 2026)
+
+    Secara default psycopg2 membuat object Decimal untuk NUMERIC dan date / datetime untuk tanggal di setiap cell,
+    padahal endpoint JSON & Excel ujung-ujungnya hanya butuh angka / string. fetch_mode mengganti typecaster per cursor
+    (tidak mengubah koneksi di pool, sehingga query lain tetap dapat tipe bawaan):
+        - 'float': NUMERIC -> float (pakai typecaster FLOAT bawaan psycopg2 yang ditulis dalam C),
+          hanya untuk data yang tidak butuh presisi desimal pasti (misal laporan / grafik, bukan perhitungan uang)
+        - 'json' : 'float' + DATE / TIME / TIMESTAMP / TIMESTAMPTZ / INTERVAL dikembalikan apa adanya sebagai string
+          dari postgres (tanggal format ISO '2023-01-31 10:00:00+07' dgn DateStyle default, interval '1 day'),
+          sehingga langsung bisa di-jsonify tanpa konversi ulang
+    Selain itu PostgresDatabase.columnar = True menampung hasil per kolom (DBResponse.columnar) tanpa membuat dict per row.
+"""
+
+from psycopg2.extensions import (
+    DATE, DECIMAL, FLOAT, PYDATETIME, PYDATETIMETZ, PYINTERVAL, TIME, UNICODE,
+    new_array_type, new_type, register_type,
+)
+from typing import List
+
+FETCH_MODES = (None, 'float', 'json')
+
+# oid array dari tipe di atas: numeric[], date[], time[], timetz[], timestamp[], timestamptz[], interval[]
+NUMERIC_ARRAY_OID = 1231
+TEMPORAL_ARRAY_OIDS = (1182, 1183, 1270, 1115, 1185, 1187)
+
+NUMERIC_FLOAT = new_type(DECIMAL.values, 'NUMERIC_FLOAT', FLOAT)
+NUMERIC_FLOAT_ARRAY = new_array_type((NUMERIC_ARRAY_OID,), 'NUMERIC_FLOAT_ARRAY', NUMERIC_FLOAT)
+
+TEMPORAL_STRING = new_type(DATE.values + TIME.values + PYDATETIME.values + PYDATETIMETZ.values + PYINTERVAL.values, 'TEMPORAL_STRING', UNICODE)
+TEMPORAL_STRING_ARRAY = new_array_type(TEMPORAL_ARRAY_OIDS, 'TEMPORAL_STRING_ARRAY', TEMPORAL_STRING)
+
+TYPECASTERS = {
+    None: [],
+    'float': [NUMERIC_FLOAT, NUMERIC_FLOAT_ARRAY],
+    'json': [NUMERIC_FLOAT, NUMERIC_FLOAT_ARRAY, TEMPORAL_STRING, TEMPORAL_STRING_ARRAY],
+}
+
+
+def validateFetchMode(fetch_mode: str) -> str:
+    if fetch_mode not in FETCH_MODES:
+        raise ValueError(f"fetch_mode '{fetch_mode}' tidak dikenal, pilih salah satu dari {FETCH_MODES}")
+    return fetch_mode
+
+
+def registerFetchMode(cursor, fetch_mode: str) -> None:
+    '''
+        Pasang typecaster fetch_mode pada cursor (hanya berlaku untuk cursor ini)
+    '''
+    for typecaster in TYPECASTERS[fetch_mode]:
+        register_type(typecaster, cursor)
+
+
+def toColumnar(description, rows: List[tuple]) -> dict:
+    '''
+        Ubah list row (tuple) jadi dict kolom -> list nilai, contoh {'id': [1, 2], 'name': ['budi', 'candra']}
+    '''
+    columns = [column[0] for column in description]
+    if not rows:
+        return {column: [] for column in columns}
+    return dict(zip(columns, map(list, zip(*rows))))
@@ -0,0 +1,130 @@
+"""
+    Modul httpResponse, middleware response: kompresi & conditional request (ETag / 304).
+    Versi: 1.0 (19 Okt 2026)
+
+    Dipasang lewat configureHttpResponse(app) di app/__init__.py, berlaku untuk seluruh response (after_request):
+        - response teks (JSON, HTML, CSS, JS, CSV, dll) di atas min_size byte dikompres br (jika modul brotli terinstall)
+          atau gzip, sesuai header Accept-Encoding dari client
+        - response JSON (GET) diberi weak ETag (hash isi body) + Cache-Control: private, no-cache,
+          jika client mengirim If-None-Match yang sama maka dijawab 304 tanpa body
+    Response stream (execute_stream / copy_stream / send_file) tidak disentuh, file xlsx / gambar / pdf juga tidak
+    dikompres ulang karena isinya sudah terkompresi.
+    Untuk DataTables, nilai 'draw' selalu berubah tiap request sehingga ETag dihitung tanpa 'draw' lewat jsonPage(),
+    lihat juga dt_options.etag pada dt_server() di static/others/tambahanCdr.js.
+"""
+
+import gzip
+from hashlib import blake2b
+from flask import Flask, Response, current_app, request
+from typing import Iterable
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+    'text/css',
+    'text/csv',
+    'text/html',
+    'text/javascript',
+    'text/plain',
+    'text/xml',
+}
+
+
+def weakEtag(data: bytes) -> str:
+    return blake2b(data, digest_size=16).hexdigest()
+
+
+def encodeJSON(obj) -> bytes:
+    provider = current_app.json
+    return provider.encode(obj) if hasattr(provider, 'encode') else provider.dumps(obj).encode('utf-8')
+
+
+def jsonPage(payload: dict, volatile: Iterable[str] = ('draw',)) -> Response:
+    '''
+        Response JSON dengan weak ETag yang tidak ikut menghitung key volatile (misal 'draw' DataTables),
+        sehingga redraw dengan data yang sama tetap bisa dijawab 304. example::
+
+            return jsonPage({'draw': dt.draw, 'recordsFiltered': hasil.dt_total, 'data': hasil.result})
+    '''
+    volatile = [key for key in volatile if key in payload]
+    body = encodeJSON({key: value for key, value in payload.items() if key not in volatile})
+    etag = weakEtag(body)
+
+    # key volatile disisipkan di depan object: '{"draw":1' + ',' + '"recordsFiltered":...}'
+    if volatile:
+        head = encodeJSON({key: payload[key] for key in volatile})
+        body = head[:-1] + (b',' + body[1:] if len(body) > 2 else b'}')
+
+    response = current_app.response_class(body + b'\n', mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    return response
+
+
+class HttpResponseMiddleware:
+    def __init__(self, min_size: int = 1024, level: int = 6) -> None:
+        '''
+            min_size: ukuran body minimal (byte) untuk dikompres, body kecil tidak sebanding dgn overhead kompresi
+            level: level kompresi gzip (1-9), brotli memakai quality yang setara
+        '''
+        self.min_size = min_size
+        self.level = level
+
+    def init_app(self, app: Flask) -> None:
+        app.after_request(self.process)
+
+    def process(self, response: Response) -> Response:
+        if response.status_code != 200 or response.direct_passthrough or response.is_streamed:
+            return response
+
+        if request.method in ('GET', 'HEAD') and response.mimetype == 'application/json':
+            self.__conditional(response)
+            if response.status_code == 304:
+                return response
+
+        self.__compress(response)
+        return response
+
+    def __conditional(self, response: Response) -> None:
+        if response.get_etag()[0] is None:
+            response.set_etag(weakEtag(response.get_data()), weak=True)
+        if not response.cache_control:
+            # data boleh disimpan browser, tapi wajib dicek ulang (If-None-Match) setiap dipakai
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+        response.make_conditional(request)
+
+    def __compress(self, response: Response) -> None:
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers:
+            return
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return
+
+        encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli is not None else ['gzip'])
+        if encoding == 'br':
+            data = brotli.compress(data, quality=min(self.level, 11))
+        elif encoding == 'gzip':
+            data = gzip.compress(data, compresslevel=self.level)
+        else:
+            return
+
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+
+
+http_response = HttpResponseMiddleware()
+
+
+def configureHttpResponse(app: Flask, min_size: int = 1024, level: int = 6) -> None:
+    http_response.min_size = min_size
+    http_response.level = level
+    http_response.init_app(app)
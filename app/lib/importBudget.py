@@ -0,0 +1,94 @@
+"""
+    Modul importBudget, pantau waktu import aplikasi (cold start Cloud Run).
+    Versi: 1.0 (19 Okt 2026)
+
+    - Ketika app selesai di-import, waktu import dibandingkan dgn budget (config.IMPORT_BUDGET_MS). Jika lewat budget,
+      atau ada modul berat (LAZY_MODULES) yang ikut ter-import di awal, dicetak WARNING beserta nama modulnya.
+      Modul berat seharusnya baru di-import ketika pertama kali dipakai (lihat app/lib/__init__.py).
+    - Laporan lengkap per package (hasil python -X importtime, dijalankan di proses terpisah):
+        flask --app main import-report [--top 15]
+      exit code 1 jika total waktu import lewat budget, sehingga bisa dipakai sebagai pengecekan ketika build.
+"""
+
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+import click
+from flask import Flask
+
+# package berat yang hanya dibutuhkan endpoint tertentu (export excel, upload file, data dummy, print query)
+LAZY_MODULES = ('openpyxl', 'xlsxwriter', 'PIL', 'pikepdf', 'faker', 'sqlparse')
+
+import_budget_ms = 400
+
+TIMED_IMPORT = "import time; started = time.perf_counter(); import {target}; print((time.perf_counter() - started) * 1000)"
+
+
+def eagerModules() -> List[str]:
+    '''
+        Modul di LAZY_MODULES yang sudah ter-import
+    '''
+    return [name for name in LAZY_MODULES if name in sys.modules]
+
+
+def checkImportBudget(started: float, budget_ms: int) -> float:
+    '''
+        started: time.perf_counter() di awal import app, return lama import (ms)
+    '''
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    eager = eagerModules()
+    if elapsed_ms > budget_ms or eager:
+        time_now = datetime.now().strftime("[%d-%m-%Y %H:%M:%S]")
+        detail = f", modul berat ter-import di awal: {eager}" if eager else ""
+        print(f"{time_now} [WARNING] Import app {elapsed_ms:.0f} ms (budget {budget_ms} ms){detail}, cek: flask --app main import-report")
+    return elapsed_ms
+
+
+def runImport(target: str, *args: str) -> subprocess.CompletedProcess:
+    process = subprocess.run([sys.executable, *args, '-c', TIMED_IMPORT.format(target=target)], capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Gagal import {target}:\n{process.stderr[-2000:]}")
+    return process
+
+
+def importReport(target: str = 'main') -> Tuple[float, Dict[str, float]]:
+    '''
+        Import target di proses python baru, return (total ms, {package top-level: ms}).
+        Total diukur tanpa instrumentasi, rincian per package dari -X importtime (waktu import / self seluruh
+        submodule-nya, sedikit lebih lambat dari aslinya karena overhead pencatatan)
+    '''
+    # baris terakhir stdout, baris sebelumnya bisa berisi print dari app (misal WARNING budget)
+    total_ms = float(runImport(target).stdout.strip().splitlines()[-1])
+    process = runImport(target, '-X', 'importtime')
+
+    packages: Dict[str, float] = {}
+    for line in process.stderr.splitlines():
+        # import time:       714 |      51005 |       flask.app
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        package = parts[2].strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(parts[0]) / 1000
+
+    return total_ms, packages
+
+
+def configureImportBudget(app: Flask, started: float, budget_ms: int) -> None:
+    global import_budget_ms
+    import_budget_ms = budget_ms
+    checkImportBudget(started, budget_ms)
+
+    @app.cli.command('import-report', help='Laporan waktu import aplikasi per package (python -X importtime)')
+    @click.option('--top', default=15, show_default=True, help='Jumlah package yang ditampilkan')
+    def importReportCommand(top: int) -> None:
+        total_ms, packages = importReport()
+        for package, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+            note = '  <- seharusnya lazy' if package in LAZY_MODULES else ''
+            print(f"{ms:9.1f} ms  {package}{note}")
+        print(f"{total_ms:9.1f} ms  TOTAL (budget {import_budget_ms} ms)")
+        if total_ms > import_budget_ms:
+            sys.exit(1)
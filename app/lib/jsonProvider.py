@@ -0,0 +1,130 @@
+"""
+    Modul jsonProvider, JSON provider Flask yang lebih cepat untuk response API.
+    Versi: 1.0 (19 Okt 2026)
+
+    Provider bawaan Flask memakai json stdlib (lambat untuk ribuan dict row hasil DBResponse) dan mengubah tanggal
+    ke format HTTP date. FastJSONProvider memakai orjson jika terinstall (fallback ke json stdlib), dengan aturan:
+        - Decimal -> string (presisi tetap utuh, sama dgn provider bawaan Flask)
+        - datetime / date / time -> string ISO 8601, contoh '2023-01-31T10:00:00+07:00'
+        - UUID -> string
+    Untuk array yang sangat besar (misal hasil execute_stream), pakai jsonStream() agar response dikirim per chunk
+    tanpa menampung seluruh JSON di memory.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from flask import Response, current_app
+from flask.json.provider import DefaultJSONProvider
+from typing import Any, Iterable, Iterator
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# jumlah row yang di-encode sekaligus per chunk pada jsonStream()
+STREAM_CHUNK_ROWS = 1000
+
+
+def defaultJSON(value: Any) -> Any:
+    '''
+        Konversi tipe yang tidak didukung langsung oleh encoder JSON
+    '''
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    # urutan key mengikuti dict aslinya (sort key hanya buang waktu untuk response API)
+    sort_keys = False
+
+    def __options(self, indent: bool) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def encode(self, obj: Any, indent: bool = False) -> bytes:
+        '''
+            Encode obj jadi JSON (bytes utf-8)
+        '''
+        if orjson is not None:
+            return orjson.dumps(obj, default=defaultJSON, option=self.__options(indent))
+        return json.dumps(
+            obj,
+            default=defaultJSON,
+            ensure_ascii=self.ensure_ascii,
+            sort_keys=self.sort_keys,
+            indent=2 if indent else None,
+            separators=None if indent else (',', ':'),
+        ).encode('utf-8')
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # dipakai juga oleh filter tojson di template, argumen lain (misal indent) diteruskan ke json stdlib
+        if kwargs:
+            kwargs.setdefault('default', defaultJSON)
+            return json.dumps(obj, **kwargs)
+        return self.encode(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        '''
+            Sama dgn jsonify(), body langsung berupa bytes hasil encode (tanpa decode ke str lalu encode ulang)
+        '''
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.encode(obj, indent) + b"\n", mimetype=self.mimetype)
+
+
+def jsonStream(head: dict, key: str, rows: Iterable, chunk_rows: int = STREAM_CHUNK_ROWS) -> Response:
+    '''
+        Response JSON object {**head, key: [rows...]} yang dikirim per chunk, cocok untuk array besar
+        (misal DBResponse.stream dari execute_stream) tanpa menampung seluruh JSON di memory. example::
+
+            hasil = db.execute_stream(query, param)
+            if hasil.is_error:
+                return ajaxNormalError()
+            return jsonStream({'status': True}, 'data', hasil.stream)
+    '''
+    provider = current_app.json
+    encode = provider.encode if isinstance(provider, FastJSONProvider) else (lambda obj: provider.dumps(obj).encode('utf-8'))
+
+    def chunks() -> Iterator[bytes]:
+        # '{"status":true,' + '"data":[' ... ']}'
+        prefix = encode(head)[:-1]
+        yield prefix + (b',' if head else b'') + encode(key) + b':['
+
+        first = True
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_rows:
+                yield (b'' if first else b',') + encode(batch)[1:-1]
+                first = False
+                batch = []
+        if batch:
+            yield (b'' if first else b',') + encode(batch)[1:-1]
+        yield b']}\n'
+
+    response = Response(chunks(), mimetype=provider.mimetype)
+    if hasattr(rows, 'close'):
+        # koneksi DBStream di-release ketika response selesai / client putus
+        response.call_on_close(rows.close)
+    return response
@@ -0,0 +1,241 @@
+"""
+    Modul poolWatchdog, deteksi koneksi database yang bocor (diambil dari pool tapi tidak pernah dikembalikan).
+    Versi: 1.0 (19 Okt 2026)
+
+    Setiap koneksi yang diambil PostgresDatabase dari global_connection_pool dicatat: waktu ambil, caller (file DAO),
+    thread, dan stack-nya. Thread watchdog mengecek secara berkala:
+        - koneksi yang dipegang lebih dari warn_seconds dilaporkan (1x per koneksi) lengkap dgn caller & stack
+        - koneksi yang idle in transaction (tidak ada statement sama sekali) lebih dari idle_tx_seconds di-rollback lalu ditutup & dikembalikan ke pool
+        - (opsional) koneksi apapun yang dipegang lebih dari reclaim_seconds di-cancel, di-rollback, lalu dikembalikan ke pool
+    Koneksi yang di-reclaim selalu ditutup (close=True), sehingga pemegang lama akan dapat error ketika memakainya lagi
+    (bukan diam-diam memakai koneksi yang sudah dipakai request lain), dan pool membuat koneksi baru sebagai gantinya.
+"""
+
+import os
+import time
+import traceback
+from datetime import datetime
+from threading import Event, Lock, Thread, current_thread
+from typing import Dict, List
+from psycopg2.extensions import TRANSACTION_STATUS_ACTIVE, TRANSACTION_STATUS_INERROR, TRANSACTION_STATUS_INTRANS
+
+# jumlah frame stack yang disimpan per checkout
+STACK_LIMIT = 12
+
+# file yang di-skip ketika mencari caller (frame di dalam konektor, bukan file DAO)
+INTERNAL_FILES = ('postgresKonektor.py', 'poolWatchdog.py', 'contextlib.py')
+
+
+def callerInfo(stack: traceback.StackSummary) -> str:
+    '''
+        Frame terakhir di luar konektor (biasanya file DAO), format sama dgn PostgresDatabase.__get_caller()
+    '''
+    for frame in reversed(stack):
+        if not frame.filename.endswith(INTERNAL_FILES):
+            return f'File "{frame.filename}", line {frame.lineno}, in {frame.name}'
+    return 'File "<unknown>"'
+
+
+class Checkout:
+    __slots__ = ('connection_key', 'pool', 'connection', 'caller', 'stack', 'since', 'active_at', 'thread', 'stream', 'reported')
+
+    def __init__(self, connection_key: str, pool, connection, caller: str, stack: traceback.StackSummary) -> None:
+        self.connection_key = connection_key
+        self.pool = pool
+        self.connection = connection
+        self.caller = caller
+        self.stack = stack
+        self.since = time.monotonic()
+        # terakhir kali koneksi dipakai (statement mulai / selesai), untuk hitung lama idle in transaction
+        self.active_at = self.since
+        self.thread = current_thread().name
+        # koneksi execute_stream / copy_stream memang dipegang lama (selama data dibaca)
+        self.stream = False
+        self.reported = False
+
+    @property
+    def held_seconds(self) -> float:
+        return time.monotonic() - self.since
+
+    @property
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.active_at
+
+    def to_dict(self) -> Dict:
+        return {
+            'connection_key': self.connection_key,
+            'caller': self.caller,
+            'thread': self.thread,
+            'held_seconds': round(self.held_seconds, 1),
+            'idle_seconds': round(self.idle_seconds, 1),
+            'stream': self.stream,
+        }
+
+
+class PoolWatchdog:
+    def __init__(self, warn_seconds: int = 60, idle_tx_seconds: int = 300, reclaim_seconds: int = 0, interval: int = 10) -> None:
+        '''
+            warn_seconds: batas waktu koneksi dipegang sebelum dilaporkan sebagai bocor
+            idle_tx_seconds: batas waktu koneksi idle in transaction sebelum di-rollback & di-reclaim, 0 untuk menonaktifkan
+            reclaim_seconds: batas waktu koneksi apapun dipegang sebelum di-reclaim paksa, 0 untuk menonaktifkan
+            interval: jeda antar pengecekan (detik)
+        '''
+        self.__held: Dict[int, Checkout] = {}
+        self.__lock = Lock()
+        self.__stop = Event()
+        self.__thread = None
+        self.__pid = None
+        self.configure(warn_seconds, idle_tx_seconds, reclaim_seconds, interval)
+
+    def configure(self, warn_seconds: int, idle_tx_seconds: int, reclaim_seconds: int, interval: int) -> None:
+        self.warn_seconds = warn_seconds
+        self.idle_tx_seconds = idle_tx_seconds
+        self.reclaim_seconds = reclaim_seconds
+        self.interval = interval
+
+    def __start(self) -> None:
+        # thread dibuat lazy di proses yang memakainya (thread tidak ikut ter-copy ketika gunicorn fork worker)
+        if self.__thread is not None and self.__pid == os.getpid():
+            return
+
+        with self.__lock:
+            if self.__thread is not None and self.__pid == os.getpid():
+                return
+            self.__pid = os.getpid()
+            self.__stop.clear()
+            self.__thread = Thread(target=self.__run, name='pool_watchdog', daemon=True)
+            self.__thread.start()
+
+    def __run(self) -> None:
+        while not self.__stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                traceback.print_exc()
+
+    def stop(self) -> None:
+        self.__stop.set()
+
+    def checkout(self, connection_key: str, pool, connection) -> None:
+        '''
+            Catat koneksi yang baru diambil dari pool
+        '''
+        # buang frame checkout itu sendiri
+        stack = traceback.extract_stack(limit=STACK_LIMIT + 1)[:-1]
+        caller = callerInfo(stack)
+        with self.__lock:
+            self.__held[id(connection)] = Checkout(connection_key, pool, connection, caller, stack)
+        self.__start()
+
+    def mark_stream(self, connection) -> None:
+        with self.__lock:
+            checkout = self.__held.get(id(connection))
+            if checkout is not None:
+                checkout.stream = True
+
+    def touch(self, connection) -> None:
+        '''
+            Catat koneksi sedang dipakai (dipanggil tiap statement mulai & selesai), koneksi yang masih dipakai
+            di dalam transaksi panjang (db.transaction() / _preserve) tidak dianggap idle in transaction
+        '''
+        checkout = self.__held.get(id(connection))
+        if checkout is not None:
+            checkout.active_at = time.monotonic()
+
+    def checkin(self, connection) -> None:
+        '''
+            Hapus catatan koneksi yang sudah dikembalikan ke pool
+        '''
+        with self.__lock:
+            self.__held.pop(id(connection), None)
+
+    def held(self) -> List[Dict]:
+        '''
+            Daftar koneksi yang sedang dipegang, urut dari yang paling lama
+        '''
+        with self.__lock:
+            checkouts = sorted(self.__held.values(), key=lambda checkout: checkout.since)
+        return [checkout.to_dict() for checkout in checkouts]
+
+    def report(self, reason: str) -> None:
+        '''
+            Print seluruh koneksi yang sedang dipegang, misal ketika terjadi PoolError (pool habis)
+        '''
+        with self.__lock:
+            checkouts = sorted(self.__held.values(), key=lambda checkout: checkout.since)
+
+        time_now = datetime.now().strftime("[%d-%m-%Y %H:%M:%S]")
+        print(f"{time_now} [WARNING] {reason}, {len(checkouts)} koneksi sedang dipegang:")
+        for checkout in checkouts:
+            self.__print(checkout)
+
+    def __print(self, checkout: Checkout) -> None:
+        print(f"    - connection_key={checkout.connection_key}, dipegang {checkout.held_seconds:.0f} detik oleh thread {checkout.thread}")
+        print(f"      {checkout.caller}")
+        print(''.join(f"      {line}" for line in traceback.format_list(checkout.stack)).rstrip())
+
+    def check(self) -> int:
+        '''
+            Cek seluruh koneksi yang sedang dipegang, return jumlah koneksi yang di-reclaim
+        '''
+        with self.__lock:
+            checkouts = list(self.__held.values())
+
+        reclaimed = 0
+        for checkout in checkouts:
+            held_seconds = checkout.held_seconds
+            status = checkout.connection.info.transaction_status if not checkout.connection.closed else None
+            idle_tx = status in (TRANSACTION_STATUS_INTRANS, TRANSACTION_STATUS_INERROR)
+            if status == TRANSACTION_STATUS_ACTIVE:
+                # statement sedang jalan, bukan idle
+                checkout.active_at = time.monotonic()
+
+            if self.reclaim_seconds and held_seconds > self.reclaim_seconds:
+                self.__reclaim(checkout, f"dipegang lebih dari {self.reclaim_seconds} detik")
+                reclaimed += 1
+            elif self.idle_tx_seconds and idle_tx and not checkout.stream and checkout.idle_seconds > self.idle_tx_seconds:
+                self.__reclaim(checkout, f"idle in transaction lebih dari {self.idle_tx_seconds} detik")
+                reclaimed += 1
+            elif held_seconds > self.warn_seconds and not checkout.reported:
+                checkout.reported = True
+                time_now = datetime.now().strftime("[%d-%m-%Y %H:%M:%S]")
+                print(f"{time_now} [WARNING] Koneksi database kemungkinan bocor (lupa release_connection / commit?):")
+                self.__print(checkout)
+
+        return reclaimed
+
+    def __reclaim(self, checkout: Checkout, reason: str) -> None:
+        with self.__lock:
+            # bisa saja sudah dikembalikan oleh pemiliknya di sela-sela pengecekan
+            if self.__held.pop(id(checkout.connection), None) is None:
+                return
+
+        time_now = datetime.now().strftime("[%d-%m-%Y %H:%M:%S]")
+        print(f"{time_now} [WARNING] Koneksi database di-reclaim paksa ({reason}):")
+        self.__print(checkout)
+
+        connection = checkout.connection
+        try:
+            if not connection.closed:
+                if connection.info.transaction_status == TRANSACTION_STATUS_ACTIVE:
+                    connection.cancel()
+                connection.rollback()
+        except Exception:
+            pass
+
+        try:
+            checkout.pool.putconn(connection, close=True)
+        except Exception:
+            traceback.print_exc()
+
+
+# watchdog default untuk global_connection_pool
+pool_watchdog = PoolWatchdog()
+
+
+def configureWatchdog(warn_seconds: int, idle_tx_seconds: int, reclaim_seconds: int, interval: int) -> None:
+    pool_watchdog.configure(warn_seconds, idle_tx_seconds, reclaim_seconds, interval)
+
+
+def getPoolWatchdog() -> PoolWatchdog:
+    return pool_watchdog
@@ -4,22 +4,34 @@
 """
 
 import psycopg2
-from psycopg2 import OperationalError
+from psycopg2 import OperationalError, sql
 from psycopg2.pool import ThreadedConnectionPool
 from psycopg2.extras import execute_values, Json
-from psycopg2.extensions import Diagnostics, register_adapter
+from psycopg2.extensions import Diagnostics, register_adapter, TRANSACTION_STATUS_INERROR
+from contextlib import contextmanager
 import traceback
 from textwrap import dedent
-import sqlparse
 import inspect
-from typing import Dict, List, Tuple, Union
+from typing import Callable, Dict, Iterator, List, Tuple, Union
 import warnings
 from datetime import datetime
+from queue import Queue, Empty
+from threading import Event, Thread
+from uuid import uuid4
 import os
+from .dataTables import DTRequest
+from .queryBuilder import SelectQuery, composeDataTable
+from .poolWatchdog import pool_watchdog
+from .queryTimeout import getTimeout, query_deadline
+from .replicaRouter import isReadOnly, replica_router
+from .fetchMode import registerFetchMode, toColumnar, validateFetchMode
 
 # adapt any Python dictionary to JSON
 register_adapter(dict, Json)
 
+# cache tipe kolom per (connection_key, table) untuk update_many & delete_many
+column_type_cache = {}
+
 VOID_DIAG = Diagnostics(psycopg2.Error())
 global_conn_exc = None
 
@@ -40,6 +52,67 @@ except OperationalError as e:
     global_connection_pool = None
     global_conn_exc = e
 
+
+def configurePool(connection_key: str, minconn: int, maxconn: int, replica_maxconn: int = None) -> None:
+    '''
+        Atur ukuran pool per proses (lihat gunicorn.conf.py), berlaku juga untuk pool replica milik connection_key:
+            minconn: koneksi idle yang tetap disimpan di pool (minconn=0 artinya setiap koneksi ditutup ketika di-release)
+            maxconn: batas koneksi yang dipinjam bersamaan, minimal sama dgn jumlah thread worker
+            replica_maxconn: maxconn pool replica, default sama dgn maxconn
+        Koneksi tidak dibuka di sini, agar tidak ada koneksi yang ikut ter-copy ketika gunicorn fork worker.
+    '''
+    pools = [replica.pool for replica in replica_router.pools(connection_key)]
+    for pool in pools:
+        pool.maxconn = max(int(replica_maxconn or maxconn), 1)
+        pool.minconn = min(max(int(minconn), 0), pool.maxconn)
+
+    if global_connection_pool is None or connection_key not in global_connection_pool:
+        return
+    pool = global_connection_pool[connection_key]
+    pool.maxconn = max(int(maxconn), 1)
+    pool.minconn = min(max(int(minconn), 0), pool.maxconn)
+
+
+def _warmConnections(pool: ThreadedConnectionPool, connections: int) -> int:
+    # buka sejumlah koneksi lalu kembalikan ke pool (disimpan sebagai koneksi idle sebanyak minconn pool)
+    opened = []
+    try:
+        for _ in range(min(connections, pool.maxconn)):
+            connection = pool.getconn()
+            opened.append(connection)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connection.rollback()
+    finally:
+        for connection in opened:
+            pool.putconn(connection)
+    return len(opened)
+
+
+def warmUpPool(connection_key: str = "default", connections: int = None) -> int:
+    '''
+        Buka koneksi ke database (primary & replica) sebelum worker menerima request (dipanggil dari hook
+        post_worker_init gunicorn), sehingga request pertama tidak menunggu handshake koneksi. Default sebanyak minconn pool.
+        Return jumlah koneksi primary yang berhasil dibuka, error hanya dicetak (worker tetap jalan).
+    '''
+    for replica in replica_router.pools(connection_key):
+        try:
+            _warmConnections(replica.pool, replica.pool.minconn if connections is None else connections)
+        except Exception as e:
+            replica_router.mark_unhealthy(replica, f"warm-up gagal: {type(e).__name__}: {str(e).strip()}")
+
+    if global_connection_pool is None or connection_key not in global_connection_pool:
+        print(f"[WARNING] Warm-up pool '{connection_key}' di-skip: {global_conn_exc or 'connection_key tidak ada'}")
+        return 0
+
+    pool = global_connection_pool[connection_key]
+    try:
+        return _warmConnections(pool, pool.minconn if connections is None else connections)
+    except Exception as e:
+        print(f"[WARNING] Warm-up pool '{connection_key}' gagal: {type(e).__name__}: {str(e).strip()}")
+        return 0
+
+
 class PsycopgError(Exception):
     '''
         This class generalizes exceptions that can occur during database operations,
@@ -85,6 +158,67 @@ class PsycopgError(Exception):
     def __repr__(self) -> str:
         return self.__str__()
 
+class DBStream:
+    '''
+        Iterator hasil execute_stream() / copy_stream(). Koneksi DB tetap dipinjam selama data di-stream,
+        dan baru di-release ketika iterasi selesai atau close() dipanggil (Flask otomatis panggil close() di akhir response).
+    '''
+
+    def __init__(self, iterator: Iterator, release: Callable[[], None]) -> None:
+        self.__iterator = iterator
+        self.__release = release
+        self.__closed = False
+
+    def __iter__(self) -> Iterator:
+        try:
+            yield from self.__iterator
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self.__closed:
+            return
+        self.__closed = True
+
+        if hasattr(self.__iterator, 'close'):
+            self.__iterator.close()
+        self.__release()
+
+class _CopyWriter:
+    '''
+        File-like object untuk cursor.copy_expert(), output COPY ditampung per chunk_size lalu dikirim ke queue,
+        sehingga bisa dibaca dari thread lain sebagai stream.
+    '''
+
+    def __init__(self, queue: Queue, cancelled: Event, chunk_size: int) -> None:
+        self.__queue = queue
+        self.__cancelled = cancelled
+        self.__chunk_size = chunk_size
+        self.__buffer = bytearray()
+
+    def __put(self, item) -> None:
+        # jika client sudah berhenti baca (misal download dibatalkan), hentikan COPY
+        while not self.__cancelled.is_set():
+            try:
+                self.__queue.put(item, timeout=1)
+                return
+            except Exception:
+                continue
+        raise InterruptedError("Stream COPY dibatalkan!")
+
+    def write(self, data: bytes) -> None:
+        self.__buffer += data
+        if len(self.__buffer) >= self.__chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.__buffer:
+            self.__put(bytes(self.__buffer))
+            self.__buffer.clear()
+
+    def end(self, item=None) -> None:
+        self.__put(item)
+
 class DBResponse:
     def __init__(self, pgcode:str, pgerror:str, diag:Diagnostics, result: List = [], notices: List = None) -> None:
         self.pgcode = pgcode
@@ -92,6 +226,10 @@ class DBResponse:
         self.diag = diag
         self.result = result
         self.notices = notices
+        self.description = []
+        self.stream = None
+        self.rowcount = -1
+        self.columnar = None
 
     @property
     def pgcode(self) -> str:
@@ -142,6 +280,53 @@ class DBResponse:
             raise ValueError("prop result bertipe list!")
         self._result = value
 
+    @property
+    def description(self) -> List:
+        '''
+            description: berisi cursor.description (meta-data kolom: name, type_code, internal_size, precision, scale) dari hasil query,
+            sumber: https://www.psycopg.org/docs/cursor.html#cursor.description
+        '''
+        return self._description
+
+    @description.setter
+    def description(self, value:List) -> None:
+        self._description = value
+
+    @property
+    def stream(self) -> Union[DBStream, None]:
+        '''
+            stream: iterator hasil execute_stream() (dict per row) atau copy_stream() (bytes per chunk), None untuk method lain
+        '''
+        return self._stream
+
+    @stream.setter
+    def stream(self, value:Union[DBStream, None]) -> None:
+        self._stream = value
+
+    @property
+    def rowcount(self) -> int:
+        '''
+            rowcount: jumlah row yang terkena INSERT / UPDATE / DELETE (khusus method bulk: execute_many, update_many, delete_many),
+            -1 jika tidak diketahui
+        '''
+        return self._rowcount
+
+    @rowcount.setter
+    def rowcount(self, value:int) -> None:
+        self._rowcount = value
+
+    @property
+    def columnar(self) -> Union[Dict[str, List], None]:
+        '''
+            columnar: hasil query per kolom {'id': [1, 2], 'name': ['budi', 'candra']} jika PostgresDatabase.columnar = True
+            (result akan berisi List kosong), None jika tidak
+        '''
+        return self._columnar
+
+    @columnar.setter
+    def columnar(self, value:Union[Dict[str, List], None]) -> None:
+        self._columnar = value
+
     @property
     def notices(self) -> List:
         '''
@@ -225,6 +410,14 @@ class DBResponse:
         '''
         return self.pgcode == '23503'
     
+    @property
+    def query_timeout(self) -> bool:
+        '''
+            Bernilai True jika query dihentikan karena melewati batas waktu: statement_timeout / deadline client (pgcode == '57014')
+            atau lock_timeout (pgcode == '55P03'), lihat app/lib/queryTimeout.py
+        '''
+        return self.pgcode in ('57014', '55P03')
+
     @property
     def raise_exception(self) -> bool:
         '''
@@ -252,6 +445,58 @@ class DBResponse:
             'result': self.result
         }
 
+class Transaction:
+    '''
+        State unit of work dari db.transaction(), 1 koneksi + 1 cursor dipakai untuk seluruh statement di dalam blok with.
+            - committed: True jika transaksi berhasil di-commit
+            - response: DBResponse error pertama di dalam transaksi (atau error ketika connect / commit),
+              DBResponse sukses jika tidak ada error
+            - is_error: shortcut response.is_error
+    '''
+
+    def __init__(self, response: DBResponse, connection_pool=None, connection=None) -> None:
+        self.response = response
+        self.connection_pool = connection_pool
+        self.connection = connection
+        self.cursor = connection.cursor() if connection is not None else None
+        self.committed = False
+        self.rollback_only = False
+        self.savepoint_count = 0
+
+    @property
+    def is_error(self) -> bool:
+        return self.response.is_error
+
+    @property
+    def aborted(self) -> bool:
+        # ada statement yang gagal, postgres menolak statement berikutnya sampai rollback
+        return self.connection is None or self.connection.info.transaction_status == TRANSACTION_STATUS_INERROR
+
+    def rollback(self) -> None:
+        '''
+            Tandai transaksi untuk di-rollback ketika keluar dari blok with (tanpa harus raise exception)
+        '''
+        self.rollback_only = True
+
+
+class Savepoint:
+    '''
+        State dari db.savepoint(), statement di dalam blok savepoint yang gagal hanya me-rollback savepoint tsb,
+        transaksi luar tetap bisa lanjut & di-commit.
+    '''
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.rollback_only = False
+        self.rolled_back = False
+
+    def rollback(self) -> None:
+        '''
+            Tandai savepoint untuk di-rollback ketika keluar dari blok with
+        '''
+        self.rollback_only = True
+
+
 class PostgresDatabase:
     @property
     def notices(self) -> bool:
@@ -263,13 +508,64 @@ class PostgresDatabase:
             raise ValueError("Setting notices hanya boleh bool (True / False)!")
         self.__notices = value
 
-    def __init__(self, connection_key: str = "default") -> None:
+    @property
+    def fetch_mode(self) -> Union[str, None]:
+        '''
+            None: tipe bawaan psycopg2 (Decimal, datetime, dll)
+            'float': NUMERIC jadi float, 'json': NUMERIC jadi float & tanggal / waktu jadi string ISO (lihat app/lib/fetchMode.py)
+        '''
+        return self.__fetch_mode
+
+    @fetch_mode.setter
+    def fetch_mode(self, value: Union[str, None]) -> None:
+        self.__fetch_mode = validateFetchMode(value)
+
+    @property
+    def columnar(self) -> bool:
+        '''
+            Jika True, hasil query ditampung per kolom di DBResponse.columnar (tanpa membuat dict per row),
+            tidak berlaku untuk execute_stream()
+        '''
+        return self.__columnar
+
+    @columnar.setter
+    def columnar(self, value: bool) -> None:
+        if not isinstance(value, bool):
+            raise ValueError("Setting columnar hanya boleh bool (True / False)!")
+        self.__columnar = value
+
+    def __init__(self, connection_key: str = "default", statement_timeout: int = None, lock_timeout: int = None, use_replica: bool = True) -> None:
+        '''
+            statement_timeout / lock_timeout: batas waktu query dalam milidetik (0 = tanpa batas),
+            None untuk memakai setting connection_key (lihat app/lib/queryTimeout.py).
+            use_replica: query read-only boleh dijalankan di replica (lihat app/lib/replicaRouter.py),
+            False untuk SELECT yang memanggil fungsi yang mengubah data / butuh data paling baru. example::
+
+                # search yang berat cukup dibatasi 5 detik, jangan sampai memegang koneksi lama
+                db = PostgresDatabase(statement_timeout=5000)
+        '''
         self.__notices = False
+        self.__fetch_mode = None
+        self.__columnar = False
         self.__connection_key = connection_key
         self.__preserveConn = None
+        self.__transaction = None
+        self.__statement_timeout = statement_timeout
+        self.__lock_timeout = lock_timeout
+        self.__use_replica = use_replica
+        self.__deadline = None
 
-    def __establish_connection(self) -> DBResponse:
+    def __establish_connection(self, query_class: str = 'statement', read_only: bool = False) -> DBResponse:
         # TODO: buat logic jika gunicorn kirim signal 'SIGABRT' maka tetap lanjutkan return 'ec' (untuk menghindari 'ec' UnboundLocalError)
+        # di dalam db.transaction(), seluruh statement memakai koneksi & cursor milik transaksi
+        if self.__transaction is not None:
+            tx = self.__transaction
+            if tx.connection is None:
+                return tx.response
+            self.__connection_pool, self.__connection, self.__cursor = tx.connection_pool, tx.connection, tx.cursor
+            pool_watchdog.touch(self.__connection)
+            return DBResponse('00000', None, VOID_DIAG)
+
         self.__connection_pool = self.__connection = self.__cursor = None
         try:
             if global_connection_pool is None:
@@ -281,9 +577,17 @@ class PostgresDatabase:
             )
 
             if self.__connection_pool is not None:
-                # jika koneksi yang diminta ada, lanjutkan proses
-                self.__connection = self.__connection_pool.getconn()
-                self.__cursor = self.__connection.cursor()
+                # jika koneksi yang diminta ada, lanjutkan proses. query read-only diarahkan ke replica jika ada
+                self.__connection = self.__replica_connection() if read_only and self.__use_replica else None
+                if self.__connection is None:
+                    self.__connection = self.__connection_pool.getconn()
+                    if not read_only:
+                        # read berikutnya di request ini tetap ke primary (read-your-writes)
+                        replica_router.mark_write(self.__connection_key)
+                self.__cursor = self.__new_cursor()
+                # catat siapa yang ambil koneksi, untuk deteksi koneksi yang bocor
+                pool_watchdog.checkout(self.__connection_key, self.__connection_pool, self.__connection)
+                self.__set_timeout(query_class)
 
                 return self.__response('00000', None)
             else:
@@ -299,6 +603,7 @@ class PostgresDatabase:
             '''
             e = self.__serialize_exception(e)
             self.__logprint_exception(e, dept_level=4)
+            pool_watchdog.report(f"Connection pool '{self.__connection_key}' habis")
 
             return self.__response('08003', e.pgerror)
         except psycopg2.OperationalError as e:
@@ -330,12 +635,77 @@ class PostgresDatabase:
 
             return self.__response('08000', e.pgerror)
 
+    def __new_cursor(self, name: str = None):
+        # typecaster fetch_mode dipasang per cursor, koneksi di pool tetap memakai tipe bawaan
+        cursor = self.__connection.cursor(name=name)
+        registerFetchMode(cursor, self.__fetch_mode)
+        return cursor
+
+    def __replica_connection(self):
+        '''
+            Ambil koneksi dari replica pilihan replica_router, None jika harus ke primary.
+            Replica yang gagal dihubungi ditandai tidak sehat, query dialihkan ke primary.
+        '''
+        replica = replica_router.choose(self.__connection_key)
+        if replica is None:
+            return None
+
+        try:
+            connection = replica.pool.getconn()
+        except psycopg2.pool.PoolError:
+            return None
+        except psycopg2.OperationalError as e:
+            replica_router.mark_unhealthy(replica, str(e).strip())
+            return None
+
+        self.__connection_pool = replica.pool
+        return connection
+
+    def __set_timeout(self, query_class: str) -> None:
+        '''
+            Pasang statement_timeout & lock_timeout (SET LOCAL, hanya berlaku sampai commit / rollback)
+            dan deadline client untuk koneksi yang baru diambil dari pool
+        '''
+        statement_timeout, lock_timeout = getTimeout(self.__connection_key, query_class, self.__statement_timeout, self.__lock_timeout)
+        try:
+            settings = [
+                sql.SQL("SET LOCAL {} = {}").format(sql.SQL(name), sql.Literal(value))
+                for name, value in (('statement_timeout', statement_timeout), ('lock_timeout', lock_timeout))
+                if value
+            ]
+            if settings:
+                self.__cursor.execute(sql.SQL('; ').join(settings))
+        except Exception:
+            # koneksi yang gagal di-setting tidak dipakai, langsung dikembalikan ke pool
+            self.__rollback()
+            self.__release_connection()
+            raise
+
+        self.__deadline = query_deadline.register(self.__connection, statement_timeout)
+
     def __release_connection(self) -> None:
+        # koneksi milik transaksi baru di-release ketika keluar dari blok db.transaction()
+        if self.__transaction is not None:
+            return
+
+        query_deadline.unregister(self.__deadline)
+        self.__deadline = None
         try:
             self.__cursor.close()
+            pool_watchdog.checkin(self.__connection)
             self.__connection_pool.putconn(self.__connection)
         except Exception:
             warnings.warn(f"Gagal ketika hendak release connection!", Warning)
+
+    def __commit(self) -> None:
+        # di dalam transaksi, commit dilakukan sekali ketika keluar dari blok db.transaction()
+        if self.__transaction is None:
+            self.__connection.commit()
+
+    def __rollback(self) -> None:
+        # di dalam transaksi, rollback diputuskan ketika keluar dari blok db.transaction() / db.savepoint()
+        if self.__transaction is None and self.__connection is not None:
+            self.__connection.rollback()
     
     def __generate_preserve_conn(self) -> Tuple[bool, DBResponse]:
         '''
@@ -350,16 +720,31 @@ class PostgresDatabase:
                 return False, ec
             self.__preserveConn = self.__connection
         else:
+            # tutup cursor statement sebelumnya, cukup 1 cursor yang terbuka per koneksi
+            if self.__cursor is not None and not self.__cursor.closed:
+                self.__cursor.close()
             self.__connection = self.__preserveConn
-            self.__cursor = self.__connection.cursor()
+            self.__cursor = self.__new_cursor()
+            pool_watchdog.touch(self.__connection)
 
         return True, None
 
     def __response(self, pgcode:str, pgerror:str, diag:Diagnostics=VOID_DIAG) -> DBResponse:
-        res = DBResponse(pgcode, pgerror, diag, self.__get_result_set())
+        # statement selesai, waktu idle in transaction dihitung mulai dari sini
+        pool_watchdog.touch(self.__connection)
+        if self.__columnar:
+            res = DBResponse(pgcode, pgerror, diag, [])
+            res.columnar = self.__get_columnar()
+        else:
+            res = DBResponse(pgcode, pgerror, diag, self.__get_result_set())
+        res.description = self.__get_description()
         if self.__notices:
             res.notices = self.__get_notices()
 
+        # simpan error pertama di dalam transaksi, untuk tx.response
+        if self.__transaction is not None and res.is_error and not self.__transaction.is_error:
+            self.__transaction.response = res
+
         return res
 
     def __get_caller(self, dept_level:int) -> Dict:
@@ -397,7 +782,8 @@ class PostgresDatabase:
                 query_aktual = query_aktual.decode("utf-8")
                 query_aktual = dedent(query_aktual)
 
-                # format & parse query
+                # format & parse query (sqlparse baru di-import ketika ada query yang perlu di-print)
+                import sqlparse
                 query_aktual = sqlparse.format(
                     sql=query_aktual,
                     keyword_case="upper",
@@ -449,9 +835,21 @@ class PostgresDatabase:
             in self.__connection.notices
         ]
 
+    def __get_description(self) -> List:
+        # jika desc kosong atau cursor sudah ditutup maka return list kosong
+        if not self.__cursor or self.__cursor.closed or self.__cursor.description is None:
+            return []
+
+        return list(self.__cursor.description)
+
+    def __get_columnar(self) -> Union[Dict[str, List], None]:
+        if not self.__cursor or self.__cursor.closed or self.__cursor.description is None:
+            return None
+        return toColumnar(self.__cursor.description, self.__cursor.fetchall())
+
     def __get_result_set(self) -> List[Dict]:
         # jika desc kosong atau cursor sudah ditutup maka return list kosong
-        if not self.__cursor or self.__cursor.description is None:
+        if not self.__cursor or self.__cursor.closed or self.__cursor.description is None:
             return []
 
         '''
@@ -525,12 +923,12 @@ class PostgresDatabase:
     def execute(self, query: str, param: dict = {}, print_query: bool = False) -> DBResponse:
         param = {} or param
         try:
-            ec = self.__establish_connection()
+            ec = self.__establish_connection(read_only=isinstance(query, str) and isReadOnly(query))
             if ec.is_error:
                 return ec
 
             self.__cursor.execute(query, param)
-            self.__connection.commit()
+            self.__commit()
 
             if print_query:
                 self.__print_query_aktual()
@@ -547,16 +945,23 @@ class PostgresDatabase:
             if ec.status:
                 self.__release_connection()
 
-    def execute_dt(self, query: str, param: dict = {}, limit: int = 10, print_query: bool = False) -> DBResponse:
+    def execute_dt(self, query: Union[str, SelectQuery], param: dict = {}, limit: int = 10, print_query: bool = False, dt: DTRequest = None, columns: Dict[str, str] = None, key: str = None, not_null: Tuple[str, ...] = (), filter_types: Dict[str, str] = None) -> DBResponse:
         """
         Digunakan untuk get data DataTable yang secara "server side",
         karena secara "server side" maka baiknya ada pagination, sehingga wajib ada limit & offset
         NOTE: Pagination baiknya tidak menggunakan offset: https://use-the-index-luke.com/no-offset, namun
         implement pagination using 'seek method or keyset' https://use-the-index-luke.com/sql/partial-results/fetch-next-page
+        query: SelectQuery (lihat modul queryBuilder) atau query string
+        dt: hasil DTRequest.parse(), jika diisi maka offset & limit diambil dari dt.start & dt.length
+        columns, key, not_null & filter_types: khusus query string, whitelist kolom {data DataTables: nama kolom hasil query} yang boleh
+            di-sort & di-filter oleh user, query dibungkus jadi sub query lalu ditambah WHERE & ORDER BY dari dt
         """
-        param = {} or param
+        param = dict(param or {})
+        if dt is not None:
+            param.setdefault('offset', dt.start)
+            limit = dt.length if dt.length > 0 else limit
         try:
-            ec = self.__establish_connection()
+            ec = self.__establish_connection(read_only=True)
             if ec.is_error:
                 return ec
 
@@ -569,14 +974,10 @@ class PostgresDatabase:
                 hasil_error.dt_total = 0
                 return hasil_error
 
-            # netralisasi parameter 'query' & build query_count
-            query = query.replace("limit", "LIMIT").replace(";", "")
-            splitQuery = query.split("LIMIT")[0].strip()
-            query_count = f"SELECT COUNT(*) AS total FROM ({splitQuery}) AS total;"
-
-            # Karena DT server side maka baiknya (wajib sih) ada limit & offset
-            if query.find("LIMIT") < 0:
-                query = f"{query} LIMIT {limit} OFFSET %(offset)s;"
+            # build page query & query_count (tanpa ORDER BY), teks statement di-cache per bentuk query
+            query, query_count, dt_param = composeDataTable(query, self.__cursor, dt, columns, key, not_null, filter_types)
+            param.update(dt_param)
+            param['dt_limit'] = limit
 
             # select data untuk atribut "data" atau "aaData" pada DataTable
             self.__cursor.execute(query, param)
@@ -607,17 +1008,52 @@ class PostgresDatabase:
             if ec.status:
                 self.__release_connection()
 
-    def execute_many(self, query: str, listData: list, print_query: bool = False) -> DBResponse:
+    def __execute_values(self, query: str, listData: list, template: str = None, page_size: int = 1000, fetch: bool = False) -> Tuple[List[Dict], int]:
+        '''
+            execute_values per page_size row, return (hasil RETURNING dari seluruh page, total rowcount seluruh page)
+        '''
+        result, rowcount = [], 0
+        for i in range(0, len(listData), page_size):
+            rows = execute_values(
+                self.__cursor, query, listData[i:i + page_size], template=template, page_size=page_size, fetch=fetch
+            )
+            rowcount += max(self.__cursor.rowcount, 0)
+            if fetch:
+                columns = [i[0] for i in self.__cursor.description]
+                result.extend(dict(zip(columns, record)) for record in rows)
+
+        return result, rowcount
+
+    def __column_types(self, table: str) -> Dict[str, str]:
+        '''
+            Tipe data tiap kolom pada table, contoh {'id': 'integer', 'name': 'character varying(50)'}.
+            Di-cache per connection_key & table, sehingga cukup 1x query ke pg_attribute.
+        '''
+        cache_key = (self.__connection_key, table)
+        types = column_type_cache.get(cache_key)
+        if types is None:
+            self.__cursor.execute('''
+                SELECT attname, format_type(atttypid, atttypmod)
+                FROM pg_attribute
+                WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+            ''', (table,))
+            types = dict(self.__cursor.fetchall())
+            column_type_cache[cache_key] = types
+
+        return types
+
+    def execute_many(self, query: str, listData: list, print_query: bool = False, returning: bool = False, page_size: int = 1000) -> DBResponse:
         """
         Method ini digunakan untuk execute query dgn multiple values/parameter
         https://www.psycopg.org/docs/cursor.html#cursor.executemany
+        returning: True jika query memakai RETURNING, hasil RETURNING dari seluruh page dikumpulkan di result
         example::
 
             def insert_data(listData):
                 db = PostgresDatabase()
                 listData = [('candra', 'pisang'), ('wijayanto', 'melon')]
-                query = 'INSERT INTO its_ms_user (nama, buah_favorit) VALUES %s'
-                return db.execute_many(query, listData)
+                query = 'INSERT INTO its_ms_user (nama, buah_favorit) VALUES %s RETURNING id'
+                return db.execute_many(query, listData, returning=True)
         """
         listData = [] or listData
         try:
@@ -625,15 +1061,16 @@ class PostgresDatabase:
             if ec.is_error:
                 return ec
 
-            execute_values(
-                self.__cursor, query, listData, template=None, page_size=1000
-            )
-            self.__connection.commit()
+            result, rowcount = self.__execute_values(query, listData, page_size=page_size, fetch=returning)
+            self.__commit()
 
             if print_query:
                 self.__print_query_aktual()
 
-            return self.__response("00000", None)
+            hasil = self.__response("00000", None)
+            hasil.result = result
+            hasil.rowcount = rowcount
+            return hasil
         except TypeError:
             return self.__handleTypeErrorException(query)
         except ValueError as e:
@@ -641,7 +1078,7 @@ class PostgresDatabase:
             print("Hint: execute_many pakai %s untuk param-nya: 'INSERT INTO table_x VALUES %s;")
             return self.__response('58000', e)
         except Exception as e:
-            self.__connection.rollback()
+            self.__rollback()
             e = self.__serialize_exception(e)
             self.__logprint_exception(e)
 
@@ -651,9 +1088,442 @@ class PostgresDatabase:
             if ec.status:
                 self.__release_connection()
 
+    def update_many(self, table: str, key: str, columns: List[str], listData: List[Union[tuple, dict]], returning: List[str] = None, page_size: int = 1000, print_query: bool = False) -> DBResponse:
+        """
+        Bulk update pakai UPDATE ... FROM (VALUES ...), 1 round trip per page_size row (bukan 1 query per row).
+        listData berisi tuple (key, kolom1, kolom2, ...) sesuai urutan columns, atau dict {key: .., kolom1: .., ...}
+        returning: list kolom yang dikembalikan di result, contoh ['id']
+        example::
+
+            def edit_data_batch(list_data):
+                db = PostgresDatabase()
+                list_data = [{'id': 1, 'name': 'candra', 'age': 20}, {'id': 2, 'name': 'wijayanto', 'age': 30}]
+                return db.update_many('datadummykaryawan', 'id', ['name', 'age'], list_data, returning=['id'])
+        """
+        try:
+            ec = self.__establish_connection()
+            if ec.is_error:
+                return ec
+
+            names = [key, *columns]
+            types = self.__column_types(table)
+            unknown = [name for name in names + list(returning or []) if name not in types]
+            if unknown:
+                raise KeyError(f"Kolom {unknown} tidak ada di table {table}!")
+
+            # VALUES tanpa cast dianggap text (atau gagal jika row pertama berisi NULL), jadi tiap value di-cast sesuai tipe kolom
+            template = sql.SQL("({})").format(
+                sql.SQL(', ').join(sql.SQL("%s::{}").format(sql.SQL(types[name])) for name in names)
+            )
+            query = sql.SQL("UPDATE {table} AS t SET {sets} FROM (VALUES %s) AS v ({names}) WHERE t.{key} = v.{key}").format(
+                table=sql.Identifier(*table.split('.')),
+                sets=sql.SQL(', ').join(sql.SQL("{0} = v.{0}").format(sql.Identifier(name)) for name in columns),
+                names=sql.SQL(', ').join(sql.Identifier(name) for name in names),
+                key=sql.Identifier(key),
+            )
+            if returning:
+                query = sql.SQL("{} RETURNING {}").format(
+                    query, sql.SQL(', ').join(sql.SQL("t.{}").format(sql.Identifier(name)) for name in returning)
+                )
+
+            listData = [tuple(row[name] for name in names) if isinstance(row, dict) else tuple(row) for row in listData]
+            result, rowcount = self.__execute_values(
+                query.as_string(self.__cursor), listData, template.as_string(self.__cursor), page_size, bool(returning)
+            )
+            self.__commit()
+
+            if print_query:
+                self.__print_query_aktual()
+
+            hasil = self.__response("00000", None)
+            hasil.result = result
+            hasil.rowcount = rowcount
+            return hasil
+        except Exception as e:
+            self.__rollback()
+            e = self.__serialize_exception(e)
+            self.__logprint_exception(e)
+
+            return self.__response(e.pgcode, e.pgerror, e.diag)
+        finally:
+            if ec.status:
+                self.__release_connection()
+
+    def delete_many(self, table: str, key: str, listKey: list, returning: List[str] = None, page_size: int = 1000, print_query: bool = False) -> DBResponse:
+        """
+        Bulk delete pakai DELETE ... WHERE key = ANY(%s), 1 round trip per page_size key (bukan 1 query per row).
+        returning: list kolom yang dikembalikan di result, contoh ['id']
+        example::
+
+            def delete_data_batch(list_id):
+                db = PostgresDatabase()
+                return db.delete_many('datadummykaryawan', 'id', [1, 2, 3], returning=['id'])
+        """
+        try:
+            ec = self.__establish_connection()
+            if ec.is_error:
+                return ec
+
+            types = self.__column_types(table)
+            unknown = [name for name in [key] + list(returning or []) if name not in types]
+            if unknown:
+                raise KeyError(f"Kolom {unknown} tidak ada di table {table}!")
+
+            # array di-cast sesuai tipe kolom key, agar index pada kolom key tetap terpakai
+            query = sql.SQL("DELETE FROM {table} WHERE {key} = ANY(%s::{type}[])").format(
+                table=sql.Identifier(*table.split('.')),
+                key=sql.Identifier(key),
+                type=sql.SQL(types[key]),
+            )
+            if returning:
+                query = sql.SQL("{} RETURNING {}").format(query, sql.SQL(', ').join(sql.Identifier(name) for name in returning))
+            query = query.as_string(self.__cursor)
+
+            result, rowcount = [], 0
+            for i in range(0, len(listKey), page_size):
+                self.__cursor.execute(query, (list(listKey[i:i + page_size]),))
+                rowcount += max(self.__cursor.rowcount, 0)
+                if returning:
+                    result.extend(self.__get_result_set())
+            self.__commit()
+
+            if print_query:
+                self.__print_query_aktual()
+
+            hasil = self.__response("00000", None)
+            hasil.result = result
+            hasil.rowcount = rowcount
+            return hasil
+        except Exception as e:
+            self.__rollback()
+            e = self.__serialize_exception(e)
+            self.__logprint_exception(e)
+
+            return self.__response(e.pgcode, e.pgerror, e.diag)
+        finally:
+            if ec.status:
+                self.__release_connection()
+
+    def execute_stream(self, query: str, param: dict = {}, fetch_size: int = 2000, print_query: bool = False) -> DBResponse:
+        """
+        Digunakan untuk select data yang sangat banyak (misal export) tanpa menampung seluruh hasil di memory.
+        Query dijalankan pakai server side cursor (named cursor), data diambil per fetch_size row.
+        Hasil ada di prop stream (iterator dict per row), result akan selalu list kosong.
+        NOTE: koneksi baru di-release setelah stream selesai dibaca atau stream.close() dipanggil. example::
+
+            hasil = db.execute_stream('SELECT id, name FROM datadummykaryawan;')
+            if hasil.is_error:
+                return hasil
+            for row in hasil.stream:
+                print(row['name'])
+        """
+        param = {} or param
+        try:
+            # stream me-release koneksi sendiri setelah dibaca, tidak bisa memakai koneksi milik transaksi
+            if self.__transaction is not None:
+                pesan = "execute_stream() / copy_stream() tidak bisa dipakai di dalam 'with db.transaction()'!"
+                print("ERROR - 25000:", pesan)
+                return DBResponse('25000', pesan, VOID_DIAG)
+
+            ec = self.__establish_connection('export', read_only=isReadOnly(query))
+            if ec.is_error:
+                return ec
+
+            # ganti cursor biasa dgn named cursor (server side cursor)
+            self.__cursor.close()
+            self.__cursor = self.__new_cursor(name=f"stream_{uuid4().hex}")
+            self.__cursor.itersize = fetch_size
+            self.__cursor.execute(query, param)
+
+            if print_query:
+                self.__print_query_aktual()
+
+            connection_pool, connection, cursor, deadline = self.__connection_pool, self.__connection, self.__cursor, self.__deadline
+            pool_watchdog.mark_stream(connection)
+
+            def rows() -> Iterator[Dict]:
+                columns = None
+                for record in cursor:
+                    # cursor.description pada named cursor baru ada setelah fetch pertama
+                    if columns is None:
+                        columns = [i[0] for i in cursor.description]
+                    yield dict(zip(columns, record))
+
+            def release() -> None:
+                query_deadline.unregister(deadline)
+                try:
+                    cursor.close()
+                    pool_watchdog.checkin(connection)
+                    connection_pool.putconn(connection)
+                except Exception:
+                    warnings.warn(f"Gagal ketika hendak release connection!", Warning)
+
+            hasil = DBResponse('00000', None, VOID_DIAG)
+            hasil.stream = DBStream(rows(), release)
+            return hasil
+        except TypeError:
+            self.__release_connection()
+            return self.__handleTypeErrorException(query)
+        except Exception as e:
+            e = self.__serialize_exception(e)
+            self.__logprint_exception(e)
+
+            self.__release_connection()
+            return self.__response(e.pgcode, e.pgerror, e.diag)
+
+    def copy_stream(self, query: str, param: dict = {}, delimiter: str = ',', header: bool = False, chunk_size: int = 65536, print_query: bool = False) -> DBResponse:
+        """
+        Stream hasil query sebagai CSV / TSV langsung dari postgres pakai 'COPY (query) TO STDOUT',
+        cara paling cepat untuk export data mentah karena tidak ada konversi tipe data di python.
+        Hasil ada di prop stream (iterator bytes per chunk_size), result akan selalu list kosong. example::
+
+            hasil = db.copy_stream('SELECT id, name FROM datadummykaryawan WHERE age > %(age)s', {'age': 20}, delimiter='\\t')
+            if hasil.is_error:
+                return hasil
+            return Response(hasil.stream, mimetype='text/tab-separated-values')
+        """
+        param = {} or param
+        if delimiter not in {',', ';', '|', '\t'}:
+            raise ValueError(f"delimiter '{delimiter}' tidak didukung!")
+
+        try:
+            # stream me-release koneksi sendiri setelah dibaca, tidak bisa memakai koneksi milik transaksi
+            if self.__transaction is not None:
+                pesan = "execute_stream() / copy_stream() tidak bisa dipakai di dalam 'with db.transaction()'!"
+                print("ERROR - 25000:", pesan)
+                return DBResponse('25000', pesan, VOID_DIAG)
+
+            ec = self.__establish_connection('export', read_only=isReadOnly(query))
+            if ec.is_error:
+                return ec
+
+            # COPY tidak mendukung bind param, sehingga query di-mogrify dulu
+            query = self.__cursor.mogrify(query.strip().rstrip(';'), param).decode('utf-8')
+            copy_query = "COPY ({}) TO STDOUT WITH (FORMAT csv, DELIMITER {}, HEADER {})".format(
+                query, "E'\\t'" if delimiter == '\t' else f"'{delimiter}'", 'true' if header else 'false'
+            )
+
+            connection_pool, connection, cursor, deadline = self.__connection_pool, self.__connection, self.__cursor, self.__deadline
+            pool_watchdog.mark_stream(connection)
+            queue, cancelled = Queue(maxsize=16), Event()
+            writer = _CopyWriter(queue, cancelled, chunk_size)
+
+            def run() -> None:
+                # thread ini yang memegang koneksi selama COPY berjalan, sehingga release juga dilakukan disini
+                close = False
+                try:
+                    cursor.copy_expert(copy_query, writer)
+                    connection.commit()
+                    writer.flush()
+                    writer.end()
+                except Exception as e:
+                    # koneksi yang COPY-nya terputus ditengah jalan tidak aman dipakai lagi, jadi kita close
+                    close = True
+                    try:
+                        writer.end(self.__serialize_exception(e))
+                    except InterruptedError:
+                        pass
+                finally:
+                    query_deadline.unregister(deadline)
+                    try:
+                        cursor.close()
+                        pool_watchdog.checkin(connection)
+                        connection_pool.putconn(connection, close=close)
+                    except Exception:
+                        warnings.warn(f"Gagal ketika hendak release connection!", Warning)
+
+            Thread(target=run, name=f"copy_stream_{uuid4().hex[:8]}", daemon=True).start()
+
+            # tunggu chunk pertama, jika query error maka bisa langsung return DBResponse error
+            first = queue.get()
+            if print_query:
+                time = datetime.now().strftime("[%d-%m-%Y %H:%M:%S]")
+                print(f"{time} [QUERY]:\n{self.__get_caller(2)['info']}:\n{copy_query}")
+            if isinstance(first, PsycopgError):
+                print(f"{datetime.now().strftime('[%d-%m-%Y %H:%M:%S]')} [ERROR]:\n{first.pgerror}QUERY:\n{copy_query}")
+                return DBResponse(first.pgcode, first.pgerror, first.diag)
+
+            def chunks() -> Iterator[bytes]:
+                item = first
+                while item is not None:
+                    if isinstance(item, PsycopgError):
+                        raise item
+                    yield item
+                    item = queue.get()
+
+            def release() -> None:
+                cancelled.set()
+                # kosongkan queue agar thread COPY tidak tertahan
+                try:
+                    while True:
+                        queue.get_nowait()
+                except Empty:
+                    pass
+
+            hasil = DBResponse('00000', None, VOID_DIAG)
+            hasil.stream = DBStream(chunks(), release)
+            return hasil
+        except TypeError:
+            self.__release_connection()
+            return self.__handleTypeErrorException(query)
+        except Exception as e:
+            e = self.__serialize_exception(e)
+            self.__logprint_exception(e)
+
+            self.__release_connection()
+            return self.__response(e.pgcode, e.pgerror, e.diag)
+
+    @contextmanager
+    def transaction(self) -> Iterator[Transaction]:
+        """
+        Unit of work: seluruh statement (execute, execute_many, update_many, delete_many, execute_pipeline, dll)
+        di dalam blok with memakai 1 koneksi & 1 cursor, lalu di-commit sekali di akhir blok.
+        Rollback jika ada statement yang gagal, ada exception, atau tx.rollback() dipanggil.
+        Koneksi SELALU dikembalikan ke pool ketika keluar dari blok (pengganti protokol method _preserve). example::
+
+            def pindah_cabang(id_karyawan, cabang_baru):
+                db = PostgresDatabase()
+                with db.transaction() as tx:
+                    hasil = db.execute('UPDATE karyawan SET cabang = %(cabang)s WHERE id = %(id)s RETURNING id', param)
+                    if hasil.is_error or hasil.is_empty:
+                        # karyawan tidak ditemukan, statement berikutnya tidak perlu dijalankan
+                        tx.rollback()
+                        return hasil
+                    db.execute('INSERT INTO log_mutasi (id_karyawan, cabang) VALUES (%(id)s, %(cabang)s)', param)
+                return tx.response
+
+        db.transaction() di dalam transaksi lain dianggap savepoint.
+        """
+        if self.__transaction is not None:
+            with self.savepoint():
+                yield self.__transaction
+            return
+
+        ec = self.__establish_connection()
+        if ec.is_error:
+            # statement di dalam blok akan langsung return response error koneksi
+            tx = Transaction(ec)
+        else:
+            tx = Transaction(DBResponse('00000', None, VOID_DIAG), self.__connection_pool, self.__connection)
+            registerFetchMode(tx.cursor, self.__fetch_mode)
+            # blok transaksi boleh lebih lama dari deadline client, tiap statement di dalamnya tetap dibatasi statement_timeout
+            query_deadline.unregister(self.__deadline)
+            self.__deadline = None
+            # cursor bawaan __establish_connection tidak dipakai, transaksi punya cursor sendiri
+            self.__cursor.close()
+
+        self.__transaction = tx
+        try:
+            yield tx
+        except BaseException:
+            tx.rollback_only = True
+            raise
+        finally:
+            self.__transaction = None
+            if tx.connection is not None:
+                try:
+                    if tx.rollback_only or tx.aborted:
+                        tx.connection.rollback()
+                    else:
+                        tx.connection.commit()
+                        tx.committed = True
+                except Exception as e:
+                    e = self.__serialize_exception(e)
+                    self.__logprint_exception(e)
+                    if not tx.is_error:
+                        tx.response = DBResponse(e.pgcode, e.pgerror, e.diag)
+                    try:
+                        tx.connection.rollback()
+                    except Exception:
+                        pass
+                finally:
+                    try:
+                        tx.cursor.close()
+                        pool_watchdog.checkin(tx.connection)
+                        tx.connection_pool.putconn(tx.connection)
+                    except Exception:
+                        warnings.warn(f"Gagal ketika hendak release connection!", Warning)
+
+    @contextmanager
+    def savepoint(self) -> Iterator[Savepoint]:
+        """
+        Savepoint di dalam db.transaction(), jika statement di dalam blok gagal (atau sp.rollback() / exception)
+        maka hanya statement di dalam blok ini yang di-rollback, transaksi luar tetap lanjut. example::
+
+            with db.transaction() as tx:
+                db.execute(query_header, param_header)
+                for detail in list_detail:
+                    with db.savepoint() as sp:
+                        # detail yang gagal (misal duplicate) di-skip, header & detail lain tetap di-commit
+                        db.execute(query_detail, detail)
+        """
+        tx = self.__transaction
+        if tx is None:
+            raise RuntimeError("savepoint() hanya bisa dipakai di dalam blok 'with db.transaction()'!")
+
+        tx.savepoint_count += 1
+        sp = Savepoint(f"sp_{tx.savepoint_count}")
+
+        # transaksi sudah gagal / tidak ada koneksi, savepoint tidak bisa dibuat
+        if tx.aborted:
+            yield sp
+            return
+
+        response = tx.response
+        tx.cursor.execute(sql.SQL("SAVEPOINT {}").format(sql.Identifier(sp.name)))
+        try:
+            yield sp
+        except BaseException:
+            sp.rollback_only = True
+            raise
+        finally:
+            if sp.rollback_only or tx.aborted:
+                tx.cursor.execute(sql.SQL("ROLLBACK TO SAVEPOINT {}").format(sql.Identifier(sp.name)))
+                sp.rolled_back = True
+                # error di dalam savepoint tidak ikut menggagalkan transaksi luar
+                tx.response = response
+            else:
+                tx.cursor.execute(sql.SQL("RELEASE SAVEPOINT {}").format(sql.Identifier(sp.name)))
+
+    def execute_pipeline(self, statements: List[Tuple[str, dict]], print_query: bool = False) -> DBResponse:
+        """
+        Jalankan banyak statement sekaligus dalam 1 round trip (statement digabung pakai ';' lalu dikirim 1x),
+        seluruh statement berjalan dalam 1 transaksi. result berisi hasil dari statement terakhir. example::
+
+            hasil = db.execute_pipeline([
+                ('UPDATE stok SET qty = qty - %(qty)s WHERE plu = %(plu)s', {'plu': '123', 'qty': 2}),
+                ('INSERT INTO log_stok (plu, qty) VALUES (%(plu)s, %(qty)s)', {'plu': '123', 'qty': -2}),
+            ])
+        """
+        try:
+            ec = self.__establish_connection()
+            if ec.is_error:
+                return ec
+
+            query = b";\n".join(self.__cursor.mogrify(query, param or None) for query, param in statements)
+            self.__cursor.execute(query)
+            self.__commit()
+
+            if print_query:
+                self.__print_query_aktual()
+
+            return self.__response("00000", None)
+        except TypeError:
+            return self.__handleTypeErrorException(statements)
+        except Exception as e:
+            self.__rollback()
+            e = self.__serialize_exception(e)
+            self.__logprint_exception(e)
+
+            return self.__response(e.pgcode, e.pgerror, e.diag)
+        finally:
+            if ec.status:
+                self.__release_connection()
+
     def execute_preserve(self, query: str, param: dict = {}, print_query: bool = False) -> DBResponse:
         '''
         NOTE:
+            - lebih disarankan pakai 'with db.transaction()', koneksi dijamin kembali ke pool walaupun lupa commit / release
             - khusus untuk method execute_preserve & execute_many_preserve WAJIB commit() diakhir,
             - juga WAJIB pakai try finally. example::
 
@@ -691,9 +1561,10 @@ class PostgresDatabase:
             self.__release_connection()
             return self.__response(e.pgcode, e.pgerror, e.diag)
 
-    def execute_many_preserve(self, query, listData, print_query: bool = False) -> DBResponse:
+    def execute_many_preserve(self, query, listData, print_query: bool = False, returning: bool = False, page_size: int = 1000) -> DBResponse:
         '''
         NOTE:
+            - lebih disarankan pakai 'with db.transaction()', koneksi dijamin kembali ke pool walaupun lupa commit / release
             - khusus untuk method execute_preserve & execute_many_preserve WAJIB commit() diakhir,
             - juga WAJIB pakai try finally release_connection(). example::
 
@@ -714,14 +1585,15 @@ class PostgresDatabase:
             if not status:
                 return ec
 
-            execute_values(
-                self.__cursor, query, listData, template=None, page_size=1000
-            )
+            result, rowcount = self.__execute_values(query, listData, page_size=page_size, fetch=returning)
 
             if print_query:
                 self.__print_query_aktual()
 
-            return self.__response("00000", None)
+            hasil = self.__response("00000", None)
+            hasil.result = result
+            hasil.rowcount = rowcount
+            return hasil
         except TypeError:
             self.__release_connection()
             return self.__handleTypeErrorException(query)
@@ -789,8 +1661,12 @@ class PostgresDatabase:
                     finally:
                         db.release_connection()
         '''
+        # deadline dari query _preserve terakhir wajib dilepas, jika tidak bisa cancel() query request lain di koneksi yg sama
+        query_deadline.unregister(self.__deadline)
+        self.__deadline = None
         try:
             self.__connection = self.__preserveConn
+            pool_watchdog.checkin(self.__connection)
             self.__connection_pool.putconn(self.__connection)
         except Exception:
             pass
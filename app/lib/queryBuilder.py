@@ -0,0 +1,275 @@
+"""
+    Modul queryBuilder, komposisi page query & count query untuk execute_dt.
+    Versi: 1.0 (19 Okt 2026)
+
+    Sebelumnya execute_dt memecah query string pakai replace(';', '') & split('LIMIT'), yang rusak jika ada
+    sub query / string literal / CTE, dan count query selalu membungkus query lengkap (termasuk ORDER BY).
+    Sekarang repo cukup deklarasi bagian-bagian query lewat SelectQuery, contoh:
+
+        query = SelectQuery(
+            select='id, name, email, age',
+            from_='datadummykaryawan',
+            where=['UPPER(name) LIKE %(search)s'],
+            columns={'id': 'id', 'name': 'name', 'age': 'age'},
+            key='id',
+            filter_types={'id': 'number', 'age': 'number', 'name': 'text'},
+        )
+        hasil = db.execute_dt(query, param, dt=dt)
+
+    execute_dt membuat page query (WHERE + filter DataTables + ORDER BY + LIMIT/OFFSET atau keyset)
+    dan count query (tanpa ORDER BY & tanpa seek). Teks statement di-cache per "bentuk" query
+    (filter & sort yang aktif), bukan per nilai param, karena nilai selalu lewat bind param.
+    Query string biasa tetap didukung, dipecah pakai sqlparse (hanya level paling luar) lalu di-cache juga.
+"""
+
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from psycopg2 import sql
+from threading import Lock
+from typing import Dict, Iterable, Tuple, Union
+from .dataTables import FILTER_TYPES, DTRequest
+
+# jumlah teks statement yang disimpan di cache
+STATEMENT_CACHE_SIZE = 512
+
+IDENTIFIER_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$')
+
+SqlPart = Union[str, sql.Composable]
+
+
+def toSql(part: SqlPart) -> sql.Composable:
+    # potongan query dari repo (bukan input user), string dianggap SQL apa adanya
+    return part if isinstance(part, sql.Composable) else sql.SQL(part)
+
+
+def columnSql(column: SqlPart) -> sql.Composable:
+    '''
+        Nama kolom pada whitelist -> sql.Identifier ('name' / 'k.name'),
+        selain itu (misal ekspresi UPPER(name)) wajib dibungkus sql.SQL secara eksplisit oleh repo
+    '''
+    if isinstance(column, sql.Composable):
+        return column
+    if not IDENTIFIER_PATTERN.match(column):
+        raise ValueError(f"Kolom '{column}' bukan nama kolom yang valid, bungkus pakai sql.SQL() jika berupa ekspresi")
+    return sql.Identifier(*column.split('.'))
+
+
+class ParsedQuery:
+    __slots__ = ('body', 'order_by', 'limit')
+
+    def __init__(self, body: str, order_by: str, limit: str) -> None:
+        # body: query tanpa ORDER BY & LIMIT paling luar, order_by: 'ORDER BY ...', limit: 'LIMIT ... OFFSET ...'
+        self.body = body
+        self.order_by = order_by
+        self.limit = limit
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def parseQuery(query: str) -> ParsedQuery:
+    '''
+        Pecah query string jadi body, ORDER BY, dan LIMIT/OFFSET pada level paling luar.
+        ORDER BY / LIMIT di dalam sub query, CTE, string literal, atau fungsi window tidak ikut terpecah.
+    '''
+    # sqlparse baru di-import ketika ada query string (bukan SelectQuery) yang pertama kali dipecah
+    import sqlparse
+
+    statement = sqlparse.parse(query.strip())[0]
+    tokens = list(statement.tokens)
+
+    # buang ';' & whitespace di akhir query
+    while tokens and (tokens[-1].is_whitespace or tokens[-1].match(sqlparse.tokens.Punctuation, ';')):
+        tokens.pop()
+
+    order_index = limit_index = None
+    for i, token in enumerate(tokens):
+        if token.ttype is not sqlparse.tokens.Keyword:
+            continue
+        # keyword gabungan bisa terpisah newline / beberapa spasi ('ORDER\n  BY'), whitespace dirapikan dulu
+        keyword = ' '.join(token.normalized.split())
+        if keyword == 'ORDER BY':
+            order_index, limit_index = i, None
+        elif keyword in ('LIMIT', 'OFFSET', 'FETCH') and limit_index is None:
+            limit_index = i
+
+    end_body = next(i for i in (order_index, limit_index, len(tokens)) if i is not None)
+    end_order = limit_index if limit_index is not None else len(tokens)
+
+    def join(part) -> str:
+        return ''.join(str(token) for token in part).strip()
+
+    return ParsedQuery(
+        body=join(tokens[:end_body]),
+        order_by=join(tokens[order_index:end_order]) if order_index is not None else '',
+        limit=join(tokens[limit_index:]) if limit_index is not None else '',
+    )
+
+
+class SelectQuery:
+    __slots__ = ('select', 'from_', 'where', 'order_by', 'with_', 'columns', 'key', 'not_null', 'filter_types')
+
+    def __init__(
+        self,
+        select: SqlPart,
+        from_: SqlPart,
+        where: Iterable[SqlPart] = (),
+        order_by: SqlPart = None,
+        with_: SqlPart = None,
+        columns: Dict[str, SqlPart] = None,
+        key: str = None,
+        not_null: Iterable[str] = (),
+        filter_types: Dict[str, str] = None,
+    ) -> None:
+        '''
+            select: daftar kolom, contoh 'id, name, email'
+            from_: tabel + join, contoh 'karyawan k JOIN cabang c ON c.id = k.cabang_id'
+            where: list kondisi (digabung pakai AND), nilai wajib lewat bind param, contoh ['k.aktif = %(aktif)s']
+            order_by: urutan default jika DataTables tidak mengirim order, contoh 'k.id DESC'
+            with_: isi CTE tanpa keyword WITH, contoh 'aktif AS (SELECT ...)'
+            columns: whitelist {data DataTables: kolom / ekspresi} yang boleh di-sort & di-filter oleh user
+            key: data DataTables yang unik (harus ada di columns), untuk urutan stabil & keyset pagination
+            not_null: data DataTables yang kolomnya NOT NULL, sort pada kolom yang bisa NULL tetap pakai OFFSET (bukan keyset)
+            filter_types: tipe filter per kolom {data DataTables: 'text' / 'prefix' / 'number' / 'date'} agar filter bisa pakai index,
+                kolom yang tidak dideklarasikan difilter pakai kolom::text ILIKE (lihat modul dataTables)
+            Query dengan GROUP BY / DISTINCT / UNION cukup pakai query string, execute_dt akan membungkusnya jadi sub query.
+        '''
+        self.select = select
+        self.from_ = from_
+        self.where = list(where)
+        self.order_by = order_by
+        self.with_ = with_
+        self.columns = columns or {}
+        self.key = key
+        self.not_null = tuple(not_null)
+        self.filter_types = dict(filter_types or {})
+
+        unknown = set(self.filter_types.values()) - set(FILTER_TYPES)
+        if unknown:
+            raise ValueError(f"filter_types {sorted(unknown)} tidak dikenal, pilih salah satu dari {FILTER_TYPES}")
+
+    @classmethod
+    def fromString(cls, query: str, columns: Dict[str, SqlPart] = None, key: str = None, not_null: Iterable[str] = (), filter_types: Dict[str, str] = None) -> Union['SelectQuery', ParsedQuery]:
+        '''
+            Query string + whitelist columns: query dibungkus jadi sub query, sort & filter DataTables pada kolom hasil query.
+            Tanpa columns: return ParsedQuery saja (query dipakai apa adanya, cukup tambah LIMIT/OFFSET).
+        '''
+        parsed = parseQuery(query)
+        if not columns:
+            return parsed
+
+        inner = f"{parsed.body} {parsed.order_by}".strip()
+        return cls(
+            select='*',
+            from_=sql.SQL("({}) AS dt").format(sql.SQL(inner)),
+            columns={data: sql.Identifier(column) if isinstance(column, str) else column for data, column in columns.items()},
+            key=key,
+            not_null=not_null,
+            filter_types=filter_types,
+        )
+
+    def shape(self) -> str:
+        # identitas query (tanpa nilai param), dipakai sebagai bagian key cache statement
+        return repr((self.select, self.from_, self.where, self.order_by, self.with_, sorted(self.columns.items(), key=lambda item: item[0]), self.not_null, sorted(self.filter_types.items())))
+
+    def compose(self, dt: DTRequest = None) -> Tuple[sql.Composable, sql.Composable, dict, tuple]:
+        '''
+            Return (page query, count query, param tambahan, bentuk query untuk key cache)
+        '''
+        if dt is not None and self.columns:
+            filters, seek, order, param = dt.compose({data: columnSql(column) for data, column in self.columns.items()}, self.key, self.not_null, self.filter_types)
+            shape = (
+                tuple(data for data in dt.column_search if data in self.columns),
+                tuple((item.column.data, item.dir, item.column.orderable) for item in dt.order),
+                seek is not None,
+            )
+        else:
+            filters = seek = order = None
+            param, shape = {}, ()
+
+        # halaman diambil dari row setelah seek, OFFSET tidak dipakai lagi
+        if seek is not None:
+            param['offset'] = 0
+
+        if order is None and self.order_by is not None:
+            order = toSql(self.order_by)
+
+        where = [toSql(part) for part in self.where]
+        if filters is not None:
+            where.append(filters)
+
+        def build(conditions: list, select: sql.Composable) -> sql.Composable:
+            parts = []
+            if self.with_ is not None:
+                parts.append(sql.SQL("WITH {}").format(toSql(self.with_)))
+            parts.append(sql.SQL("SELECT {} FROM {}").format(select, toSql(self.from_)))
+            if conditions:
+                parts.append(sql.SQL("WHERE {}").format(sql.SQL(' AND ').join(conditions)))
+            return sql.SQL(' ').join(parts)
+
+        page = build(where + ([seek] if seek is not None else []), toSql(self.select))
+        if order is not None:
+            page = sql.SQL("{} ORDER BY {}").format(page, order)
+        page = sql.SQL("{} LIMIT %(dt_limit)s OFFSET %(offset)s").format(page)
+
+        # count tanpa ORDER BY & tanpa seek, SELECT DISTINCT tetap dibungkus agar hasil hitungnya sama
+        select = self.select if isinstance(self.select, str) else getattr(self.select, 'string', '')
+        if select.strip().upper().startswith('DISTINCT'):
+            count = sql.SQL("SELECT COUNT(*) AS total FROM ({}) AS total").format(build(where, toSql(self.select)))
+        else:
+            count = build(where, sql.SQL("COUNT(*) AS total"))
+
+        return page, count, param, shape
+
+
+class StatementCache:
+    '''
+        Cache teks statement hasil composition (LRU), key = bentuk query.
+        as_string() butuh koneksi untuk quoting identifier, sehingga cukup dikerjakan 1x per bentuk query.
+    '''
+
+    def __init__(self, max_size: int = STATEMENT_CACHE_SIZE) -> None:
+        self.__max_size = max_size
+        self.__items = OrderedDict()
+        self.__lock = Lock()
+
+    def get(self, key):
+        with self.__lock:
+            value = self.__items.get(key)
+            if value is not None:
+                self.__items.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        with self.__lock:
+            self.__items[key] = value
+            self.__items.move_to_end(key)
+            while len(self.__items) > self.__max_size:
+                self.__items.popitem(last=False)
+
+
+statement_cache = StatementCache()
+
+
+def composeDataTable(query: Union[str, SelectQuery], context, dt: DTRequest = None, columns: Dict[str, SqlPart] = None, key: str = None, not_null: Iterable[str] = (), filter_types: Dict[str, str] = None) -> Tuple[str, str, dict]:
+    '''
+        Return (teks page query, teks count query, param tambahan) untuk execute_dt.
+        context: connection / cursor psycopg2 untuk as_string()
+    '''
+    if isinstance(query, str):
+        query = SelectQuery.fromString(query, columns, key, not_null, filter_types)
+
+        # query string tanpa whitelist: query dipakai apa adanya, LIMIT/OFFSET ditambahkan jika belum ada
+        if isinstance(query, ParsedQuery):
+            inner = f"{query.body} {query.order_by}".strip()
+            page = f"{inner} {query.limit}" if query.limit else f"{inner} LIMIT %(dt_limit)s OFFSET %(offset)s"
+            return page, f"SELECT COUNT(*) AS total FROM ({query.body}) AS total", {}
+
+    page, count, param, shape = query.compose(dt)
+    cache_key = (query.shape(), shape)
+
+    statement = statement_cache.get(cache_key)
+    if statement is None:
+        statement = (page.as_string(context), count.as_string(context))
+        statement_cache.put(cache_key, statement)
+
+    return statement[0], statement[1], param
@@ -0,0 +1,146 @@
+"""
+    Modul queryTimeout, batas waktu query untuk PostgresDatabase.
+    Versi: 1.0 (19 Okt 2026)
+
+    Tanpa statement_timeout, query yang lambat (search / export yang kebablasan) memegang koneksi pool & thread
+    gunicorn tanpa batas waktu, sehingga pool cepat habis. Batas waktu diatur per connection_key (bisa di-override
+    per PostgresDatabase), lalu dipasang di 2 sisi:
+        - server: SET LOCAL statement_timeout & lock_timeout di awal transaksi (otomatis hilang ketika commit / rollback)
+        - client: deadline per pemakaian koneksi, jika lewat maka query yang sedang berjalan di-cancel (connection.cancel()),
+          untuk kasus yang tidak tertangkap statement_timeout (misal banyak statement dalam 1 pemakaian koneksi)
+    Query yang kena timeout return DBResponse dengan pgcode '57014' (query_canceled) atau '55P03' (lock_not_available),
+    cek lewat property DBResponse.query_timeout.
+"""
+
+import heapq
+import os
+import time
+import traceback
+from datetime import datetime
+from itertools import count
+from threading import Condition, Thread
+from typing import Dict, Tuple, Union
+from psycopg2.extensions import TRANSACTION_STATUS_ACTIVE
+
+# kelas query: 'statement' untuk query biasa (execute, execute_dt, execute_many, dll), 'export' untuk execute_stream & copy_stream
+QUERY_CLASSES = ('statement', 'export')
+
+# deadline client = timeout server x DEADLINE_FACTOR, memberi ruang untuk beberapa statement dalam 1 pemakaian koneksi
+DEADLINE_FACTOR = 2
+
+# timeout per connection_key dalam milidetik, 0 = tanpa batas
+connection_timeouts: Dict[str, Dict[str, int]] = {
+    "default": {
+        "statement": 30000,
+        "export": 600000,
+        "lock": 5000,
+    },
+}
+
+
+def configureTimeout(connection_key: str = 'default', statement: int = None, export: int = None, lock: int = None) -> None:
+    '''
+        Atur timeout (milidetik) untuk connection_key, parameter None tidak diubah
+    '''
+    timeouts = connection_timeouts.setdefault(connection_key, {'statement': 0, 'export': 0, 'lock': 0})
+    for name, value in (('statement', statement), ('export', export), ('lock', lock)):
+        if value is not None:
+            timeouts[name] = int(value)
+
+
+def getTimeout(connection_key: str, query_class: str = 'statement', statement: int = None, lock: int = None) -> Tuple[int, int]:
+    '''
+        Return (statement_timeout, lock_timeout) dalam milidetik untuk connection_key & kelas query,
+        statement / lock (override dari PostgresDatabase) dipakai jika tidak None
+    '''
+    if query_class not in QUERY_CLASSES:
+        raise ValueError(f"Kelas query '{query_class}' tidak dikenal, pilih salah satu dari {QUERY_CLASSES}")
+
+    timeouts = connection_timeouts.get(connection_key, {})
+    return (
+        timeouts.get(query_class, 0) if statement is None else statement,
+        timeouts.get('lock', 0) if lock is None else lock,
+    )
+
+
+class QueryDeadline:
+    '''
+        Deadline di sisi client, 1 thread untuk seluruh koneksi (bukan 1 Timer per query).
+        Deadline yang sudah di-unregister tidak dihapus dari heap, cukup di-skip ketika waktunya lewat.
+    '''
+
+    def __init__(self) -> None:
+        self.__heap = []
+        self.__active: Dict[int, object] = {}
+        self.__counter = count(1)
+        self.__condition = Condition()
+        self.__thread = None
+        self.__pid = None
+
+    def __start(self) -> None:
+        # thread dibuat lazy di proses yang memakainya (thread tidak ikut ter-copy ketika gunicorn fork worker)
+        if self.__thread is not None and self.__pid == os.getpid():
+            return
+
+        with self.__condition:
+            if self.__thread is not None and self.__pid == os.getpid():
+                return
+            self.__pid = os.getpid()
+            self.__thread = Thread(target=self.__run, name='query_deadline', daemon=True)
+            self.__thread.start()
+
+    def register(self, connection, timeout_ms: int) -> Union[int, None]:
+        '''
+            Daftarkan deadline untuk koneksi, return token untuk unregister (None jika tanpa batas)
+        '''
+        if not timeout_ms:
+            return None
+
+        token = next(self.__counter)
+        deadline = time.monotonic() + timeout_ms * DEADLINE_FACTOR / 1000
+        with self.__condition:
+            self.__active[token] = connection
+            heapq.heappush(self.__heap, (deadline, token))
+            # bangunkan thread jika deadline ini lebih awal dari yang sedang ditunggu
+            if self.__heap[0][1] == token:
+                self.__condition.notify()
+        self.__start()
+        return token
+
+    def unregister(self, token: Union[int, None]) -> None:
+        if token is None:
+            return
+        with self.__condition:
+            self.__active.pop(token, None)
+
+    def __run(self) -> None:
+        while True:
+            expired = []
+            with self.__condition:
+                now = time.monotonic()
+                while self.__heap and self.__heap[0][0] <= now:
+                    _, token = heapq.heappop(self.__heap)
+                    connection = self.__active.pop(token, None)
+                    if connection is not None:
+                        expired.append(connection)
+                if not expired:
+                    self.__condition.wait(self.__heap[0][0] - now if self.__heap else None)
+                    continue
+
+            # cancel di luar lock, karena cancel() butuh round trip ke server
+            for connection in expired:
+                self.__cancel(connection)
+
+    def __cancel(self, connection) -> None:
+        try:
+            if connection.closed or connection.info.transaction_status != TRANSACTION_STATUS_ACTIVE:
+                return
+            time_now = datetime.now().strftime("[%d-%m-%Y %H:%M:%S]")
+            print(f"{time_now} [WARNING] Query melewati deadline client, query di-cancel (pid backend {connection.info.backend_pid})")
+            connection.cancel()
+        except Exception:
+            traceback.print_exc()
+
+
+# deadline client untuk seluruh PostgresDatabase
+query_deadline = QueryDeadline()
@@ -0,0 +1,218 @@
+"""
+    Modul replicaRouter, routing query read-only PostgresDatabase ke connection pool replica.
+    Versi: 1.0 (19 Okt 2026)
+
+    Query read-only (execute_dt, SELECT lewat execute, execute_stream, copy_stream) diarahkan ke replica milik
+    connection_key, query lain (INSERT / UPDATE / DELETE, execute_many, transaction, _preserve, dll) tetap ke primary.
+        - pemilihan replica: 'round_robin' atau 'least_busy' (koneksi yang sedang dipakai paling sedikit)
+        - lag replica dicek berkala (tiap check_interval detik), replica yang lag-nya > max_lag_seconds
+          atau tidak bisa dihubungi di-skip, jika tidak ada replica yang sehat maka query jalan di primary
+        - read-your-writes: setelah ada write di request yang sama, seluruh read berikutnya (connection_key yang sama)
+          tetap ke primary sampai request selesai (resetRouting() dipanggil di before_request)
+    Tanpa configureReplica(), seluruh query tetap ke primary seperti sebelumnya.
+"""
+
+import re
+import time
+import traceback
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from itertools import count
+from threading import Lock
+from typing import Dict, List, Union
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+STRATEGIES = ('round_robin', 'least_busy')
+
+# lag replica dalam detik, 0 jika server bukan replica (bukan dalam mode recovery)
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END AS lag
+"""
+
+READ_PATTERN = re.compile(r'^\s*(\(\s*)*(SELECT|WITH|VALUES|TABLE|SHOW|EXPLAIN)\b', re.IGNORECASE)
+WRITE_PATTERN = re.compile(
+    r'\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|INTO|NEXTVAL|SETVAL|FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE|ANALYZE)\b',
+    re.IGNORECASE,
+)
+
+# connection_key yang sudah melakukan write di request yang sedang berjalan
+written_keys: ContextVar[frozenset] = ContextVar('written_keys', default=frozenset())
+
+
+@lru_cache(maxsize=1024)
+def isReadOnly(query: str) -> bool:
+    '''
+        True jika query hanya membaca data: diawali SELECT / WITH / dll dan tidak mengandung keyword write
+        (termasuk SELECT ... FOR UPDATE, SELECT INTO, nextval). Fungsi yang mengubah data lewat SELECT tidak bisa dideteksi,
+        pakai PostgresDatabase(use_replica=False) untuk query seperti itu.
+    '''
+    return bool(READ_PATTERN.match(query)) and not WRITE_PATTERN.search(query)
+
+
+class Replica:
+    __slots__ = ('name', 'pool', 'healthy', 'lag', 'checked_at', 'checking')
+
+    def __init__(self, name: str, pool: ThreadedConnectionPool) -> None:
+        self.name = name
+        self.pool = pool
+        self.healthy = True
+        self.lag = 0.0
+        self.checked_at = 0.0
+        self.checking = False
+
+    @property
+    def in_use(self) -> int:
+        # jumlah koneksi yang sedang dipinjam dari pool (_used milik AbstractConnectionPool)
+        return len(self.pool._used)
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'healthy': self.healthy,
+            'lag': round(self.lag, 2),
+            'in_use': self.in_use,
+        }
+
+
+class ReplicaRouter:
+    def __init__(self, strategy: str = 'round_robin', max_lag_seconds: float = 5, check_interval: float = 5) -> None:
+        '''
+            strategy: 'round_robin' / 'least_busy'
+            max_lag_seconds: batas lag replica, lebih dari itu replica di-skip
+            check_interval: jeda antar pengecekan lag per replica (detik)
+        '''
+        self.__replicas: Dict[str, List[Replica]] = {}
+        self.__counter = count()
+        self.__lock = Lock()
+        self.configure(strategy, max_lag_seconds, check_interval)
+
+    def configure(self, strategy: str, max_lag_seconds: float, check_interval: float) -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Strategy '{strategy}' tidak dikenal, pilih salah satu dari {STRATEGIES}")
+        self.strategy = strategy
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+
+    def add(self, connection_key: str, name: str, pool: ThreadedConnectionPool) -> None:
+        with self.__lock:
+            self.__replicas.setdefault(connection_key, []).append(Replica(name, pool))
+
+    def replicas(self, connection_key: str) -> List[Dict]:
+        return [replica.to_dict() for replica in self.__replicas.get(connection_key, [])]
+
+    def pools(self, connection_key: str) -> List[Replica]:
+        # untuk configurePool & warmUpPool di postgresKonektor
+        return list(self.__replicas.get(connection_key, []))
+
+    def choose(self, connection_key: str) -> Union[Replica, None]:
+        '''
+            Pilih replica untuk query read-only, None jika harus ke primary
+            (tidak ada replica, semua replica tidak sehat / lag, atau sudah ada write di request ini)
+        '''
+        replicas = self.__replicas.get(connection_key)
+        if not replicas or connection_key in written_keys.get():
+            return None
+
+        for replica in replicas:
+            self.__refresh(replica)
+
+        candidates = [replica for replica in replicas if replica.healthy]
+        if not candidates:
+            return None
+        if self.strategy == 'least_busy':
+            return min(candidates, key=lambda replica: replica.in_use)
+        return candidates[next(self.__counter) % len(candidates)]
+
+    def __refresh(self, replica: Replica) -> None:
+        # cek lag cukup oleh 1 thread, thread lain tetap memakai status terakhir
+        with self.__lock:
+            if replica.checking or time.monotonic() - replica.checked_at < self.check_interval:
+                return
+            replica.checking = True
+
+        try:
+            connection = replica.pool.getconn()
+        except PoolError:
+            # pool penuh artinya replica sedang dipakai, bukan tidak sehat; cek ulang di pemanggilan berikutnya
+            with self.__lock:
+                replica.checking = False
+            return
+        except Exception as e:
+            self.mark_unhealthy(replica, f"{type(e).__name__}: {str(e).strip()}")
+            with self.__lock:
+                replica.checking = False
+            return
+
+        close = False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(LAG_QUERY)
+                replica.lag = float(cursor.fetchone()[0])
+            connection.rollback()
+            self.__set_health(replica, replica.lag <= self.max_lag_seconds, f"lag {replica.lag:.1f} detik")
+        except Exception as e:
+            close = True
+            self.__set_health(replica, False, f"{type(e).__name__}: {str(e).strip()}")
+        finally:
+            try:
+                replica.pool.putconn(connection, close=close)
+            except Exception:
+                traceback.print_exc()
+            with self.__lock:
+                replica.checked_at = time.monotonic()
+                replica.checking = False
+
+    def __set_health(self, replica: Replica, healthy: bool, reason: str) -> None:
+        if replica.healthy != healthy:
+            time_now = datetime.now().strftime("[%d-%m-%Y %H:%M:%S]")
+            status = "sehat kembali" if healthy else "di-skip, query dialihkan ke primary"
+            print(f"{time_now} [WARNING] Replica '{replica.name}' {status} ({reason})")
+        replica.healthy = healthy
+
+    def mark_unhealthy(self, replica: Replica, reason: str) -> None:
+        '''
+            Tandai replica tidak sehat (misal gagal connect), dicek ulang setelah check_interval
+        '''
+        self.__set_health(replica, False, reason)
+        replica.checked_at = time.monotonic()
+
+    def mark_write(self, connection_key: str) -> None:
+        written = written_keys.get()
+        if connection_key not in written and self.__replicas.get(connection_key):
+            written_keys.set(written | {connection_key})
+
+
+# router default untuk global_connection_pool
+replica_router = ReplicaRouter()
+
+
+def configureReplica(connection_key: str, dsn_list: List[str], strategy: str = 'round_robin', max_lag_seconds: float = 5, check_interval: float = 5, maxconn: int = 2, minconn: int = 2) -> None:
+    '''
+        Daftarkan replica untuk connection_key, dsn_list berisi DSN libpq per replica,
+        contoh ['host=10.0.0.2 port=5432 dbname=postgres user=postgres password=admin']
+        minconn: koneksi idle yang disimpan per replica (minconn=0 artinya setiap read membuka koneksi baru)
+    '''
+    replica_router.configure(strategy, max_lag_seconds, check_interval)
+    for dsn in dsn_list:
+        # minconn di-set setelah pool dibuat: ThreadedConnectionPool langsung membuka minconn koneksi ketika dibuat,
+        # koneksi tsb akan ikut ter-copy ketika gunicorn fork worker. Koneksi dibuka lazy / lewat warmUpPool()
+        pool = ThreadedConnectionPool(minconn=0, maxconn=maxconn, dsn=dsn, connect_timeout=3)
+        pool.minconn = min(max(minconn, 0), maxconn)
+        name = ' '.join(part for part in dsn.split() if part.startswith(('host=', 'port=')))
+        replica_router.add(connection_key, name or dsn, pool)
+
+
+def resetRouting() -> None:
+    '''
+        Reset status read-your-writes, dipanggil di awal setiap request
+    '''
+    written_keys.set(frozenset())
+
+
+def getReplicaRouter() -> ReplicaRouter:
+    return replica_router
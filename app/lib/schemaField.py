@@ -10,11 +10,22 @@ SIGNED = {'signed': True}
     DataTables
 '''
 
+# dt counter request, dikembalikan lagi ke DataTables apa adanya
+dt_draw = Integer(
+    required=False,
+)
+
 # dt offset
 dt_start = Integer(
     required=True,
 )
 
+# dt limit per halaman
+dt_length = Integer(
+    required=False,
+    validate=Range(min=1, max=100)
+)
+
 dt_search = Str(
     required=False,
     validate=Length(max=30)
@@ -0,0 +1,62 @@
+"""
+    Modul spooledUpload, file upload & hasil compress ditampung di SpooledTemporaryFile.
+    Versi: 1.0 (19 Okt 2026)
+
+    File kecil tetap di memory, begitu ukurannya lewat dari batas (spool_max_memory) otomatis pindah ke disk,
+    sehingga banyak upload besar yang bersamaan tidak melipatgandakan pemakaian memory container.
+"""
+
+import shutil
+from flask import Request
+from tempfile import SpooledTemporaryFile
+from typing import IO, Union
+from werkzeug.datastructures import FileStorage
+
+# batas data yang ditampung di memory per file (byte), sisanya ditulis ke disk.
+# Sama dgn batas bawaan werkzeug (500kb), agar memory per upload tidak lebih besar dari tanpa SpooledRequest
+SPOOL_MAX_MEMORY = 500 * 1024
+
+# ukuran chunk ketika menyalin stream yang tidak bisa di-seek
+CHUNK_SIZE = 64 * 1024
+
+
+def configureSpool(max_memory_kb: int) -> None:
+    global SPOOL_MAX_MEMORY
+    SPOOL_MAX_MEMORY = max_memory_kb * 1024
+
+
+def spooledStream() -> SpooledTemporaryFile:
+    '''
+        Stream kosong untuk menampung file (misal hasil compress), pengganti BytesIO()
+    '''
+    return SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY, mode="w+b")
+
+
+def streamSize(stream: Union[FileStorage, IO[bytes]]) -> int:
+    '''
+        Hitung ukuran stream (byte) tanpa memindahkan posisi baca-nya, cukup seek ke akhir (tanpa baca isi file).
+        FileStorage yang stream-nya tidak bisa di-seek, sisa isinya disalin dulu ke spooledStream() lalu
+        file.stream diganti dgn salinan tersebut. Stream lain wajib bisa di-seek, jika tidak raise ValueError.
+    '''
+    if not getattr(stream, 'seekable', lambda: False)():
+        if not isinstance(stream, FileStorage):
+            raise ValueError("streamSize() butuh stream yang bisa di-seek!")
+        spooled = spooledStream()
+        shutil.copyfileobj(stream.stream, spooled, CHUNK_SIZE)
+        spooled.seek(0)
+        stream.stream = spooled
+
+    position = stream.tell()
+    size = stream.seek(0, 2)
+    stream.seek(position)
+    return size
+
+
+class SpooledRequest(Request):
+    '''
+        Request flask dengan batas memory upload sesuai SPOOL_MAX_MEMORY (bawaan werkzeug fix 500kb).
+        Pasang lewat app.request_class = SpooledRequest
+    '''
+
+    def _get_file_stream(self, total_content_length: Union[int, None], content_type: Union[str, None], filename: str = None, content_length: int = None) -> IO[bytes]:
+        return spooledStream()
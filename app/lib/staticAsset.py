@@ -0,0 +1,263 @@
+"""
+    Modul staticAsset, pipeline file static: bundle, minify, fingerprint (hash isi file), dan precompress .gz.
+    Versi: 1.0 (19 Okt 2026)
+
+    Build dijalankan sekali ketika build image (lihat Dockerfile):
+        flask --app main build-assets
+    Hasil build ada di app/static/dist (tidak di-commit):
+        - hanya file yang dipakai template (url_for('static', ...) & asset_bundle(...)), beserta font / gambar yang
+          direferensikan lewat url() di file css tsb, plugin yang tidak dipakai tidak ikut
+        - nama file berisi hash isi file, contoh dist/plugins/jquery/jquery.min.3f2a9c1d7e4b.js
+        - bundle (config.STATIC_BUNDLES) digabung jadi 1 file per bundle, file yang belum .min di-minify
+        - file teks diberi versi .gz (gzip level 9), dikirim apa adanya jika browser menerima gzip
+        - manifest.json berisi mapping nama asli -> nama hasil build
+    Ketika manifest ada, url_for('static', filename=...) otomatis mengarah ke file hasil build dan dikirim dengan
+    Cache-Control: public, max-age=1 tahun, immutable (isi file berubah = nama file berubah).
+    Tanpa manifest (development), seluruh file static tetap dikirim seperti biasa.
+"""
+
+import gzip
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+from hashlib import blake2b
+from flask import Flask, abort, request, send_file, url_for
+from markupsafe import Markup, escape
+from typing import Dict, List, Set
+from werkzeug.security import safe_join
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# cache browser 1 tahun, nama file sudah berisi hash isi file
+IMMUTABLE_MAX_AGE = 31536000
+
+# file yang layak di-gzip (woff / woff2 / png / gif sudah terkompresi)
+GZIP_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt', '.eot', '.ttf', '.map', '.html'}
+GZIP_MIN_SIZE = 1024
+
+STATIC_URL_PATTERN = re.compile(r"""url_for\(\s*['"]static['"]\s*,\s*filename\s*=\s*['"]([^'"]+)['"]""")
+BUNDLE_PATTERN = re.compile(r"""asset_bundle\(\s*['"]([^'"]+)['"]""")
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(['"]?)([^'")]+?)\1\s*\)""")
+
+
+def fileHash(content: bytes) -> str:
+    return blake2b(content, digest_size=6).hexdigest()
+
+
+def hashedName(relpath: str, content: bytes) -> str:
+    # plugins/jquery/jquery.min.js -> plugins/jquery/jquery.min.3f2a9c1d7e4b.js
+    root, ext = posixpath.splitext(relpath)
+    return f"{root}.{fileHash(content)}{ext}"
+
+
+def minifyCss(content: str) -> str:
+    '''
+        Minify css sederhana: buang komentar (kecuali /*! lisensi */) & whitespace berlebih
+    '''
+    content = re.sub(r'/\*(?!!)[\s\S]*?\*/', '', content)
+    content = re.sub(r'\s+', ' ', content)
+    content = re.sub(r'\s*([{};])\s*', r'\1', content)
+    return content.replace(';}', '}').strip()
+
+
+def minifyJs(content: str) -> str:
+    # minify js butuh parser, hanya dilakukan jika rjsmin terinstall
+    return rjsmin.jsmin(content) if rjsmin is not None else content
+
+
+class StaticAssets:
+    def __init__(self, app: Flask = None, bundles: Dict[str, List[str]] = None) -> None:
+        self.bundles: Dict[str, List[str]] = {}
+        self.manifest = {'files': {}, 'bundles': {}}
+        if app is not None:
+            self.init_app(app, bundles)
+
+    def init_app(self, app: Flask, bundles: Dict[str, List[str]] = None) -> None:
+        '''
+            bundles: {'vendor.js': ['plugins/jquery/jquery.min.js', ...], 'vendor.css': [...]}
+        '''
+        self.bundles = bundles or {}
+        self.static_folder = app.static_folder
+        self.template_folder = os.path.join(app.root_path, app.template_folder)
+        self.dist_folder = os.path.join(self.static_folder, DIST_DIR)
+        self.manifest = self.loadManifest()
+
+        app.url_defaults(self.__url_defaults)
+        # rule /static/dist/... lebih spesifik dari /static/<path>, sehingga dicocokkan lebih dulu oleh werkzeug
+        app.add_url_rule(f"{app.static_url_path}/{DIST_DIR}/<path:filename>", endpoint='static_dist', view_func=self.sendDist)
+        app.jinja_env.globals['asset_bundle'] = self.bundleTags
+        app.cli.command('build-assets', help='Build file static (bundle, minify, hash, gzip) ke app/static/dist')(self.__build_command)
+
+    def loadManifest(self) -> dict:
+        try:
+            with open(os.path.join(self.dist_folder, MANIFEST_NAME), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'files': {}, 'bundles': {}}
+
+    def __url_defaults(self, endpoint: str, values: dict) -> None:
+        # url_for('static', filename='plugins/jquery/jquery.min.js') -> /static/dist/plugins/jquery/jquery.min.<hash>.js
+        if endpoint == 'static' and 'filename' in values:
+            built = self.manifest['files'].get(values['filename'])
+            if built is not None:
+                values['filename'] = built
+
+    def bundleTags(self, name: str) -> Markup:
+        '''
+            Jinja global asset_bundle('vendor.js'): 1 tag ke file bundle hasil build,
+            atau 1 tag per file anggota bundle jika belum di-build
+        '''
+        built = self.manifest['bundles'].get(name)
+        urls = [url_for('static', filename=built)] if built else [url_for('static', filename=filename) for filename in self.bundles[name]]
+        tag = '<script src="{}"></script>' if name.endswith('.js') else '<link rel="stylesheet" href="{}" />'
+        return Markup('\n    '.join(tag.format(escape(url)) for url in urls))
+
+    def sendDist(self, filename: str):
+        path = safe_join(self.dist_folder, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        if 'gzip' in request.accept_encodings and os.path.isfile(path + '.gz'):
+            response = send_file(path + '.gz', mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = send_file(path, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE)
+
+        response.vary.add('Accept-Encoding')
+        response.cache_control.immutable = True
+        return response
+
+    def __build_command(self) -> None:
+        manifest = self.build()
+        print(f"{len(manifest['files'])} file & {len(manifest['bundles'])} bundle ditulis ke {self.dist_folder}")
+
+    def build(self) -> dict:
+        '''
+            Build seluruh file static yang dipakai template ke app/static/dist, return manifest
+        '''
+        filenames, bundle_names = self.__scanTemplates()
+        shutil.rmtree(self.dist_folder, ignore_errors=True)
+        os.makedirs(self.dist_folder)
+
+        files: Dict[str, str] = {}
+        for filename in sorted(filenames):
+            self.__emit(filename, files)
+
+        bundles = {}
+        for name in sorted(bundle_names):
+            parts = []
+            for filename in self.bundles[name]:
+                content = self.__process(filename, files, posixpath.dirname(name))
+                if content is not None:
+                    parts.append(content)
+            # ';' mencegah file js yang tidak diakhiri ';' tergabung dgn file berikutnya
+            content = ('\n;\n' if name.endswith('.js') else '\n').join(parts).encode('utf-8')
+            bundles[name] = self.__write(hashedName(name, content), content)
+
+        manifest = {'files': files, 'bundles': bundles}
+        with open(os.path.join(self.dist_folder, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        self.manifest = manifest
+        return manifest
+
+    def __scanTemplates(self):
+        filenames: Set[str] = set()
+        bundle_names: Set[str] = set()
+        for root, _, names in os.walk(self.template_folder):
+            for name in names:
+                with open(os.path.join(root, name), encoding='utf-8', errors='ignore') as f:
+                    template = f.read()
+                filenames.update(STATIC_URL_PATTERN.findall(template))
+                bundle_names.update(BUNDLE_PATTERN.findall(template))
+
+        unknown = bundle_names - set(self.bundles)
+        if unknown:
+            raise KeyError(f"Bundle {sorted(unknown)} dipakai template tapi tidak ada di STATIC_BUNDLES")
+        return filenames, bundle_names
+
+    def __process(self, filename: str, files: Dict[str, str], output_dir: str):
+        '''
+            Isi file (str) yang sudah di-minify, url() pada css diarahkan ke file hasil build relatif terhadap output_dir.
+            None jika file tidak ada.
+        '''
+        path = safe_join(self.static_folder, filename)
+        if path is None or not os.path.isfile(path):
+            print(f"[WARNING] File static '{filename}' tidak ditemukan, di-skip")
+            return None
+
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        minified = '.min.' in posixpath.basename(filename)
+
+        if filename.endswith('.css'):
+            def replace(match) -> str:
+                url = match.group(2).strip()
+                if url.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+                    return match.group(0)
+                target, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+                target = posixpath.normpath(posixpath.join(posixpath.dirname(filename), target))
+                built = self.__emit(target, files)
+                if built is None:
+                    return match.group(0)
+                return f"url({posixpath.relpath(built, posixpath.join(DIST_DIR, output_dir))}{suffix})"
+
+            content = CSS_URL_PATTERN.sub(replace, content)
+            if not minified:
+                content = minifyCss(content)
+        elif filename.endswith('.js') and not minified:
+            content = minifyJs(content)
+
+        return content
+
+    def __emit(self, filename: str, files: Dict[str, str]):
+        '''
+            Tulis 1 file (beserta dependency url() jika css) ke dist, return path hasil build relatif terhadap static
+        '''
+        if filename in files:
+            return files[filename]
+
+        if filename.endswith(('.css', '.js')):
+            content = self.__process(filename, files, posixpath.dirname(filename))
+            if content is None:
+                return None
+            content = content.encode('utf-8')
+        else:
+            path = safe_join(self.static_folder, filename)
+            if path is None or not os.path.isfile(path):
+                print(f"[WARNING] File static '{filename}' tidak ditemukan, di-skip")
+                return None
+            with open(path, 'rb') as f:
+                content = f.read()
+
+        files[filename] = self.__write(hashedName(filename, content), content)
+        return files[filename]
+
+    def __write(self, relpath: str, content: bytes) -> str:
+        path = os.path.join(self.dist_folder, *relpath.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+        if posixpath.splitext(relpath)[1] in GZIP_EXTENSIONS and len(content) >= GZIP_MIN_SIZE:
+            # mtime=0 agar hasil build sama persis untuk isi file yang sama
+            with open(path + '.gz', 'wb') as f:
+                f.write(gzip.compress(content, compresslevel=9, mtime=0))
+
+        return f"{DIST_DIR}/{relpath}"
+
+
+static_assets = StaticAssets()
+
+
+def configureStaticAssets(app: Flask, bundles: Dict[str, List[str]]) -> None:
+    static_assets.init_app(app, bundles)
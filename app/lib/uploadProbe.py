@@ -0,0 +1,95 @@
+"""
+    Modul uploadProbe, probe file gambar & pdf upload cukup 1x.
+    Versi: 1.1 (19 Okt 2026)
+
+    Sebelumnya 1 gambar upload dibuka Pillow 3x: di ImageFile._deserialize, secureImgFileName, dan compressImage.
+    Hasil probe (format, size, mode, dan handle PIL.Image yang masih lazy) disimpan pada FileStorage-nya,
+    sehingga validasi, pengamanan nama file, dan compress memakai handle yang sama.
+    Pixel gambar baru di-decode ketika benar-benar dibutuhkan (compress), Image.open() hanya membaca header.
+    Begitu juga pdf, handle pikepdf hasil validasi PdfFile dipakai ulang oleh compressPdf.
+"""
+
+from werkzeug.datastructures import FileStorage
+
+
+class ImageProbe:
+    def __init__(self, file: FileStorage) -> None:
+        # simpan stream yang di-probe, jika file.stream diganti (misal setelah compress) maka probe dianggap basi
+        self.stream = file.stream
+        self.stream.seek(0)
+
+        from PIL import Image
+        self.image = Image.open(self.stream)
+        self.format = self.image.format
+        self.size = self.image.size
+        self.mode = self.image.mode
+        self.closed = False
+
+    def close(self) -> None:
+        # stream milik FileStorage tidak ikut ditutup, karena Image.open() dari file object tidak exclusive
+        self.image.close()
+        self.closed = True
+
+
+def probeImage(file: FileStorage) -> ImageProbe:
+    '''
+        Ambil hasil probe gambar dari FileStorage, jika belum ada / sudah basi maka probe ulang.
+        Raise exception yang sama dengan Image.open() jika file bukan gambar yang valid.
+    '''
+    probe = getattr(file, '_image_probe', None)
+    if probe is None or probe.closed or probe.stream is not file.stream:
+        probe = ImageProbe(file)
+        file._image_probe = probe
+
+    return probe
+
+
+class PdfProbe:
+    # jumlah byte di awal & akhir file yang dibaca untuk cek header dan trailer
+    HEAD_SIZE = 1024
+    TAIL_SIZE = 2048
+
+    def __init__(self, file: FileStorage) -> None:
+        self.stream = file.stream
+
+        # cek struktur dasar tanpa parsing: header '%PDF-' di awal, 'startxref' & '%%EOF' di akhir
+        self.stream.seek(0)
+        head = self.stream.read(PdfProbe.HEAD_SIZE)
+        self.stream.seek(0, 2)
+        self.stream.seek(max(self.stream.tell() - PdfProbe.TAIL_SIZE, 0))
+        tail = self.stream.read(PdfProbe.TAIL_SIZE)
+        self.stream.seek(0)
+        self.has_header = b'%PDF-' in head
+        self.has_trailer = b'startxref' in tail and b'%%EOF' in tail
+
+        # pikepdf hanya membaca xref & trailer, object lain baru dibaca ketika dibutuhkan.
+        # attempt_recovery=False agar xref yang rusak langsung dianggap tidak valid (bukan diperbaiki diam-diam)
+        from pikepdf import Pdf
+        self.pdf = Pdf.open(self.stream, attempt_recovery=False)
+        self.is_encrypted = self.pdf.is_encrypted
+        self.page_count = len(self.pdf.pages)
+        # /Size pada trailer adalah jumlah entry xref (object) pada file
+        self.object_count = int(self.pdf.trailer.get('/Size', 0))
+        self.closed = False
+
+    def check(self) -> list:
+        # pengecekan penuh (baca & decode seluruh object), pikepdf >= 9 mengganti nama check() jadi check_pdf_syntax()
+        check = getattr(self.pdf, 'check_pdf_syntax', None) or self.pdf.check
+        return check()
+
+    def close(self) -> None:
+        self.pdf.close()
+        self.closed = True
+
+
+def probePdf(file: FileStorage) -> PdfProbe:
+    '''
+        Ambil hasil probe pdf dari FileStorage, jika belum ada / sudah basi maka probe ulang.
+        Raise exception yang sama dengan Pdf.open() jika file bukan pdf yang valid.
+    '''
+    probe = getattr(file, '_pdf_probe', None)
+    if probe is None or probe.closed or probe.stream is not file.stream:
+        probe = PdfProbe(file)
+        file._pdf_probe = probe
+
+    return probe
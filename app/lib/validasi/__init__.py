@@ -5,13 +5,14 @@
     NOTE: Pengecekan file kurang aman jika hanya mengecek berdasarkan 'magic numbers' seperti yang dilakukan modul berikut:
     imghdr, filetype, puremagic, python-magic. Sehingga pada modul ini saya tidak menggunakannya
 """
-from .validasi import Validasi
+from .validasi import Validasi, ValidasiBatch
 from .fields import ExcelFile, ImageFile, PdfFile
 from .utils import decodeValidationError
 from .validate import file_size
 
 __all__ = [
     "Validasi",
+    "ValidasiBatch",
     "ExcelFile",
     "ImageFile",
     "PdfFile",
@@ -2,10 +2,8 @@ from marshmallow import ValidationError
 from marshmallow.fields import Field
 from traceback import print_exc
 from werkzeug.datastructures import FileStorage
-from openpyxl import load_workbook
 from zipfile import BadZipFile
-from PIL import Image, UnidentifiedImageError
-from pikepdf import Pdf, PasswordError, PdfError
+from ..uploadProbe import probeImage, probePdf
 
 
 class ExcelFile(Field):
@@ -15,6 +13,9 @@ class ExcelFile(Field):
     ]
 
     def _deserialize(self, value, attr, data, **kwargs) -> FileStorage:
+        # openpyxl (import berat) baru dimuat ketika ada file excel yang divalidasi
+        from openpyxl import load_workbook
+
         try:
             if not isinstance(value, FileStorage):
                 raise ValidationError("Server gagal melakukan pengecekan!")
@@ -47,6 +48,8 @@ class ImageFile(Field):
     ALLOWED_IMAGE_FORMAT = ["jpg", "jpeg", "png"]
 
     def _deserialize(self, value, attr, data, **kwargs) -> FileStorage:
+        from PIL import UnidentifiedImageError
+
         try:
             if not isinstance(value, FileStorage):
                 raise ValidationError("Server gagal melakukan pengecekan!")
@@ -59,8 +62,9 @@ class ImageFile(Field):
                 )
 
             # kita coba buka gambar untuk memastikan file benar-benar gambar
-            # langkah ini juga mencegah dari serangan "decompression bombs"
-            img = Image.open(value)
+            # langkah ini juga mencegah dari serangan "decompression bombs".
+            # hasil probe disimpan di FileStorage, sehingga secureImgFileName & compressImage tidak perlu buka ulang
+            img = probeImage(value).image
 
             # Content-Type dan extensi file masih bisa ditembus, contoh: file 'img.png', tapi ternyata file .gif
             # jadi kita baca format gambar-nya langsung untuk memastikan
@@ -88,9 +92,26 @@ class ImageFile(Field):
             )
 
 class PdfFile(Field):
-    # TODO: buat validasi untuk pdf yang diberi password
+    '''
+        Validasi file pdf, default-nya hanya cek struktur (cepat, tidak tergantung ukuran dokumen):
+        header, xref & trailer, jumlah halaman, dan flag enkripsi. Param tambahan:
+            - full_check: jika True maka jalankan juga pdf.check() yang membaca & decode seluruh object (lambat untuk pdf besar)
+            - max_pages: batas jumlah halaman, None artinya tidak dibatasi
+            - max_objects: batas jumlah object pada pdf, None artinya tidak dibatasi
+            - allow_encrypted: jika False maka pdf yang terenkripsi (walaupun tanpa password) ditolak
+        contoh: dokumen = PdfFile(required=True, max_pages=50, validate=file_size(max_kb=5120))
+    '''
+
+    def __init__(self, *args, full_check: bool = False, max_pages: int = None, max_objects: int = None, allow_encrypted: bool = True, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.full_check = full_check
+        self.max_pages = max_pages
+        self.max_objects = max_objects
+        self.allow_encrypted = allow_encrypted
 
     def _deserialize(self, value, attr, data, **kwargs) -> FileStorage:
+        from pikepdf import PasswordError, PdfError
+
         if not isinstance(value, FileStorage):
             raise ValidationError("Server gagal melakukan pengecekan!")
 
@@ -101,13 +122,28 @@ class PdfFile(Field):
                     "Maaf, hanya file pdf yang boleh diupload!"
                 )
 
-            # Content-Type masih bisa dimanipulasi, sehingga kita coba buka file pdf untuk memastikan
-            pdf = Pdf.open(value)
-            # Check if PDF is syntactically well-formed.
-            if pdf.check():
-                print("hasil pdf.check():", pdf.check())
+            # Content-Type masih bisa dimanipulasi, sehingga kita coba buka file pdf untuk memastikan.
+            # hasil probe disimpan di FileStorage, sehingga compressPdf tidak perlu buka ulang
+            probe = probePdf(value)
+            if not probe.has_header or not probe.has_trailer or probe.page_count < 1:
                 raise ValidationError("File pdf yang anda upload tidak valid!")
 
+            if probe.is_encrypted and not self.allow_encrypted:
+                raise ValidationError("Maaf, file pdf yang terenkripsi / diberi password tidak boleh diupload!")
+
+            if self.max_pages is not None and probe.page_count > self.max_pages:
+                raise ValidationError(f"Jumlah halaman pdf tidak boleh lebih dari {self.max_pages} halaman!")
+
+            if self.max_objects is not None and probe.object_count > self.max_objects:
+                raise ValidationError("File pdf yang anda upload terlalu kompleks!")
+
+            # Check if PDF is syntactically well-formed.
+            if self.full_check:
+                problems = probe.check()
+                if problems:
+                    print("hasil pdf.check():", problems)
+                    raise ValidationError("File pdf yang anda upload tidak valid!")
+
             return value
         except (PasswordError, PdfError, TypeError, FileNotFoundError):
             # jika file pdf gagal untuk dibaca, maka dianggap tidak valid
@@ -119,4 +155,4 @@ class PdfFile(Field):
             print_exc()
             raise ValidationError(
                 "Server gagal melakukan validasi pada file pdf yang anda upload!"
-            )
\ No newline at end of file
+            )
@@ -1,12 +1,16 @@
 from itsdangerous.serializer import Serializer
+from itsdangerous.exc import BadSignature
 from marshmallow import ValidationError
 from typing import List, Dict
 from werkzeug.datastructures import FileStorage
-from PIL import Image
 from werkzeug.utils import secure_filename
 import inspect
+from copy import deepcopy
 from datetime import datetime
+from functools import lru_cache
+from urllib.parse import unquote
 from app import serializer
+from ..uploadProbe import probeImage
 
 '''
     Wajib setup serializer, jika didapat dari hasil import,
@@ -16,6 +20,50 @@ from app import serializer
 
 
 
+# jumlah maksimal hasil verifikasi tanda tangan (itsdangerous) yang disimpan di cache
+SIGNED_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=SIGNED_CACHE_SIZE)
+def _loadsSignedCached(token: str):
+    # hanya token yang valid yang masuk cache, BadSignature tidak di-cache oleh lru_cache
+    return serializer.loads(token)
+
+
+def loadsSigned(value: str):
+    """
+    Verifikasi data yang ditandatangani itsdangerous (field SIGNED), contoh: '"KZ01"$.$j2KKEBkIhr8xN3n0w6Rwv3GvJbE'.
+    Hasil verifikasi di-cache (LRU) berdasarkan token lengkap (payload + signature), sehingga token yang sama
+    (misal id dari DataTables yang bolak-balik dikirim) tidak perlu HMAC + decode JSON ulang.
+    Token yang berubah sedikit saja tetap diverifikasi ulang, raise BadSignature jika tidak valid.
+    """
+    if not isinstance(value, str):
+        raise BadSignature("Data yang ditandatangani wajib berupa string!")
+
+    payload = _loadsSignedCached(unquote(value))
+    # payload mutable di-copy agar isi cache tidak ikut berubah
+    return deepcopy(payload) if isinstance(payload, (dict, list)) else payload
+
+
+def loadsSignedMany(values: list) -> list:
+    """
+    Verifikasi banyak token sekaligus (misal form / bulk data dengan banyak field SIGNED),
+    token yang sama cukup diverifikasi 1x. Return list payload dengan urutan yang sama, raise BadSignature jika ada yang tidak valid.
+    """
+    verified = {}
+    result = []
+    for value in values:
+        # selain string (misal list / dict dari JSON client) tidak bisa jadi key dict, langsung ke loadsSigned (BadSignature)
+        if not isinstance(value, str):
+            result.append(loadsSigned(value))
+            continue
+        if value not in verified:
+            verified[value] = loadsSigned(value)
+        result.append(verified[value])
+
+    return result
+
+
 class FileTypeNotSupported(Exception):
     """
     Raise ketika data dengan tipe FileStorage yang hendak divalidasi Content-Type-nya tidak tercantum dalam constant Validasi.SUPPORTED_FILES
@@ -84,8 +132,8 @@ def securePdfFileName(file: FileStorage) -> FileStorage:
 
 
 def secureImgFileName(file: FileStorage) -> FileStorage:
-    # output extensi = 'jpg, png, jpeg, ...'
-    extensi = Image.open(file).format.lower()
+    # output extensi = 'jpg, png, jpeg, ...', format diambil dari hasil probe ImageFile (tidak buka gambar ulang)
+    extensi = probeImage(file).format.lower()
     filename = decodeFileName(file) + "." + extensi
 
     # ubah nama file dengan nama yang sudah aman / secure. Kemudian return
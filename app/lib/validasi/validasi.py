@@ -1,11 +1,13 @@
-from marshmallow import ValidationError, INCLUDE
+from marshmallow import ValidationError, INCLUDE, RAISE
 from marshmallow.fields import Field
 from marshmallow.schema import Schema
 from werkzeug.datastructures import FileStorage
 from itsdangerous.exc import BadSignature
-from urllib.parse import unquote
+from typing import List, Union
+import json
+from ..dataTables import DTRequest
 from .fields import ExcelFile
-from .utils import FileTypeNotSupported, decodeValidationError, secureExcelFileName, secureImgFileName, securePdfFileName, serializer
+from .utils import FileTypeNotSupported, decodeValidationError, loadsSigned, loadsSignedMany, secureExcelFileName, secureImgFileName, securePdfFileName
 
 
 class Validasi:
@@ -35,7 +37,7 @@ class Validasi:
         return f"<HasilValidasi: Error={self.error}, Message={self.list_message}>"
 
     def __init__(
-        self, schema: dict, data: dict, unknown: bool = False, unsupported: bool = False, verbose: bool = False
+        self, schema: dict, data: Union[dict, DTRequest], unknown: bool = False, unsupported: bool = False, verbose: bool = False
     ) -> None:
         self.error = True
         self.list_message = [
@@ -49,13 +51,16 @@ class Validasi:
 
         '''
             Deteksi apakah data berasal dari DataTable?, jika iya maka:
-                - unknown = INCLUDE
+                - unknown = INCLUDE (kecuali data sudah di-parse DTRequest, hanya key yang dibutuhkan saja yang divalidasi)
                 - Bagian verbose tidak perlu print data yang berasal dari DataTable
         '''
-        is_dataTable = "columns[0][data]" in data.keys()
-
-        if is_dataTable:
-            self.unknown = INCLUDE
+        if isinstance(data, DTRequest):
+            is_dataTable = True
+            data = data.to_dict()
+        else:
+            is_dataTable = "columns[0][data]" in data.keys()
+            if is_dataTable:
+                self.unknown = INCLUDE
 
         try:
             dataKotor = data
@@ -74,9 +79,9 @@ class Validasi:
                 # contoh: nik = Str(required=True, metadata={'signed': True}, ...)
                 signed = schema.get(k, Field()).metadata.get('signed', False)
                 if signed:
-                    # lakukan validasi itsdangerous,
+                    # lakukan validasi itsdangerous (hasil verifikasi di-cache),
                     # jika tidak valid maka akan raise BadSignature
-                    payload = serializer.loads(unquote(v))
+                    payload = loadsSigned(v)
 
                     # jika valid, masukan payload ke dataBersih
                     self.__tempKey = payload
@@ -117,10 +122,8 @@ class Validasi:
                         if not k.startswith("columns[")
                         and not k.startswith("search[")
                     }
-                    del print_data['draw']
-                    del print_data['start']
-                    del print_data['length']
-                    del print_data['_']
+                    for k in ('draw', 'start', 'length', '_'):
+                        print_data.pop(k, None)
                 else:
                     print_data = dataBersih
 
@@ -162,3 +165,112 @@ class Validasi:
             k: self.__secureFileName(v) if isinstance(v, FileStorage) else v
             for k, v in self.data.items()
         }
+
+
+class ValidasiBatch:
+    """
+    Validasi banyak record sekaligus (bulk insert / edit), contoh data: [{'name': 'a', 'age': 20}, {'name': 'b', 'age': 30}].
+    Schema cukup di-compile 1x lalu di-load pakai marshmallow many=True, jauh lebih cepat dibanding membuat Validasi per row.
+    Hasil:
+        - error: True jika ada minimal 1 record yang tidak valid
+        - list_message: "OK" jika semua valid, jika tidak berisi list error seperti Validasi ditambah key 'index'
+          -> [{'index': 3, 'key': 'age', 'value': '-1', 'message': 'Must be greater than or equal to 1 ...'}]
+        - getData(): list record yang valid saja (urutan tetap), getIndex(): index record yang valid
+    Field SIGNED divalidasi per record, record dengan tanda tangan tidak valid dianggap error pada index tersebut.
+    """
+
+    def __str__(self) -> str:
+        return f"<HasilValidasiBatch: Error={self.error}, Valid={len(self.data)}, Message={self.list_message}>"
+
+    def __init__(self, schema: dict, data: Union[list, str, bytes], unknown: bool = False, max_records: int = None, verbose: bool = False) -> None:
+        self.error = True
+        self.data = []
+        self.index = []
+        self.list_message = [
+            {
+                'index': None,
+                'key': None,
+                'value': None,
+                'message': 'Terjadi kesalahan internal!'
+            }
+        ]
+
+        # data boleh berupa list dict atau JSON array (body request)
+        if isinstance(data, (str, bytes)):
+            try:
+                data = json.loads(data)
+            except ValueError:
+                self.list_message[0]['message'] = 'Data harus berupa JSON array!'
+                print(str(self.list_message[0]))
+                return
+
+        if not isinstance(data, list) or not all(isinstance(record, dict) for record in data):
+            self.list_message[0]['message'] = 'Data harus berupa list of object!'
+            print(str(self.list_message[0]))
+            return
+
+        if max_records is not None and len(data) > max_records:
+            self.list_message[0]['message'] = f'Maksimal {max_records} data dalam 1x proses!'
+            print(str(self.list_message[0]))
+            return
+
+        listError = []
+        signedKeys = [k for k, v in schema.items() if v.metadata.get('signed', False)]
+
+        # pre-processing: verifikasi field SIGNED per record,
+        # 1 record diverifikasi sekaligus (batch), token yang sama hanya diverifikasi 1x
+        dataBersih = []
+        for index, record in enumerate(data):
+            record = dict(record)
+            keys = [k for k in signedKeys if k in record]
+            try:
+                for k, payload in zip(keys, loadsSignedMany([record[k] for k in keys])):
+                    record[k] = payload
+            except BadSignature:
+                # cari field mana yang tidak valid untuk pesan error
+                for k in keys:
+                    try:
+                        loadsSigned(record[k])
+                    except BadSignature:
+                        listError.append({'index': index, 'key': k, 'value': str(data[index][k]), 'message': 'Tanda tangan tidak valid!'})
+                record = None
+            dataBersih.append(record)
+
+        # schema di-compile 1x, lalu validasi seluruh record sekaligus
+        compiled = Schema.from_dict(schema)(many=True, unknown=INCLUDE if unknown else RAISE)
+        toValidate = [record for record in dataBersih if record is not None]
+        errors = compiled.validate(toValidate) if toValidate else {}
+
+        # index hasil validate adalah index pada toValidate, kita mapping balik ke index data asli
+        originalIndex = [index for index, record in enumerate(dataBersih) if record is not None]
+        for position, fieldErrors in errors.items():
+            index = originalIndex[position]
+            for k, v in fieldErrors.items():
+                message = v[0] if isinstance(v, list) else str(v)
+                listError.append({'index': index, 'key': k, 'value': str(data[index].get(k)), 'message': message})
+        invalid = {message['index'] for message in listError}
+
+        self.index = [index for index in originalIndex if index not in invalid]
+        self.data = [dataBersih[index] for index in self.index]
+
+        if listError:
+            listError.sort(key=lambda message: message['index'])
+            self.list_message = listError
+            print(f"ValidationError pada {len(invalid)} dari {len(data)} data:")
+            for message in listError[:20]:
+                print(str(message))
+        else:
+            self.error = False
+            self.list_message = "OK"
+
+            if verbose is True:
+                for record in self.data:
+                    print(record)
+
+    def getData(self) -> List[dict]:
+        # record yang valid saja, walaupun ada record lain yang error
+        return self.data
+
+    def getIndex(self) -> List[int]:
+        # index (pada data asli) dari record yang valid
+        return self.index
@@ -1,4 +1,5 @@
 from marshmallow import ValidationError
+from ..spooledUpload import streamSize
 
 
 def file_size(min_kb: int = 0, max_kb: int = 1024):
@@ -7,8 +8,8 @@ def file_size(min_kb: int = 0, max_kb: int = 1024):
     '''
 
     def size(file):
-        file.seek(0, 2)
-        file_size = file.tell() / 1024
+        # ukuran dihitung lewat seek (file tidak dibaca), posisi stream tidak berubah
+        file_size = streamSize(file) / 1024
 
         if file_size < min_kb:
             raise ValidationError(f"Ukuran file minimal adalah: {min_kb}")
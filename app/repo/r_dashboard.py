@@ -1,9 +1,74 @@
-from app.lib import PostgresDatabase
+from app.lib import PostgresDatabase, DTRequest, SelectQuery
 
-def dt_dashboardData(search:str, offset:int = 0):
+def dt_dashboardData(dt:DTRequest):
+    search = f"%{dt.search.upper()}%"
+
+    db = PostgresDatabase()
+    # hasil langsung di-jsonify, tidak butuh Decimal / datetime
+    db.fetch_mode = 'json'
+    query = SelectQuery(
+        select='''
+            id,
+            name,
+            email,
+            age,
+            address
+        ''',
+        from_='datadummykaryawan',
+        where=['UPPER(name) LIKE %(search)s'],
+        # kolom yang boleh di-sort & di-filter dari DataTables
+        columns={
+            'id': 'id',
+            'name': 'name',
+            'email': 'email',
+            'age': 'age',
+            'address': 'address'
+        },
+        key='id',
+        # filter angka pakai '=' agar bisa pakai index, kolom teks tetap cari sebagian (ILIKE '%...%')
+        filter_types={
+            'id': 'number',
+            'age': 'number',
+            'name': 'text',
+            'email': 'text',
+            'address': 'text'
+        }
+    )
+    param = {
+        'search': search
+    }
+
+    return db.execute_dt(query, param, print_query=True, dt=dt)
+
+def export_dashboardData(search:str, delimiter:str = ','):
+    search = f"%{search.upper()}%"
+
+    db = PostgresDatabase()
+    query = '''
+        SELECT
+            id,
+            name,
+            email,
+            age,
+            address
+        FROM
+            datadummykaryawan
+        WHERE
+            UPPER(name) LIKE %(search)s
+        ORDER BY id
+    '''
+    param = {
+        'search': search
+    }
+
+    return db.copy_stream(query, param, delimiter=delimiter)
+
+def stream_dashboardData(search:str):
     search = f"%{search.upper()}%"
 
     db = PostgresDatabase()
+    # untuk excel, angka cukup float (ExcelBuilder tetap format 2 angka dibelakang koma)
+    db.fetch_mode = 'float'
     query = '''
         SELECT
             id,
@@ -18,11 +83,10 @@ def dt_dashboardData(search:str, offset:int = 0):
         ORDER BY id;
     '''
     param = {
-        'offset': offset,
         'search': search
     }
 
-    return db.execute_dt(query, param, print_query=True)
+    return db.execute_stream(query, param)
 
 def cari_data_dummy(name:str):
     name = f"%{name.upper()}%"
@@ -1,5 +1,5 @@
 from app.lib import PostgresDatabase
-from faker import Faker
+from functools import lru_cache
 
 def insert_data(name:str, email:str, age:int, address:str):
     db = PostgresDatabase()
@@ -17,6 +17,20 @@ def insert_data(name:str, email:str, age:int, address:str):
 
     return db.execute(query, param, print_query=True)
 
+def insert_data_batch(list_data: list):
+    db = PostgresDatabase()
+    query = '''
+        INSERT INTO datadummykaryawan (name, email, age, address)
+        VALUES %s
+        RETURNING id;
+    '''
+    list_data = [
+        (data['name'], data['email'], data['age'], data['address'])
+        for data in list_data
+    ]
+
+    return db.execute_many(query, list_data, returning=True)
+
 def delete_data(id: int):
     db = PostgresDatabase()
     query = '''
@@ -29,6 +43,10 @@ def delete_data(id: int):
 
     return db.execute(query, param, print_query=True)
 
+def delete_data_batch(list_id: list):
+    db = PostgresDatabase()
+    return db.delete_many('datadummykaryawan', 'id', list_id, returning=['id'])
+
 def edit_data(id: int, name: str, email: str, age: int, address: str):
     db = PostgresDatabase()
     query = '''
@@ -51,8 +69,20 @@ def edit_data(id: int, name: str, email: str, age: int, address: str):
 
     return db.execute(query, param, print_query=True)
 
-fake = Faker()
+def edit_data_batch(list_data: list):
+    db = PostgresDatabase()
+    columns = ['name', 'email', 'age', 'address']
+
+    return db.update_many('datadummykaryawan', 'id', columns, list_data, returning=['id'])
+
+@lru_cache(maxsize=None)
+def get_faker():
+    # Faker (import + instance) cukup berat, baru dibuat ketika data dummy pertama kali di-generate
+    from faker import Faker
+    return Faker()
+
 def generate_fake_data():
+    fake = get_faker()
     name = fake.name()
     email = fake.email()
     age = fake.random_int(min=18, max=60)
@@ -354,6 +354,57 @@ function dt_server(id_tabel, ajax_options, dt_options) {
         ...dt_options,
     };
 
+    // keyset pagination (opsional): dt_options.keyset = kolom unik (misal 'id'), ketika user pindah ke halaman berikutnya
+    // nilai row terakhir halaman sebelumnya dikirim sebagai seek[<kolom>], sehingga server tidak perlu OFFSET
+    let keyset_last = null, keyset_pending = null;
+    if (dt_options.keyset) {
+        const ajax_data = ajax_options.data;
+        ajax_options.data = (d, settings) => {
+            const extra = typeof ajax_data === 'function' ? ajax_data(d, settings) : ajax_data;
+            const order = JSON.stringify(d.order);
+            keyset_pending = { start: d.start, length: d.length, order: order };
+
+            if (keyset_last && keyset_last.row && order === keyset_last.order && d.start === keyset_last.start + keyset_last.length) {
+                d.seek = {};
+                d.columns.forEach(col => {
+                    const value = keyset_last.row[col.data];
+                    if (value !== null && value !== undefined && value !== '') d.seek[col.data] = value;
+                });
+            }
+            return extra ? $.extend(d, extra) : d;
+        };
+    }
+
+    // ETag (opsional): dt_options.etag = true, request dgn param yang sama (selain draw) dikirim dgn If-None-Match,
+    // jika server menjawab 304 maka data halaman sebelumnya dipakai ulang (tanpa download ulang)
+    if (dt_options.etag) {
+        const ajax_object = ajax_options, etag_cache = {};
+        ajax_options = (d, callback, settings) => {
+            const extra = typeof ajax_object.data === 'function' ? ajax_object.data(d, settings) : ajax_object.data;
+            const data = extra ? $.extend(d, extra) : d;
+            const key = $.param({ ...data, draw: null });
+            const cached = etag_cache[key];
+
+            return $.ajax({
+                ...ajax_object,
+                data: data,
+                dataType: 'json',
+                cache: false,
+                headers: { ...ajax_object.headers, ...(cached ? { 'If-None-Match': cached.etag } : {}) },
+                success: (json, status, xhr) => {
+                    if (xhr.status === 304 && cached) {
+                        json = { ...cached.json, draw: d.draw };
+                    } else if (xhr.getResponseHeader('ETag')) {
+                        etag_cache[key] = { etag: xhr.getResponseHeader('ETag'), json: json };
+                    }
+                    // ajax berupa function tidak memicu event xhr.dt, dipicu manual (dipakai keyset)
+                    $(settings.nTable).trigger('xhr.dt', [settings, json, xhr]);
+                    callback(json);
+                },
+            });
+        };
+    }
+
     // reset && destroy table
     $('#' + id_tabel + ' tbody').html('');
     $('#' + id_tabel).DataTable().clear().destroy();
@@ -406,6 +457,13 @@ function dt_server(id_tabel, ajax_options, dt_options) {
     // fix bug datatable.
     $('.sorting_asc').removeClass('sorting_asc');
 
+    // simpan row terakhir tiap halaman untuk keyset pagination
+    if (dt_options.keyset) {
+        $('#' + id_tabel).off('xhr.dt').on('xhr.dt', (e, settings, json) => {
+            keyset_last = json && json.data ? { ...keyset_pending, row: json.data[json.data.length - 1] } : null;
+        });
+    }
+
     // attach error listener
     $.fn.dataTable.ext.errMode = 'none';
     $('#' + id_tabel).off('error.dt').on('error.dt', (e, settings, techNote, message) => {
@@ -0,0 +1,186 @@
+"""
+    Konfigurasi gunicorn untuk production (Cloud Run / Compute Engine).
+    Versi: 1.0 (19 Okt 2026)
+
+    Dibaca otomatis oleh gunicorn dari working directory:
+        gunicorn main:app
+    Jumlah worker, thread, dan ukuran connection pool database per worker dihitung dari jumlah CPU & memory
+    (mengikuti limit cgroup container, bukan milik host) dan env var, sehingga kapasitas request selalu sejalan dgn pool:
+        - GUNICORN_WORKER_CLASS : 'gthread' (default), 'sync', atau 'gevent'
+        - GUNICORN_WORKERS      : default sync = 2 x CPU + 1, gthread / gevent = jumlah CPU,
+                                  dibatasi memory / GUNICORN_WORKER_MEMORY_MB (default 256)
+        - GUNICORN_THREADS      : thread per worker gthread (default 8)
+        - GUNICORN_WORKER_CONNECTIONS : greenlet per worker gevent (default 50)
+        - DB_MAX_CONNECTIONS    : total koneksi database yang boleh dibuka 1 instance (default 20), dibagi rata per worker
+        - DB_POOL_MAXCONN / DB_POOL_MINCONN : override ukuran pool per worker (lihat configurePool() di postgresKonektor)
+    Pool per worker = request bersamaan (thread / greenlet) + EXPORT_WORKERS (thread export di background),
+    jika DB_MAX_CONNECTIONS tidak cukup maka jumlah thread / greenlet yang dikurangi (PoolError langsung dilempar
+    ketika pool habis, tanpa menunggu). Hasil perhitungan dikirim ke app lewat env DB_POOL_MAXCONN & DB_POOL_MINCONN.
+    Sebelum menerima request, tiap worker membuka DB_POOL_MINCONN koneksi ke primary & tiap replica (warm-up, lihat post_worker_init).
+"""
+
+import math
+import os
+
+# Cloud Run memberi waktu 10 detik antara SIGTERM dan SIGKILL
+CLOUD_RUN_SHUTDOWN_SECONDS = 10
+
+
+def envInt(name: str, default: int) -> int:
+    value = os.environ.get(name, '').strip()
+    return int(value) if value else default
+
+
+def readFile(path: str) -> str:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def cpuCount() -> int:
+    '''
+        Jumlah CPU yang benar-benar boleh dipakai container (quota cgroup v2 / v1), bukan jumlah CPU host
+    '''
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+
+    quota, period = (readFile('/sys/fs/cgroup/cpu.max').split() + ['max', '100000'])[:2]
+    if quota == 'max':
+        quota, period = readFile('/sys/fs/cgroup/cpu/cpu.cfs_quota_us'), readFile('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+    try:
+        if int(quota) > 0:
+            count = min(count, math.ceil(int(quota) / int(period)))
+    except ValueError:
+        pass
+    return max(count, 1)
+
+
+def memoryMb() -> int:
+    '''
+        Limit memory container (cgroup v2 / v1) dalam MB, fallback ke memory fisik host
+    '''
+    total = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        limit = readFile(path)
+        if limit.isdigit():
+            # cgroup v1 tanpa limit berisi angka yang sangat besar
+            total = min(total, int(limit))
+            break
+    return total // (1024 * 1024)
+
+
+# ================================ Perhitungan kapasitas ================================
+cpu = cpuCount()
+memory_mb = memoryMb()
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class not in ('sync', 'gthread', 'gevent'):
+    raise ValueError(f"GUNICORN_WORKER_CLASS '{worker_class}' tidak dikenal, pilih salah satu dari ('sync', 'gthread', 'gevent')")
+
+workers = envInt('GUNICORN_WORKERS', 2 * cpu + 1 if worker_class == 'sync' else cpu)
+workers = max(min(workers, memory_mb // envInt('GUNICORN_WORKER_MEMORY_MB', 256)), 1)
+
+# request yang diproses bersamaan oleh 1 worker
+if worker_class == 'gthread':
+    concurrency = envInt('GUNICORN_THREADS', 8)
+elif worker_class == 'gevent':
+    concurrency = envInt('GUNICORN_WORKER_CONNECTIONS', 50)
+else:
+    concurrency = 1
+
+# thread export di background (app/lib/exportJob.py) juga memakai koneksi dari pool yang sama
+export_workers = envInt('EXPORT_WORKERS', 2)
+pool_maxconn = envInt('DB_POOL_MAXCONN', min(concurrency + export_workers, max(envInt('DB_MAX_CONNECTIONS', 20) // workers, 1)))
+if pool_maxconn - export_workers < concurrency:
+    concurrency = max(pool_maxconn - export_workers, 1)
+pool_minconn = min(envInt('DB_POOL_MINCONN', min(concurrency, 8)), pool_maxconn)
+
+os.environ['DB_POOL_MAXCONN'] = str(pool_maxconn)
+os.environ['DB_POOL_MINCONN'] = str(pool_minconn)
+os.environ.setdefault('DB_REPLICA_POOL_SIZE', str(pool_maxconn))
+
+# ================================ Setting gunicorn ================================
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+threads = concurrency if worker_class == 'gthread' else 1
+worker_connections = concurrency if worker_class == 'gevent' else 1000
+
+# app di-load sekali di master lalu di-fork (hemat memory & start worker lebih cepat).
+# gevent tidak di-preload: monkey patch terjadi di worker, lock yang dibuat ketika import di master tidak ikut ter-patch
+preload_app = worker_class != 'gevent'
+
+# worker sync yang memproses 1 request lebih lama dari timeout akan di-kill, sehingga diberi waktu
+# sepanjang timeout export (DB_EXPORT_TIMEOUT_MS). Untuk gthread / gevent timeout hanya untuk worker yang hang
+export_seconds = envInt('DB_EXPORT_TIMEOUT_MS', 600000) // 1000
+timeout = envInt('GUNICORN_TIMEOUT', export_seconds + 30 if worker_class == 'sync' else 120)
+graceful_timeout = envInt('GUNICORN_GRACEFUL_TIMEOUT', CLOUD_RUN_SHUTDOWN_SECONDS)
+keepalive = envInt('GUNICORN_KEEPALIVE', 5)
+
+# worker di-restart bergantian (graceful) setelah sekian request untuk membuang memory yang terus tumbuh
+# (openpyxl / pikepdf / Pillow), jitter agar tidak semua worker restart bersamaan. 0 untuk menonaktifkan.
+# Export berjalan di dalam proses worker (sampai DB_EXPORT_TIMEOUT_MS) sedangkan restart hanya menunggu
+# graceful_timeout, sehingga selama EXPORT_WORKERS > 0 default-nya 0 (export yang terputus ditandai error, lihat worker_exit)
+max_requests = envInt('GUNICORN_MAX_REQUESTS', 0 if export_workers > 0 else 1000)
+max_requests_jitter = envInt('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+
+# file heartbeat worker di memory, bukan di overlay filesystem container
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+errorlog = '-'
+
+
+# ================================ Hook ================================
+def on_starting(server) -> None:
+    server.log.info(
+        f"CPU {cpu}, memory {memory_mb} MB -> {workers} worker {worker_class} x {concurrency} request bersamaan, "
+        f"pool database per worker {pool_minconn}-{pool_maxconn} koneksi (total maks {workers * pool_maxconn})"
+    )
+
+
+def post_worker_init(worker) -> None:
+    '''
+        Dijalankan di tiap worker setelah app di-load, sebelum worker menerima request
+    '''
+    if worker_class == 'gevent':
+        useGeventWaitCallback()
+
+    from app.lib.postgresKonektor import warmUpPool
+    opened = warmUpPool('default', pool_minconn)
+    worker.log.info(f"Worker {worker.pid}: warm-up {opened}/{pool_minconn} koneksi database")
+
+
+def worker_exit(server, worker) -> None:
+    '''
+        Dijalankan di proses worker yang berhenti (restart max_requests, scale down, deploy).
+        Thread export ikut mati bersama proses, job yang belum selesai ditandai error agar tidak tertahan 'running'
+    '''
+    from app import export_queue
+    aborted = export_queue.abort("Export terhenti karena worker server di-restart, silahkan ulangi export!")
+    if aborted:
+        worker.log.warning(f"Worker {worker.pid}: {aborted} export job belum selesai ditandai error")
+
+
+def useGeventWaitCallback() -> None:
+    '''
+        psycopg2 menunggu jawaban database secara blocking (menahan seluruh greenlet di worker),
+        wait callback ini membuat psycopg2 menunggu lewat event loop gevent (sama seperti psycogreen)
+    '''
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    def wait(connection, timeout=None) -> None:
+        while True:
+            state = connection.poll()
+            if state == extensions.POLL_OK:
+                break
+            elif state == extensions.POLL_READ:
+                wait_read(connection.fileno(), timeout=timeout)
+            elif state == extensions.POLL_WRITE:
+                wait_write(connection.fileno(), timeout=timeout)
+            else:
+                raise OperationalError(f"Bad result from poll: {state}")
+
+    extensions.set_wait_callback(wait)
@@ -1,4 +1,6 @@
 from app import app
 
 if __name__ == '__main__':
-    app.run(host='localhost', port=5000, debug=True)
\ No newline at end of file
+    # server development saja, production pakai gunicorn (lihat gunicorn.conf.py)
+    # mode debug (reloader & debugger) aktif jika env FLASK_DEBUG=1
+    app.run(host='localhost', port=5000)